@@ -21,6 +21,13 @@ def env_float(name, default):
         return float(default)
 
 
+def env_int(name, default):
+    try:
+        return int(os.getenv(name, str(default)))
+    except (TypeError, ValueError):
+        return int(default)
+
+
 def env_bool(name, default=False):
     raw_value = os.getenv(name)
     if raw_value is None:
@@ -204,6 +211,16 @@ CACHES = {
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
         }
+    },
+    "retrieval": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": os.getenv("DJANGO_RETRIEVAL_CACHE_URL", f"{REDIS_URL}/2"),
+        "TIMEOUT": env_int("RETRIEVAL_CACHE_TTL", 3600),
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            # A Redis outage degrades to uncached retrieval instead of failing chat.
+            "IGNORE_EXCEPTIONS": True,
+        }
     }
 }
 
@@ -218,8 +235,131 @@ if not OPENAI_API_KEY:
 
 CHUNK_SIZE_WORDS = int(os.getenv('CHUNK_SIZE_WORDS', 350))
 CHUNK_OVERLAP_WORDS = int(os.getenv('CHUNK_OVERLAP_WORDS', 50))
+# "words" (fixed word windows) or "tokens" (token budget, cut at sentence ends/pauses).
+CHUNKING_MODE = os.getenv("CHUNKING_MODE", "words").strip().lower()
+CHUNK_SIZE_TOKENS = env_int("CHUNK_SIZE_TOKENS", 400)
+CHUNK_OVERLAP_TOKENS = env_int("CHUNK_OVERLAP_TOKENS", 50)
+# Silence between transcript segments treated as a chunk boundary in "tokens" mode.
+CHUNK_PAUSE_SECONDS = env_float("CHUNK_PAUSE_SECONDS", 1.0)
+# Token counter for chunking and ContentChunk.token_count: "auto" (tiktoken if
+# installed, else "approximate"), "tiktoken" or "approximate".
+CHUNK_TOKENIZER = os.getenv("CHUNK_TOKENIZER", "auto").strip().lower()
+# Re-processing a video diffs the new chunks against the stored ones (by content hash)
+# and only writes what changed, instead of deleting and re-embedding every chunk.
+VIDEO_REPROCESS_INCREMENTAL = env_bool("VIDEO_REPROCESS_INCREMENTAL", False)
+# Full re-processing writes a new chunk generation next to the served one and flips
+# VideoContent.active_generation; the superseded generation is deleted this long
+# after the cut-over (so in-flight searches finish), in batches of this many rows.
+CHUNK_GENERATION_GC_DELAY_SECONDS = env_int("CHUNK_GENERATION_GC_DELAY_SECONDS", 300)
+CHUNK_GENERATION_GC_BATCH_SIZE = env_int("CHUNK_GENERATION_GC_BATCH_SIZE", 500)
+# Beat also sweeps every video for stale generations this often (0 disables), catching
+# runs that failed before their cut-over and collections whose task was lost.
+CHUNK_GENERATION_GC_SWEEP_SECONDS = env_int("CHUNK_GENERATION_GC_SWEEP_SECONDS", 3600)
+# Where chunk text lives: "inline" (ContentChunk.text) or "blob" (one compressed
+# transcript per video generation, chunks keep character offsets into it; see
+# transcript_store.py). "blob" leaves ContentChunk.text empty, so it requires
+# RETRIEVAL_SEARCH_MODE=vector and RETRIEVAL_LEXICAL_FALLBACK=false (checked at startup).
+CHUNK_TEXT_STORAGE = os.getenv("CHUNK_TEXT_STORAGE", "inline").strip().lower()
+# Decompressed transcripts kept per process for slicing retrieved chunk texts.
+TRANSCRIPT_CACHE_SIZE = env_int("TRANSCRIPT_CACHE_SIZE", 256)
 EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'text-embedding-3-small')
+# Must match the vector column sizes pinned in mentor_knowledge/models.py (checked at startup).
 EMBEDDING_DIMENSIONS = int(os.getenv('EMBEDDING_DIMENSIONS', 1536))
+# Length of the Matryoshka prefix stored in ContentChunk.embedding_short.
+EMBEDDING_SHORT_DIMENSIONS = int(os.getenv('EMBEDDING_SHORT_DIMENSIONS', 256))
+# Reuse embeddings of unchanged chunk text (EmbeddingCacheEntry) instead of re-requesting them.
+EMBEDDING_CACHE_ENABLED = env_bool("EMBEDDING_CACHE_ENABLED", True)
+# "openai", or "local" (deterministic hashed n-grams, no network) for load tests and benchmarks.
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai")
+# Simulated round trip added to every provider call (0 disables the wrapper).
+EMBEDDING_PROVIDER_LATENCY_MS = env_float("EMBEDDING_PROVIDER_LATENCY_MS", 0.0)
+EMBEDDING_PROVIDER_LATENCY_PER_INPUT_MS = env_float("EMBEDDING_PROVIDER_LATENCY_PER_INPUT_MS", 0.0)
+# Per-request limits used to split a video's chunks into embedding requests
+# (OpenAI allows 2048 inputs and 300k tokens per request).
+EMBEDDING_BATCH_MAX_INPUTS = env_int("EMBEDDING_BATCH_MAX_INPUTS", 2048)
+EMBEDDING_BATCH_MAX_TOKENS = env_int("EMBEDDING_BATCH_MAX_TOKENS", 300000)
+EMBEDDING_BATCH_CONCURRENCY = env_int("EMBEDDING_BATCH_CONCURRENCY", 4)
+EMBEDDING_BATCH_MAX_RETRIES = env_int("EMBEDDING_BATCH_MAX_RETRIES", 3)
+EMBEDDING_BATCH_RETRY_BACKOFF = env_float("EMBEDDING_BATCH_RETRY_BACKOFF", 1.0)
+# A full (re-)processing run chunks, embeds and inserts this many chunks at a time,
+# so memory stays bounded on long transcripts; the default keeps every concurrent
+# embedding request of a batch full.
+CHUNK_WRITE_BATCH_SIZE = env_int("CHUNK_WRITE_BATCH_SIZE", EMBEDDING_BATCH_MAX_INPUTS * EMBEDDING_BATCH_CONCURRENCY)
+# Requests/tokens per minute shared by all workers through a Redis token bucket
+# (defaults match the tier 1 limits of text-embedding-3-small).
+OPENAI_RATE_LIMIT_ENABLED = env_bool("OPENAI_RATE_LIMIT_ENABLED", True)
+OPENAI_RATE_LIMIT_REDIS_URL = os.getenv("OPENAI_RATE_LIMIT_REDIS_URL", f"{REDIS_URL}/3")
+OPENAI_EMBEDDING_RPM = env_int("OPENAI_EMBEDDING_RPM", 3000)
+OPENAI_EMBEDDING_TPM = env_int("OPENAI_EMBEDDING_TPM", 1000000)
+# Backfills: queue chunk ids of all videos in Redis and embed them in shared full-size
+# batches (flushed when a batch is full or MAX_WAIT after the first id was queued).
+EMBEDDING_COALESCE_ENABLED = env_bool("EMBEDDING_COALESCE_ENABLED", False)
+EMBEDDING_COALESCE_BATCH_SIZE = env_int("EMBEDDING_COALESCE_BATCH_SIZE", 1024)
+EMBEDDING_COALESCE_MAX_WAIT_SECONDS = env_float("EMBEDDING_COALESCE_MAX_WAIT_SECONDS", 5.0)
+EMBEDDING_COALESCE_REDIS_URL = os.getenv("EMBEDDING_COALESCE_REDIS_URL", f"{REDIS_URL}/3")
+# Beat re-queues chunks still unembedded this long after they were written (their ids
+# were lost, e.g. with a worker that died mid-batch), checking as often.
+EMBEDDING_COALESCE_SWEEP_SECONDS = env_int("EMBEDDING_COALESCE_SWEEP_SECONDS", 600)
+
+# =========================================================
+# Vector retrieval configuration
+# =========================================================
+# Index built over ContentChunk.embedding by `vector_index`: "hnsw" (default) or "ivfflat".
+# Migrations create HNSW indexes with the default parameters below.
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "hnsw").strip().lower()
+VECTOR_HNSW_M = env_int("VECTOR_HNSW_M", 16)
+VECTOR_HNSW_EF_CONSTRUCTION = env_int("VECTOR_HNSW_EF_CONSTRUCTION", 64)
+VECTOR_IVFFLAT_LISTS = env_int("VECTOR_IVFFLAT_LISTS", 100)
+# Per-query recall knobs, applied with SET LOCAL for approximate searches.
+VECTOR_HNSW_EF_SEARCH = env_int("VECTOR_HNSW_EF_SEARCH", 40)
+VECTOR_IVFFLAT_PROBES = env_int("VECTOR_IVFFLAT_PROBES", 10)
+# pgvector >= 0.8 only: "relaxed_order" or "strict_order" keeps scanning the
+# index until the mentor filter is satisfied. Leave empty on older versions.
+VECTOR_HNSW_ITERATIVE_SCAN = os.getenv("VECTOR_HNSW_ITERATIVE_SCAN", "").strip().lower()
+# Default retrieval mode for chat: "approximate" (use the ANN index) or "exact".
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "approximate").strip().lower()
+# Where vector search runs: "postgres" (pgvector) or "numpy" (per-mentor
+# memory-mapped matrix under VECTOR_INDEX_DIR, shared via the OS page cache).
+RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "postgres").strip().lower()
+VECTOR_INDEX_DIR = Path(os.getenv("VECTOR_INDEX_DIR", str(BASE_DIR / "var" / "vector_index")))
+# Convert ContentChunk to one LIST partition per mentor when migrating (see
+# mentor_knowledge/partitioning.py); existing databases use `manage.py partition_chunks`.
+# Keep it on for a partitioned table: only then do new mentors get their own partition.
+CONTENT_CHUNK_PARTITIONING = env_bool("CONTENT_CHUNK_PARTITIONING", False)
+# Compact embedding copies written at ingestion ("halfvec", "bit", "short"); backfill
+# existing rows with `manage.py compact_embeddings --type <type>`.
+EMBEDDING_COMPACT_TYPES = env_list("EMBEDDING_COMPACT_TYPES", "")
+# Find candidates on this compact column, then rescore them against the
+# full vectors. Empty means search the full-precision column directly.
+RETRIEVAL_COMPACT_TYPE = os.getenv("RETRIEVAL_COMPACT_TYPE", "").strip().lower()
+RETRIEVAL_RESCORE_OVERSAMPLE = env_int("RETRIEVAL_RESCORE_OVERSAMPLE", 4)
+# Default search mode for chat: "vector", "lexical" (Postgres full-text, no
+# embedding call) or "hybrid" (both, fused with reciprocal-rank fusion).
+RETRIEVAL_SEARCH_MODE = os.getenv("RETRIEVAL_SEARCH_MODE", "vector").strip().lower()
+RETRIEVAL_HYBRID_CANDIDATES = env_int("RETRIEVAL_HYBRID_CANDIDATES", 20)
+RETRIEVAL_RRF_K = env_int("RETRIEVAL_RRF_K", 60)
+# Fall back to lexical search when the query embedding call fails or times out.
+RETRIEVAL_LEXICAL_FALLBACK = env_bool("RETRIEVAL_LEXICAL_FALLBACK", True)
+# Opt-in: diversify chat context (see mentors/diversify.py): over-fetch top_k * oversample
+# candidates, keep top_k by maximal marginal relevance, then merge adjacent chunks.
+RETRIEVAL_DIVERSIFY = env_bool("RETRIEVAL_DIVERSIFY", False)
+RETRIEVAL_MMR_OVERSAMPLE = env_int("RETRIEVAL_MMR_OVERSAMPLE", 3)
+# 1.0 = relevance only, 0.0 = diversity only.
+RETRIEVAL_MMR_LAMBDA = env_float("RETRIEVAL_MMR_LAMBDA", 0.7)
+# Chunks added on each side of every chat hit (0 disables); fetched in one query.
+RETRIEVAL_NEIGHBOUR_WINDOW = env_int("RETRIEVAL_NEIGHBOUR_WINDOW", 0)
+# Token budget of the chat context (0 disables): lower-ranked spans that do not
+# fit are dropped, using the token counts stored on ContentChunk.
+CHAT_CONTEXT_MAX_TOKENS = env_int("CHAT_CONTEXT_MAX_TOKENS", 0)
+# Cache ranked chunk ids per (mentor corpus version, quantized query); see mentors/retrieval_cache.py.
+RETRIEVAL_CACHE_ENABLED = env_bool("RETRIEVAL_CACHE_ENABLED", True)
+# Query embeddings are rounded to this many decimals before hashing, so
+# near-identical embeddings of the same question share a cache entry.
+RETRIEVAL_CACHE_PRECISION = env_int("RETRIEVAL_CACHE_PRECISION", 2)
+# Chat query embeddings: in-process LRU (entries per process) in front of the retrieval Redis cache.
+QUERY_EMBEDDING_CACHE_ENABLED = env_bool("QUERY_EMBEDDING_CACHE_ENABLED", True)
+QUERY_EMBEDDING_CACHE_SIZE = env_int("QUERY_EMBEDDING_CACHE_SIZE", 1024)
+QUERY_EMBEDDING_CACHE_TTL = env_int("QUERY_EMBEDDING_CACHE_TTL", 86400)
 
 # =========================================================
 # Celery Configuration Options
@@ -232,6 +372,18 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
 CELERY_WORKER_HIJACK_ROOT_LOGGER = False
 CELERY_TASK_TRACK_STARTED = True
+# Periodic tasks; the DatabaseScheduler beat runs with (docker-compose) loads these entries at startup.
+CELERY_BEAT_SCHEDULE = {}
+if CHUNK_GENERATION_GC_SWEEP_SECONDS > 0:
+    CELERY_BEAT_SCHEDULE["collect-chunk-generations"] = {
+        "task": "mentor_knowledge.tasks.collect_chunk_generations_task",
+        "schedule": float(CHUNK_GENERATION_GC_SWEEP_SECONDS),
+    }
+if EMBEDDING_COALESCE_ENABLED and EMBEDDING_COALESCE_SWEEP_SECONDS > 0:
+    CELERY_BEAT_SCHEDULE["requeue-unembedded-chunks"] = {
+        "task": "mentor_knowledge.tasks.requeue_unembedded_chunks_task",
+        "schedule": float(EMBEDDING_COALESCE_SWEEP_SECONDS),
+    }
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 CELERY_LOG_LEVEL = os.getenv("CELERY_LOG_LEVEL", LOG_LEVEL).upper()
@@ -0,0 +1,152 @@
+"""
+Helpers for managing the pgvector approximate-nearest-neighbour (ANN) indexes
+on ContentChunk.embedding and its compact companion columns.
+
+The migrations declare one HNSW index per column (ContentChunk.Meta.indexes)
+with fixed default parameters. The `vector_index` management command rebuilds
+them, or builds per-mentor partial indexes, with the index type and build
+parameters from settings.
+"""
+import uuid
+from dataclasses import dataclass
+
+from django.conf import settings
+
+INDEX_TYPE_HNSW = "hnsw"
+INDEX_TYPE_IVFFLAT = "ivfflat"
+INDEX_TYPES = (INDEX_TYPE_HNSW, INDEX_TYPE_IVFFLAT)
+
+CONTENT_CHUNK_TABLE = "articles_contentchunk"
+CONTENT_CHUNK_ANN_INDEX = "articles_chunk_embedding_ann"
+MENTOR_ANN_INDEX_PREFIX = "articles_chunk_ann_m_"
+
+
+@dataclass(frozen=True)
+class VectorColumn:
+    """An indexed vector column of ContentChunk."""
+    column: str
+    opclass: str
+    index_name: str
+    mentor_index_prefix: str
+
+
+VECTOR_COLUMNS = {
+    "embedding": VectorColumn(
+        column="embedding",
+        opclass="vector_cosine_ops",
+        index_name=CONTENT_CHUNK_ANN_INDEX,
+        mentor_index_prefix=MENTOR_ANN_INDEX_PREFIX,
+    ),
+    "embedding_half": VectorColumn(
+        column="embedding_half",
+        opclass="halfvec_cosine_ops",
+        index_name="articles_chunk_half_ann",
+        mentor_index_prefix="articles_chunk_ann_h_",
+    ),
+    "embedding_bit": VectorColumn(
+        column="embedding_bit",
+        opclass="bit_hamming_ops",
+        index_name="articles_chunk_bit_ann",
+        mentor_index_prefix="articles_chunk_ann_b_",
+    ),
+    "embedding_short": VectorColumn(
+        column="embedding_short",
+        opclass="vector_cosine_ops",
+        index_name="articles_chunk_short_ann",
+        mentor_index_prefix="articles_chunk_ann_s_",
+    ),
+}
+
+
+def get_vector_column(column: str = "embedding") -> VectorColumn:
+    """Look up an indexed vector column by name."""
+    try:
+        return VECTOR_COLUMNS[column]
+    except KeyError:
+        raise ValueError(
+            f"Unknown vector column '{column}'. Expected one of: {', '.join(VECTOR_COLUMNS)}"
+        )
+
+
+def get_index_type(index_type: str | None = None) -> str:
+    """
+    Resolve and validate the ANN index type.
+    Args:
+        index_type (str | None): Explicit index type, or None to use VECTOR_INDEX_TYPE.
+    Returns:
+        str: Either "hnsw" or "ivfflat".
+    """
+    index_type = (index_type or settings.VECTOR_INDEX_TYPE).strip().lower()
+    if index_type not in INDEX_TYPES:
+        raise ValueError(
+            f"Unsupported vector index type '{index_type}'. Expected one of: {', '.join(INDEX_TYPES)}"
+        )
+    return index_type
+
+
+def mentor_index_name(mentor_id, column: str = "embedding") -> str:
+    """Name of the partial ANN index that only covers one mentor's chunks."""
+    return f"{get_vector_column(column).mentor_index_prefix}{uuid.UUID(str(mentor_id)).hex}"
+
+
+def mentor_index_predicate(mentor_id) -> str:
+    """
+    Predicate of a mentor's partial ANN index.
+    Retrieval filters on the same `mentor_id = '<uuid>'` literal, which lets the planner match it.
+    """
+    return f"mentor_id = '{uuid.UUID(str(mentor_id))}'"
+
+
+def build_create_index_sql(
+    *,
+    index_name: str = CONTENT_CHUNK_ANN_INDEX,
+    table: str = CONTENT_CHUNK_TABLE,
+    column: str = "embedding",
+    opclass: str = "vector_cosine_ops",
+    index_type: str | None = None,
+    where: str | None = None,
+    concurrently: bool = False,
+) -> str:
+    """
+    Build the CREATE INDEX statement for an ANN index.
+    Args:
+        index_name (str): Name of the index to create.
+        table (str): Table holding the vector column.
+        column (str): Vector column to index.
+        opclass (str): pgvector operator class; must match the distance operator used in retrieval.
+        index_type (str | None): "hnsw" or "ivfflat"; defaults to VECTOR_INDEX_TYPE.
+        where (str | None): Optional predicate for a partial index.
+        concurrently (bool): Build without blocking writes (cannot run inside a transaction).
+    Returns:
+        str: The SQL statement.
+    """
+    index_type = get_index_type(index_type)
+    if index_type == INDEX_TYPE_HNSW:
+        with_params = (
+            f"m = {int(settings.VECTOR_HNSW_M)}, "
+            f"ef_construction = {int(settings.VECTOR_HNSW_EF_CONSTRUCTION)}"
+        )
+    else:
+        with_params = f"lists = {int(settings.VECTOR_IVFFLAT_LISTS)}"
+
+    sql = (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {index_name} "
+        f"ON {table} USING {index_type} ({column} {opclass}) WITH ({with_params})"
+    )
+    if where:
+        sql += f" WHERE {where}"
+    return sql
+
+
+def build_drop_index_sql(index_name: str = CONTENT_CHUNK_ANN_INDEX, concurrently: bool = False) -> str:
+    """Build the DROP INDEX statement for an ANN index."""
+    return f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS {index_name}"
+
+
+def get_index_size_bytes(cursor, index_name: str = CONTENT_CHUNK_ANN_INDEX) -> int | None:
+    """
+    Return the on-disk size of an index, or None if it does not exist.
+    """
+    cursor.execute("SELECT pg_relation_size(to_regclass(%s))", [index_name])
+    row = cursor.fetchone()
+    return row[0] if row else None
@@ -1,4 +1,6 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 
 class MentorKnowledgeConfig(AppConfig):
@@ -6,3 +8,19 @@ class MentorKnowledgeConfig(AppConfig):
     name = "mentor_knowledge"
     # Keep legacy app label for migration history and DB compatibility.
     label = "articles"
+
+    def ready(self):
+        from mentor_knowledge import models, signals  # noqa: F401
+        from mentor_knowledge.transcript_store import check_text_storage_search
+
+        check_text_storage_search()
+        # The vector columns have fixed sizes (see models.EMBEDDING_DIMENSIONS).
+        if (settings.EMBEDDING_DIMENSIONS, settings.EMBEDDING_SHORT_DIMENSIONS) != (
+            models.EMBEDDING_DIMENSIONS, models.EMBEDDING_SHORT_DIMENSIONS
+        ):
+            raise ImproperlyConfigured(
+                f"EMBEDDING_DIMENSIONS={settings.EMBEDDING_DIMENSIONS} and "
+                f"EMBEDDING_SHORT_DIMENSIONS={settings.EMBEDDING_SHORT_DIMENSIONS} must match the "
+                f"vector columns ({models.EMBEDDING_DIMENSIONS} and {models.EMBEDDING_SHORT_DIMENSIONS}); "
+                "changing them needs a migration altering the columns."
+            )
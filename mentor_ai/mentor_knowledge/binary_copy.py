@@ -0,0 +1,129 @@
+"""
+Bulk inserts through COPY ... FROM STDIN (FORMAT BINARY).
+
+bulk_create sends every vector as a '[0.0123,...]' text literal that Postgres
+parses back into floats. Here rows are encoded in the binary COPY format
+instead: vectors go over the wire as the big-endian float32 bytes pgvector's
+receive functions read directly (a NumPy byte swap, no per-float formatting),
+and the other columns in their binary wire formats.
+
+Only the column types used by the models written this way are supported.
+"""
+import datetime
+import io
+import struct
+import uuid
+
+from django.db import connection, models, transaction
+from pgvector import Bit, HalfVector, Vector
+
+_SIGNATURE = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+_TRAILER = struct.pack(">h", -1)
+_NULL = struct.pack(">i", -1)
+_POSTGRES_EPOCH = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _pgvector(cls):
+    def encode(value):
+        return (value if isinstance(value, cls) else cls(value)).to_binary()
+    return encode
+
+
+def _encode_uuid(value) -> bytes:
+    return (value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))).bytes
+
+
+def _encode_timestamptz(value) -> bytes:
+    return struct.pack(">q", (value - _POSTGRES_EPOCH) // datetime.timedelta(microseconds=1))
+
+
+# Binary encoder per Postgres column type (the db_type() prefix before any modifier).
+_ENCODERS = {
+    "uuid": _encode_uuid,
+    "boolean": lambda value: b"\x01" if value else b"\x00",
+    "integer": lambda value: struct.pack(">i", value),
+    "bigint": lambda value: struct.pack(">q", value),
+    "text": lambda value: value.encode("utf-8"),
+    "varchar": lambda value: value.encode("utf-8"),
+    "timestamp with time zone": _encode_timestamptz,
+    "vector": _pgvector(Vector),
+    "halfvec": _pgvector(HalfVector),
+    "bit": _pgvector(Bit),
+}
+
+
+def _column_encoder(field):
+    db_type = field.db_type(connection).split("(")[0].strip()
+    try:
+        return _ENCODERS[db_type]
+    except KeyError:
+        raise TypeError(f"Binary COPY does not support column {field.column} of type {db_type}")
+
+
+def _copy_fields(model) -> list:
+    return [
+        field for field in model._meta.concrete_fields
+        if not isinstance(field, models.GeneratedField)
+    ]
+
+
+def encode_rows(objs, fields) -> io.BytesIO:
+    """
+    Encode model instances as a binary COPY stream.
+    Values come from field.pre_save(), so auto_now_add timestamps are filled like bulk_create does.
+    Args:
+        objs (list): Model instances.
+        fields (list): Concrete fields to write, in column order.
+    Returns:
+        io.BytesIO: The COPY payload, positioned at the start.
+    """
+    encoders = [_column_encoder(field) for field in fields]
+    field_count = struct.pack(">h", len(fields))
+    buffer = io.BytesIO()
+    buffer.write(_SIGNATURE)
+    for obj in objs:
+        buffer.write(field_count)
+        for field, encode in zip(fields, encoders):
+            value = field.pre_save(obj, add=True)
+            if value is None:
+                buffer.write(_NULL)
+                continue
+            data = encode(value)
+            buffer.write(struct.pack(">i", len(data)))
+            buffer.write(data)
+    buffer.write(_TRAILER)
+    buffer.seek(0)
+    return buffer
+
+
+def copy_insert(model, objs, *, ignore_conflicts: bool = False) -> int:
+    """
+    Insert model instances with a binary COPY.
+    Args:
+        model: The model class.
+        objs (list): Instances to insert (primary keys must already be set).
+        ignore_conflicts (bool): Skip rows that violate a unique constraint,
+            by copying into a temporary table and inserting ON CONFLICT DO NOTHING.
+    Returns:
+        int: Number of rows inserted.
+    """
+    if not objs:
+        return 0
+    table = model._meta.db_table
+    fields = _copy_fields(model)
+    columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+    payload = encode_rows(objs, fields)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not ignore_conflicts:
+            cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT BINARY)", payload)
+            return cursor.rowcount
+        staging = f"{table}_copy_staging"
+        cursor.execute(f"CREATE TEMPORARY TABLE {staging} (LIKE {table}) ON COMMIT DROP")
+        cursor.copy_expert(f"COPY {staging} ({columns}) FROM STDIN WITH (FORMAT BINARY)", payload)
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} ON CONFLICT DO NOTHING"
+        )
+        inserted = cursor.rowcount
+        cursor.execute(f"DROP TABLE {staging}")
+        return inserted
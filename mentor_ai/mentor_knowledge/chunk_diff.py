@@ -0,0 +1,99 @@
+"""
+Diff of a video's re-chunked transcript against its stored chunks.
+
+Re-processing used to delete every chunk of the video and insert (and embed)
+them all again. Instead, new chunks are matched to stored rows with the same
+content hash; a matched row is reused as is, or updated in place when only
+its position, timing, token count or transcript offsets moved. Only new text is created (and
+embedded) and only rows left without a match are deleted.
+
+Rows with the same text are matched in chunk_index order, so repeated text
+(an intro, a catchphrase) keeps its relative position.
+"""
+import hashlib
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import List
+
+from mentor_knowledge.chunking_service import ChunkData
+
+
+def chunk_content_hash(text: str) -> str:
+    """
+    Args:
+        text (str): Chunk text, exactly as stored.
+    Returns:
+        str: Hex sha256 of the text.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class StoredChunk:
+    """The columns of a stored ContentChunk needed to diff it."""
+    id: object
+    chunk_index: int
+    content_hash: str
+    start_seconds: int | None
+    end_seconds: int | None
+    token_count: int | None
+    text_start: int | None = None
+    text_end: int | None = None
+
+
+@dataclass
+class ChunkDiff:
+    """How to turn the stored chunks of a video into the new ones."""
+    reused: List[StoredChunk] = field(default_factory=list)
+    updated: List[tuple] = field(default_factory=list)  # (StoredChunk, ChunkData)
+    created: List[ChunkData] = field(default_factory=list)
+    deleted: List[StoredChunk] = field(default_factory=list)
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Counts of chunks reused, updated, created and deleted.
+        """
+        return {
+            "chunks_reused": len(self.reused),
+            "chunks_updated": len(self.updated),
+            "chunks_created": len(self.created),
+            "chunks_deleted": len(self.deleted),
+        }
+
+
+def diff_chunks(stored: List[StoredChunk], chunks: List[ChunkData]) -> ChunkDiff:
+    """
+    Match new chunks to stored rows by content hash, in position order.
+    Args:
+        stored (List[StoredChunk]): The video's current chunks.
+        chunks (List[ChunkData]): The new chunks, with token_count set.
+    Returns:
+        ChunkDiff: Rows to keep, update and delete, and chunks to create.
+    """
+    by_hash = defaultdict(deque)
+    for row in sorted(stored, key=lambda row: row.chunk_index):
+        by_hash[row.content_hash].append(row)
+
+    diff = ChunkDiff()
+    for chunk in chunks:
+        candidates = by_hash.get(chunk_content_hash(chunk.text))
+        if not candidates:
+            diff.created.append(chunk)
+            continue
+        row = candidates.popleft()
+        position = (
+            chunk.chunk_index,
+            int(chunk.start_seconds),
+            int(chunk.end_seconds),
+            chunk.token_count,
+            chunk.text_start,
+            chunk.text_end,
+        )
+        if (row.chunk_index, row.start_seconds, row.end_seconds, row.token_count, row.text_start, row.text_end) == position:
+            diff.reused.append(row)
+        else:
+            diff.updated.append((row, chunk))
+
+    diff.deleted = [row for rows in by_hash.values() for row in rows]
+    return diff
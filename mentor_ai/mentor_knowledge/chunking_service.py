@@ -2,9 +2,23 @@
 Docstring for mentor_ai.mentor_knowledge.chunking_service
 """
 
-from typing import List, Dict
+import re
+from array import array
+from typing import Dict, Iterator, List
 from dataclasses import dataclass
 
+import numpy as np
+from django.conf import settings
+
+from mentor_knowledge.tokenizers import Tokenizer, get_tokenizer
+
+CHUNKING_MODE_WORDS = "words"
+CHUNKING_MODE_TOKENS = "tokens"
+CHUNKING_MODES = (CHUNKING_MODE_WORDS, CHUNKING_MODE_TOKENS)
+
+# A segment ending in terminal punctuation (optionally followed by closing quotes/brackets) ends a sentence.
+_SENTENCE_END_RE = re.compile(r"[.!?\u2026][\"')\]]*$")
+
 @dataclass
 class ChunkData:
     """Data structure for a content chunk."""
@@ -13,6 +27,10 @@ class ChunkData:
     start_seconds: float
     end_seconds: float
     word_count: int
+    token_count: int | None = None
+    # Character offsets into the normalized transcript, set for the "blob" text layout.
+    text_start: int | None = None
+    text_end: int | None = None
 
 class TranscriptChunker:
     """Service for chunking video transcripts into smaller segments."""
@@ -35,57 +53,61 @@ class TranscriptChunker:
         Returns:
             List[ChunkData]: List of chunked data.
         """
+        return list(self.iter_chunks(transcript))
+
+    def iter_chunks(self, transcript: List[Dict]) -> Iterator[ChunkData]:
+        """
+        Lazily yield the chunks of the given transcript, in order.
+        Args:
+            transcript (List[Dict]): List of transcript segments with 'text', 'start', and 'duration' keys.
+        Returns:
+            Iterator[ChunkData]: The chunks, identical to chunk_transcript().
+        """
         if not transcript:
-            return []
-        
-        words_with_time = self._build_words_timeline(transcript)
-        if not words_with_time:
-            return []
-        
-        chunks = []
+            return
+
+        timeline = self._build_words_timeline(transcript)
+        word_count = len(timeline)
+        if not word_count:
+            return
+
         chunk_index = 0
         start_idx = 0
 
-        while start_idx < len(words_with_time):
-            end_idx = min(start_idx + self.chunk_size, len(words_with_time))
-            chunk_words = words_with_time[start_idx:end_idx]
-            text = ' '.join([w['word'] for w in chunk_words])
-            start_seconds = chunk_words[0]['start']
-            end_seconds = chunk_words[-1]['end']
-
-            chunk_data = ChunkData(
-                text=text,
+        while start_idx < word_count:
+            end_idx = min(start_idx + self.chunk_size, word_count)
+            yield ChunkData(
+                text=timeline.text[timeline.word_starts[start_idx]:timeline.word_ends[end_idx - 1]],
                 chunk_index=chunk_index,
-                start_seconds=round(start_seconds, 2),
-                end_seconds=round(end_seconds, 2),
-                word_count=len(chunk_words)
+                start_seconds=round(float(timeline.starts[start_idx]), 2),
+                end_seconds=round(float(timeline.ends[end_idx - 1]), 2),
+                word_count=end_idx - start_idx
             )
 
-            chunks.append(chunk_data)
             start_idx = end_idx - self.overlap
             chunk_index += 1
 
-            if start_idx >= len(words_with_time) - self.overlap:
+            if start_idx >= word_count - self.overlap:
                 break
 
-        return chunks
-    
-    def _build_words_timeline(self, transcript: List[Dict]) -> List[Dict]:
+    def _build_words_timeline(self, transcript: List[Dict]) -> "WordTimeline":
         """
         Build a timeline of words with their start and end times from the transcript.
+        Each segment's duration is spread evenly over its words.
         Args:
             transcript (List[Dict]): List of transcript segments.
         Returns:
-            List[Dict]: List of words with their timing information.
+            WordTimeline: The words as one space-joined text plus per-word offsets and timings.
         """
-        words_timeline = []
+        texts = []
+        lengths = array('q')
+        segment_starts, segment_avgs, segment_sizes = array('d'), array('d'), array('q')
 
         for segment in transcript:
             text = segment.get('text', '').strip()
             start = segment.get('start', 0.0)
             duration = segment.get('duration', 0.0)
-            end = start + duration
-            
+
             if not text:
                 continue
 
@@ -93,16 +115,271 @@ class TranscriptChunker:
             if not segment_words:
                 continue
 
-            avg_word_duration = duration / len(segment_words) if len(segment_words) > 0 else 0
-
-            for i, word in enumerate(segment_words):
-                word_start = start + (i * avg_word_duration)
-                word_end = word_start + avg_word_duration
-                
-                words_timeline.append({
-                    'word': word,
-                    'start': word_start,
-                    'end': word_end
-                })
-        
-        return words_timeline
+            texts.append(' '.join(segment_words))
+            lengths.extend(map(len, segment_words))
+            segment_starts.append(start)
+            segment_avgs.append(duration / len(segment_words))
+            segment_sizes.append(len(segment_words))
+
+        if not texts:
+            return WordTimeline.empty()
+
+        sizes = np.frombuffer(segment_sizes, dtype=np.int64)
+        avgs = np.repeat(np.frombuffer(segment_avgs, dtype=np.float64), sizes)
+        # Position of every word inside its segment.
+        positions = np.arange(len(lengths), dtype=np.float64) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        # Same float64 operations as start + (i * avg), so timings match to the last bit.
+        starts = np.repeat(np.frombuffer(segment_starts, dtype=np.float64), sizes) + positions * avgs
+
+        lengths = np.frombuffer(lengths, dtype=np.int64)
+        # Every word is followed by one separating space in the joined text.
+        word_ends = np.cumsum(lengths + 1) - 1
+        return WordTimeline(
+            text=' '.join(texts),
+            word_starts=word_ends - lengths,
+            word_ends=word_ends,
+            starts=starts,
+            ends=starts + avgs,
+        )
+
+
+@dataclass(frozen=True)
+class WordTimeline:
+    """
+    Words of a transcript in parallel arrays instead of one object per word.
+    `text` holds all words joined by single spaces; word i is
+    text[word_starts[i]:word_ends[i]] and is spoken from starts[i] to ends[i] seconds.
+    """
+    text: str
+    word_starts: np.ndarray
+    word_ends: np.ndarray
+    starts: np.ndarray
+    ends: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "WordTimeline":
+        offsets = np.zeros(0, dtype=np.int64)
+        timings = np.zeros(0, dtype=np.float64)
+        return cls(text='', word_starts=offsets, word_ends=offsets, starts=timings, ends=timings)
+
+    def __len__(self) -> int:
+        return len(self.word_starts)
+
+
+class TokenBudgetChunker:
+    """
+    Chunk transcripts to a token budget instead of a word count.
+    Transcript segments are kept whole (a segment over the budget is split
+    into even word runs), and a chunk that would overflow ends at its last
+    sentence end or pause (a gap between segments) if that leaves it at
+    least half full. Every chunk carries its token count.
+    """
+
+    def __init__(
+        self,
+        chunk_size_tokens: int = 400,
+        overlap_tokens: int = 50,
+        pause_seconds: float = 1.0,
+        tokenizer: Tokenizer | None = None,
+    ):
+        """
+        Args:
+            chunk_size_tokens (int): Token budget per chunk.
+            overlap_tokens (int): Most tokens of whole segments repeated at the start of the next chunk.
+            pause_seconds (float): Silence between two segments that counts as a boundary.
+            tokenizer (Tokenizer | None): Token counter; defaults to get_tokenizer().
+        """
+        self.chunk_size = chunk_size_tokens
+        self.overlap = overlap_tokens
+        self.pause_seconds = pause_seconds
+        self.tokenizer = tokenizer or get_tokenizer()
+
+    def chunk_transcript(self, transcript: List[Dict]) -> List[ChunkData]:
+        """
+        Chunk the given transcript to the token budget.
+        Args:
+            transcript (List[Dict]): List of transcript segments with 'text', 'start', and 'duration' keys.
+        Returns:
+            List[ChunkData]: List of chunked data, with token_count set.
+        """
+        return list(self.iter_chunks(transcript))
+
+    def iter_chunks(self, transcript: List[Dict]) -> Iterator[ChunkData]:
+        """
+        Lazily yield the chunks of the given transcript, in order.
+        Args:
+            transcript (List[Dict]): List of transcript segments with 'text', 'start', and 'duration' keys.
+        Returns:
+            Iterator[ChunkData]: The chunks, identical to chunk_transcript().
+        """
+        units = self._build_units(transcript or [])
+        unit_count = len(units)
+        if not unit_count:
+            return
+
+        # cumulative[k] is the token count of units[:k].
+        cumulative = np.concatenate(([0], np.cumsum(units.tokens)))
+        words = np.concatenate(([0], np.cumsum(units.words)))
+        boundaries = np.flatnonzero(units.boundaries)
+
+        chunk_index = 0
+        start = 0
+        while True:
+            # Most whole units within the budget, but always at least one.
+            fits = int(np.searchsorted(cumulative, cumulative[start] + self.chunk_size, side='right')) - 1
+            end = max(fits, start + 1)
+            if end < unit_count:
+                # Cut after the last boundary unit instead, unless that leaves the chunk under half full.
+                half_full = int(np.searchsorted(cumulative, cumulative[start] + self.chunk_size // 2, side='left'))
+                last = int(np.searchsorted(boundaries, end - 1, side='right')) - 1
+                if last >= 0 and boundaries[last] + 1 >= max(half_full, start + 1):
+                    end = int(boundaries[last]) + 1
+
+            text = ' '.join(units.texts[start:end])
+            if self.tokenizer.exact:
+                token_count = self.tokenizer.count(text)
+            else:
+                # Approximate counts add up across the joining spaces, so the text need not be recounted.
+                token_count = int(cumulative[end] - cumulative[start])
+            yield ChunkData(
+                text=text,
+                chunk_index=chunk_index,
+                start_seconds=round(float(units.starts[start]), 2),
+                end_seconds=round(float(units.ends[end - 1]), 2),
+                word_count=int(words[end] - words[start]),
+                token_count=token_count,
+            )
+            if end >= unit_count:
+                break
+
+            # Repeat the trailing units worth at most `overlap` tokens, always moving forward.
+            overlap_start = int(np.searchsorted(cumulative, cumulative[end] - self.overlap, side='left'))
+            start = max(overlap_start, start + 1)
+            chunk_index += 1
+
+    def _build_units(self, transcript: List[Dict]) -> "SegmentUnits":
+        """
+        Turn transcript segments into the units chunks are built from.
+        Args:
+            transcript (List[Dict]): List of transcript segments.
+        Returns:
+            SegmentUnits: Non-empty segments (over-budget ones split) with timings,
+                token/word counts and whether a sentence end or pause follows them.
+        """
+        texts, starts, ends, sentence_ends = [], array('d'), array('d'), []
+        for segment in transcript:
+            segment_words = segment.get('text', '').split()
+            if not segment_words:
+                continue
+            start = segment.get('start', 0.0)
+            texts.append(' '.join(segment_words))
+            starts.append(start)
+            ends.append(start + segment.get('duration', 0.0))
+            sentence_ends.append(_SENTENCE_END_RE.search(texts[-1]) is not None)
+
+        if not texts:
+            return SegmentUnits.empty()
+
+        starts = np.frombuffer(starts, dtype=np.float64)
+        ends = np.frombuffer(ends, dtype=np.float64)
+        boundaries = np.array(sentence_ends, dtype=bool)
+        boundaries[:-1] |= starts[1:] - ends[:-1] >= self.pause_seconds
+        boundaries[-1] = True
+        tokens = self.tokenizer.count_many(texts)
+
+        if max(tokens) <= self.chunk_size:
+            return SegmentUnits(
+                texts=texts,
+                starts=starts,
+                ends=ends,
+                tokens=np.array(tokens, dtype=np.int64),
+                words=np.array([text.count(' ') + 1 for text in texts], dtype=np.int64),
+                boundaries=boundaries,
+            )
+
+        # Rare: split segments over the budget into even word runs with interpolated timings.
+        pieces = []
+        for text, start, end, segment_tokens, boundary in zip(texts, starts, ends, tokens, boundaries):
+            if segment_tokens <= self.chunk_size:
+                pieces.append((text, start, end, segment_tokens, text.count(' ') + 1, boundary))
+                continue
+            segment_words = text.split()
+            # A run per chunk_size tokens, but never more runs than words: a run must not be empty.
+            run_count = min(-(-segment_tokens // self.chunk_size), len(segment_words))
+            runs = [run for run in np.array_split(np.arange(len(segment_words)), run_count) if len(run)]
+            step = (end - start) / len(segment_words)
+            for position, run in enumerate(runs):
+                piece = ' '.join(segment_words[run[0]:run[-1] + 1])
+                pieces.append((
+                    piece,
+                    start + run[0] * step,
+                    start + (run[-1] + 1) * step,
+                    self.tokenizer.count(piece),
+                    len(run),
+                    boundary and position == len(runs) - 1,
+                ))
+        texts, starts, ends, tokens, words, boundaries = zip(*pieces)
+        return SegmentUnits(
+            texts=list(texts),
+            starts=np.array(starts, dtype=np.float64),
+            ends=np.array(ends, dtype=np.float64),
+            tokens=np.array(tokens, dtype=np.int64),
+            words=np.array(words, dtype=np.int64),
+            boundaries=np.array(boundaries, dtype=bool),
+        )
+
+
+@dataclass(frozen=True)
+class SegmentUnits:
+    """
+    Transcript segments as parallel arrays: unit i is texts[i], spoken from
+    starts[i] to ends[i] seconds, with tokens[i] tokens and words[i] words;
+    boundaries[i] is True when a sentence end or pause follows it.
+    """
+    texts: List[str]
+    starts: np.ndarray
+    ends: np.ndarray
+    tokens: np.ndarray
+    words: np.ndarray
+    boundaries: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "SegmentUnits":
+        counts = np.zeros(0, dtype=np.int64)
+        timings = np.zeros(0, dtype=np.float64)
+        return cls(
+            texts=[],
+            starts=timings,
+            ends=timings,
+            tokens=counts,
+            words=counts,
+            boundaries=np.zeros(0, dtype=bool),
+        )
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+
+def get_transcript_chunker(mode: str | None = None):
+    """
+    Build the chunker for the configured chunking mode.
+    Args:
+        mode (str | None): "words" or "tokens"; defaults to settings.CHUNKING_MODE.
+    Returns:
+        TranscriptChunker | TokenBudgetChunker: The chunker.
+    Raises:
+        ValueError: If the mode is unknown.
+    """
+    mode = (mode or settings.CHUNKING_MODE).strip().lower()
+    if mode == CHUNKING_MODE_WORDS:
+        return TranscriptChunker(
+            chunk_size_words=settings.CHUNK_SIZE_WORDS,
+            overlap_words=settings.CHUNK_OVERLAP_WORDS,
+        )
+    if mode == CHUNKING_MODE_TOKENS:
+        return TokenBudgetChunker(
+            chunk_size_tokens=settings.CHUNK_SIZE_TOKENS,
+            overlap_tokens=settings.CHUNK_OVERLAP_TOKENS,
+            pause_seconds=settings.CHUNK_PAUSE_SECONDS,
+        )
+    raise ValueError(f"chunking mode must be one of: {', '.join(CHUNKING_MODES)}")
@@ -0,0 +1,111 @@
+"""
+Compact (quantized) copies of ContentChunk.embedding.
+
+Retrieval can find candidates on a compact column, whose index is a fraction
+of the size of the full-precision one, and then rescore a small oversampled
+candidate set against the full vectors.
+
+- "halfvec": float16 copy (half the size), ranked by cosine distance.
+- "bit": binary quantization, one bit per dimension (1/32 of the size), ranked by Hamming distance.
+- "short": L2-normalized Matryoshka prefix (the first EMBEDDING_SHORT_DIMENSIONS
+  values), ranked by cosine distance. Only meaningful for models trained to keep
+  the leading dimensions informative, such as text-embedding-3-*.
+"""
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+from django.conf import settings
+from pgvector import Bit, HalfVector
+from pgvector.django import CosineDistance, HammingDistance
+
+COMPACT_HALFVEC = "halfvec"
+COMPACT_BIT = "bit"
+COMPACT_SHORT = "short"
+
+
+def _binary_quantize(embedding) -> str:
+    return Bit(np.asarray(embedding) > 0).to_text()
+
+
+def _matryoshka_prefix(embedding) -> np.ndarray:
+    prefix = np.asarray(embedding, dtype=np.float32)[:settings.EMBEDDING_SHORT_DIMENSIONS]
+    norm = np.linalg.norm(prefix)
+    return prefix / norm if norm else prefix
+
+
+@dataclass(frozen=True)
+class CompactType:
+    """How one compact representation is stored, queried and backfilled."""
+    name: str
+    field: str
+    encode: Callable
+    distance: Callable
+    # SQL expression deriving the compact value from the full `embedding` column.
+    backfill_sql: Callable[[], str]
+
+    def distance_to(self, query_embedding):
+        """Distance expression between the compact column and a full-precision query."""
+        return self.distance(self.field, self.encode(query_embedding))
+
+
+COMPACT_TYPES = {
+    COMPACT_HALFVEC: CompactType(
+        name=COMPACT_HALFVEC,
+        field="embedding_half",
+        encode=HalfVector,
+        distance=CosineDistance,
+        backfill_sql=lambda: f"embedding::halfvec({settings.EMBEDDING_DIMENSIONS})",
+    ),
+    COMPACT_BIT: CompactType(
+        name=COMPACT_BIT,
+        field="embedding_bit",
+        encode=_binary_quantize,
+        distance=HammingDistance,
+        backfill_sql=lambda: f"binary_quantize(embedding)::bit({settings.EMBEDDING_DIMENSIONS})",
+    ),
+    COMPACT_SHORT: CompactType(
+        name=COMPACT_SHORT,
+        field="embedding_short",
+        encode=_matryoshka_prefix,
+        distance=CosineDistance,
+        backfill_sql=lambda: (
+            f"l2_normalize(subvector(embedding, 1, {settings.EMBEDDING_SHORT_DIMENSIONS}))"
+            f"::vector({settings.EMBEDDING_SHORT_DIMENSIONS})"
+        ),
+    ),
+}
+
+
+def get_compact_type(name: str) -> CompactType:
+    """
+    Look up a compact representation by name.
+    Args:
+        name (str): "halfvec", "bit" or "short".
+    Returns:
+        CompactType: The compact type definition.
+    """
+    try:
+        return COMPACT_TYPES[name.strip().lower()]
+    except KeyError:
+        raise ValueError(
+            f"Unknown compact embedding type '{name}'. Expected one of: {', '.join(COMPACT_TYPES)}"
+        )
+
+
+def compact_field_values(embedding, names: list[str] | None = None) -> dict:
+    """
+    Build the compact column values for a full-precision embedding.
+    Args:
+        embedding: The full-precision embedding.
+        names (list[str], optional): Compact types to fill. Defaults to settings.EMBEDDING_COMPACT_TYPES.
+    Returns:
+        dict: Mapping of ContentChunk field name to value, ready to pass to the model.
+    """
+    names = settings.EMBEDDING_COMPACT_TYPES if names is None else names
+    if embedding is None:
+        return {}
+    return {
+        compact.field: compact.encode(embedding)
+        for compact in (get_compact_type(name) for name in names)
+    }
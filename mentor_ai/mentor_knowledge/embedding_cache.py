@@ -0,0 +1,72 @@
+"""
+Persistent, content-addressed cache of chunk embeddings (EmbeddingCacheEntry).
+
+Entries are keyed by sha256(model, dimensions, normalized text), so a retry,
+a re-queue or a --process-all-new re-run only sends texts that were never
+embedded with the current model and dimensions.
+"""
+import hashlib
+import unicodedata
+from dataclasses import dataclass
+
+from mentor_knowledge.binary_copy import copy_insert
+from mentor_knowledge.models import EmbeddingCacheEntry
+
+
+@dataclass(frozen=True)
+class EmbeddingCacheStats:
+    """Cache outcome of one embedding batch."""
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalize and collapse whitespace, so trivially different copies share a cache entry."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def embedding_cache_key(model: str, dimensions: int, normalized_text: str) -> str:
+    """
+    Args:
+        model (str): The embedding model.
+        dimensions (int): The requested embedding dimensions.
+        normalized_text (str): Text already passed through normalize_text().
+    Returns:
+        str: Hex sha256 cache key.
+    """
+    payload = f"{model}\0{dimensions}\0{normalized_text}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def get_cached_embeddings(keys) -> dict:
+    """
+    Look up many cache keys in one query.
+    Args:
+        keys (Iterable[str]): Cache keys.
+    Returns:
+        dict: Mapping of key to embedding (float32 np.ndarray) for the keys that are cached.
+    """
+    return dict(EmbeddingCacheEntry.objects.filter(key__in=list(keys)).values_list("key", "embedding"))
+
+
+def store_embeddings(*, model: str, dimensions: int, embeddings: dict) -> None:
+    """
+    Persist freshly generated embeddings; keys written concurrently by another worker are skipped.
+    Args:
+        model (str): The embedding model.
+        dimensions (int): The requested embedding dimensions.
+        embeddings (dict): Mapping of cache key to embedding.
+    """
+    copy_insert(
+        EmbeddingCacheEntry,
+        [
+            EmbeddingCacheEntry(key=key, model=model, dimensions=dimensions, embedding=embedding)
+            for key, embedding in embeddings.items()
+        ],
+        ignore_conflicts=True,
+    )
@@ -0,0 +1,253 @@
+"""
+Cross-video embedding coalescer for backfills.
+
+With EMBEDDING_COALESCE_ENABLED, video processing stores its chunks without
+embeddings and pushes their ids onto a Redis list instead of embedding them
+itself. flush_embedding_queue_task pops the pending ids of many videos in
+full batches (EMBEDDING_COALESCE_BATCH_SIZE), embeds them together, writes
+the vectors back to the ContentChunk rows, and activates each video's chunk
+generation (see generations.py), marking it READY, once none of the
+generation's chunks is missing an embedding.
+
+A batch is flushed as soon as the queue holds a full one; a partial batch is
+flushed EMBEDDING_COALESCE_MAX_WAIT_SECONDS after the first id of the window
+was queued, so a lone short video is never stuck waiting for company.
+Videos stay in the EMBEDDED status while their chunks are queued; vector
+search already skips chunks whose embedding is NULL.
+
+Ids popped by a worker that dies before writing the vectors are lost from
+the queue, but the rows still say what is missing. A Redis hash tracks every
+queued id: 0 while it waits in the queue, the pop time while a worker embeds
+it; the id is dropped once its batch is written. Beat runs
+requeue_unembedded_chunks_task, which queues again the NULL-embedding chunks
+of EMBEDDED (not yet activated) videos written more than
+EMBEDDING_COALESCE_SWEEP_SECONDS ago that are untracked or were popped longer
+ago than that, so ids still waiting in a long backlog are never duplicated.
+A chunk queued twice is embedded once.
+"""
+import logging
+import time
+from datetime import timedelta
+from itertools import islice
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from mentor_knowledge.compact_embeddings import compact_field_values
+from mentor_knowledge.generations import activate_generation
+from mentor_knowledge.models import ContentChunk, VideoContent
+from mentor_knowledge.transcript_store import slice_chunk_texts
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = "embedding:pending"
+# Exists while a deadline flush is scheduled for the current window.
+DEADLINE_KEY = "embedding:pending:deadline"
+# Queued id -> 0 while it waits in the queue, or the time it was popped.
+TRACKED_KEY = "embedding:pending:tracked"
+
+# KEYS: queue, tracked hash. ARGV: batch size, pop time.
+_POP_SCRIPT = """
+local ids = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+redis.call('LTRIM', KEYS[1], tonumber(ARGV[1]), -1)
+for _, id in ipairs(ids) do
+    redis.call('HSET', KEYS[2], id, ARGV[2])
+end
+return ids
+"""
+
+_client = None
+
+
+def _redis():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.EMBEDDING_COALESCE_REDIS_URL)
+    return _client
+
+
+def enqueue_chunks(chunk_ids) -> None:
+    """
+    Queue chunks for coalesced embedding and schedule the flush that will pick them up.
+    Args:
+        chunk_ids (Iterable): Ids of ContentChunk rows whose embedding is NULL.
+    """
+    # Imported here: tasks import the video processing service, which imports this module.
+    from mentor_knowledge.tasks import flush_embedding_queue_task
+
+    chunk_ids = [str(chunk_id) for chunk_id in chunk_ids]
+    if not chunk_ids:
+        return
+    client = _redis()
+    pipeline = client.pipeline(transaction=True)
+    pipeline.hset(TRACKED_KEY, mapping=dict.fromkeys(chunk_ids, 0))
+    pipeline.rpush(QUEUE_KEY, *chunk_ids)
+    _, pending = pipeline.execute()
+    if pending >= settings.EMBEDDING_COALESCE_BATCH_SIZE:
+        flush_embedding_queue_task.delay()
+    max_wait = settings.EMBEDDING_COALESCE_MAX_WAIT_SECONDS
+    if client.set(DEADLINE_KEY, 1, nx=True, ex=max(1, round(max_wait))):
+        flush_embedding_queue_task.apply_async(kwargs={"force": True}, countdown=max_wait)
+
+
+def _pop_batch(batch_size: int) -> list[str]:
+    """Atomically take up to batch_size ids off the head of the queue, recording when."""
+    pop = _redis().register_script(_POP_SCRIPT)
+    ids = pop(keys=[QUEUE_KEY, TRACKED_KEY], args=[batch_size, time.time()])
+    return [chunk_id.decode() for chunk_id in ids]
+
+
+def _requeue(chunk_ids: list[str]) -> None:
+    # Back to the head, so a failed batch keeps its place in line.
+    pipeline = _redis().pipeline(transaction=True)
+    pipeline.hset(TRACKED_KEY, mapping=dict.fromkeys(chunk_ids, 0))
+    pipeline.lpush(QUEUE_KEY, *reversed(chunk_ids))
+    pipeline.execute()
+
+
+def _untrack(chunk_ids: list[str]) -> None:
+    _redis().hdel(TRACKED_KEY, *chunk_ids)
+
+
+def embed_chunk_batch(chunk_ids: list[str], embedding_service) -> dict:
+    """
+    Embed the still-pending chunks among chunk_ids and write the vectors back.
+    Chunks deleted or already embedded since they were queued are skipped.
+    Args:
+        chunk_ids (list[str]): Queued chunk ids.
+        embedding_service (EmbeddingService): Service producing the embeddings.
+    Returns:
+        dict: Id of each video whose chunks were updated -> newest generation among them.
+    """
+    rows = list(
+        ContentChunk.objects
+        .filter(id__in=chunk_ids, embedding__isnull=True)
+        .values("id", "video_id", "generation", "text", "text_start", "text_end", "token_count")
+    )
+    if not rows:
+        return {}
+
+    # Chunks in the "blob" text layout are sliced from their video's transcript.
+    sliced = slice_chunk_texts([
+        (row["video_id"], row["generation"], row["text_start"], row["text_end"]) for row in rows
+    ])
+    embeddings = embedding_service.generate_embeddings_batch(
+        [text if text is not None else row["text"] for row, text in zip(rows, sliced)],
+        token_counts=[row["token_count"] for row in rows],
+    )
+    chunks = [
+        ContentChunk(id=row["id"], embedding=embedding, **compact_field_values(embedding))
+        for row, embedding in zip(rows, embeddings)
+    ]
+    fields = ["embedding", *compact_field_values(embeddings[0])]
+    with transaction.atomic():
+        ContentChunk.objects.bulk_update(chunks, fields)
+
+    video_generations = {}
+    for row in rows:
+        video_id, generation = row["video_id"], row["generation"]
+        video_generations[video_id] = max(generation, video_generations.get(video_id, generation))
+    return video_generations
+
+
+def mark_ready_videos(video_generations: dict) -> list:
+    """
+    Activate the generation of EMBEDDED videos once none of its chunks is missing an embedding.
+    Args:
+        video_generations (dict): Candidate video id -> generation whose chunks were embedded.
+    Returns:
+        list: Ids of the videos cut over to that generation (and marked READY).
+    """
+    ready = []
+    for video_id, generation in video_generations.items():
+        pending = ContentChunk.objects.filter(video_id=video_id, generation=generation, embedding__isnull=True)
+        with transaction.atomic():
+            if not pending.exists() and activate_generation(video_id, generation):
+                ready.append(video_id)
+    return ready
+
+
+def flush_pending(embedding_service, *, force: bool = False) -> dict:
+    """
+    Embed queued chunks in full batches; with force, also the final partial batch.
+    Args:
+        embedding_service (EmbeddingService): Service producing the embeddings.
+        force (bool): Flush a partial batch too (the deadline has passed).
+    Returns:
+        dict: Counts of batches, chunks embedded and videos marked READY.
+    """
+    batch_size = settings.EMBEDDING_COALESCE_BATCH_SIZE
+    client = _redis()
+    stats = {"batches": 0, "chunks": 0, "videos_ready": 0}
+    if force:
+        # Ids queued from now on open a new window with its own deadline.
+        client.delete(DEADLINE_KEY)
+
+    while True:
+        pending = client.llen(QUEUE_KEY)
+        if pending == 0 or (pending < batch_size and not force):
+            break
+        chunk_ids = _pop_batch(batch_size)
+        try:
+            video_generations = embed_chunk_batch(chunk_ids, embedding_service)
+        except Exception:
+            _requeue(chunk_ids)
+            raise
+        ready = mark_ready_videos(video_generations)
+        _untrack(chunk_ids)
+        stats["batches"] += 1
+        stats["chunks"] += len(chunk_ids)
+        stats["videos_ready"] += len(ready)
+        logger.info(
+            "Coalesced embedding batch | chunks=%s videos=%s videos_ready=%s cache_hit_ratio=%.2f",
+            len(chunk_ids),
+            len(video_generations),
+            len(ready),
+            embedding_service.last_cache_stats.hit_ratio,
+        )
+    return stats
+
+
+def _lost_chunk_ids(chunk_ids: list, popped_before: float) -> list:
+    """The ids among chunk_ids that are neither waiting in the queue nor popped since popped_before."""
+    tracked = _redis().hmget(TRACKED_KEY, [str(chunk_id) for chunk_id in chunk_ids])
+    return [
+        chunk_id for chunk_id, state in zip(chunk_ids, tracked)
+        if state is None or 0 < float(state) < popped_before
+    ]
+
+
+def requeue_unembedded_chunks(batch_size: int | None = None) -> int:
+    """
+    Queue again the chunks whose ids were lost from the queue (e.g. popped by a worker
+    that died before writing their vectors): those still without an embedding, of videos
+    waiting for their generation to be activated, written more than
+    EMBEDDING_COALESCE_SWEEP_SECONDS ago, and neither still queued nor popped within that time.
+    Args:
+        batch_size (int | None): Ids pushed per enqueue; defaults to EMBEDDING_COALESCE_BATCH_SIZE.
+    Returns:
+        int: Number of chunks queued.
+    """
+    batch_size = batch_size or settings.EMBEDDING_COALESCE_BATCH_SIZE
+    popped_before = time.time() - settings.EMBEDDING_COALESCE_SWEEP_SECONDS
+    written_before = timezone.now() - timedelta(seconds=settings.EMBEDDING_COALESCE_SWEEP_SECONDS)
+    chunk_ids = (
+        ContentChunk.objects
+        .filter(
+            embedding__isnull=True,
+            created_at__lte=written_before,
+            video__status=VideoContent.Status.EMBEDDED,
+        )
+        .values_list("id", flat=True)
+        .iterator(chunk_size=batch_size)
+    )
+    queued = 0
+    while batch := list(islice(chunk_ids, batch_size)):
+        lost = _lost_chunk_ids(batch, popped_before)
+        enqueue_chunks(lost)
+        queued += len(lost)
+    if queued:
+        logger.warning("Unembedded chunks queued again | chunks=%s", queued)
+    return queued
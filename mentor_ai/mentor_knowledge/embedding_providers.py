@@ -0,0 +1,231 @@
+"""
+Embedding providers, selected with settings.EMBEDDING_PROVIDER.
+
+- "openai": the OpenAI embeddings API (the production provider).
+- "local": deterministic hashed character n-gram vectors computed with NumPy.
+  They carry lexical similarity only, need no network and cost nothing, which
+  makes them suitable for load tests and ingestion/chat benchmarks, not for
+  real answers.
+
+Any provider can be wrapped in LatencyEmbeddingProvider
+(EMBEDDING_PROVIDER_LATENCY_MS / EMBEDDING_PROVIDER_LATENCY_PER_INPUT_MS) to
+simulate the round trip of a remote API.
+"""
+import asyncio
+import base64
+import time
+import unicodedata
+
+import numpy as np
+from django.conf import settings
+from openai import AsyncOpenAI, OpenAI
+
+# Models trained with Matryoshka representation learning accept a `dimensions` argument.
+_MATRYOSHKA_MODEL_PREFIX = "text-embedding-3"
+
+
+def embedding_dimensions_kwargs(model: str) -> dict:
+    """
+    Extra embeddings.create() arguments that request settings.EMBEDDING_DIMENSIONS.
+    Args:
+        model (str): The embedding model name.
+    Returns:
+        dict: {"dimensions": ...} for models that support shortening, otherwise {}.
+    """
+    if model.startswith(_MATRYOSHKA_MODEL_PREFIX):
+        return {"dimensions": settings.EMBEDDING_DIMENSIONS}
+    return {}
+
+
+class EmbeddingProvider:
+    """
+    Interface of an embedding provider.
+    Attributes:
+        model (str): Model identifier; part of every embedding cache key.
+        rate_limited (bool): Whether calls draw from the shared OpenAI RPM/TPM budget.
+    """
+    model: str
+    rate_limited = False
+
+    def embed(self, texts: list[str], timeout: float | None = None) -> list[np.ndarray]:
+        """
+        Args:
+            texts (list[str]): Texts to embed.
+            timeout (float, optional): Request timeout in seconds, where applicable.
+        Returns:
+            list[np.ndarray]: One float32 embedding per text, in input order.
+        """
+        raise NotImplementedError
+
+    async def embed_async(self, texts: list[str]) -> list[np.ndarray]:
+        """Asynchronous embed(); providers without I/O simply compute inline."""
+        return self.embed(texts)
+
+    async def aclose(self) -> None:
+        """Release resources bound to the current event loop."""
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """
+    Embeddings from the OpenAI API.
+    Vectors are requested base64-encoded (little-endian float32) and decoded
+    with np.frombuffer, so no JSON float list or Python float objects are built.
+    """
+    rate_limited = True
+
+    def __init__(self, model: str | None = None):
+        self.model = model or settings.EMBEDDING_MODEL
+        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self._async_client = None
+        self._async_loop = None
+
+    @staticmethod
+    def _decode(embedding) -> np.ndarray:
+        if isinstance(embedding, str):
+            return np.frombuffer(base64.b64decode(embedding), dtype="<f4")
+        return np.asarray(embedding, dtype=np.float32)
+
+    @classmethod
+    def _in_order(cls, response) -> list[np.ndarray]:
+        # Sort embeddings by index, as OpenAI may return them out of order
+        return [cls._decode(item.embedding) for item in sorted(response.data, key=lambda x: x.index)]
+
+    def embed(self, texts, timeout=None):
+        extra = {"timeout": timeout} if timeout is not None else {}
+        response = self.client.embeddings.create(
+            input=texts,
+            model=self.model,
+            encoding_format="base64",
+            **embedding_dimensions_kwargs(self.model),
+            **extra,
+        )
+        return self._in_order(response)
+
+    async def embed_async(self, texts):
+        # The async client is bound to the event loop it first runs on.
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+            self._async_loop = loop
+        response = await self._async_client.embeddings.create(
+            input=texts,
+            model=self.model,
+            encoding_format="base64",
+            **embedding_dimensions_kwargs(self.model)
+        )
+        return self._in_order(response)
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+            self._async_loop = None
+
+
+class LocalHashEmbeddingProvider(EmbeddingProvider):
+    """
+    Deterministic feature-hashing embeddings.
+    Every character n-gram of the normalized, lowercased text is hashed (a
+    multiplicative hash, identical in every process) into one of `dimensions`
+    buckets with a +/-1 sign; the counts are L2-normalized. A whole batch is
+    hashed and accumulated with array operations, without a per-n-gram loop.
+    """
+    NGRAM = 3
+    # Odd 64-bit constants of the multiplicative (Fibonacci) hash.
+    _BUCKET_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+    _SIGN_MULTIPLIER = np.uint64(0xC2B2AE3D27D4EB4F)
+
+    def __init__(self, model: str | None = None, dimensions: int | None = None):
+        self.dimensions = dimensions or settings.EMBEDDING_DIMENSIONS
+        self.model = f"local-hash-{self.NGRAM}gram"
+
+    def _ngram_codes(self, text: str) -> np.ndarray:
+        words = unicodedata.normalize("NFC", text).lower().split()
+        if not words:
+            return np.zeros(0, dtype=np.uint64)
+        # Padding gives the first and last words their own boundary n-grams.
+        normalized = " " + " ".join(words) + " "
+        data = np.frombuffer(normalized.encode("utf-8"), dtype=np.uint8).astype(np.uint64)
+        if data.size < self.NGRAM:
+            return data
+        codes = np.zeros(data.size - self.NGRAM + 1, dtype=np.uint64)
+        for offset in range(self.NGRAM):
+            codes = (codes << np.uint64(8)) | data[offset:offset + codes.size]
+        return codes
+
+    def embed(self, texts, timeout=None):
+        per_text = [self._ngram_codes(text) for text in texts]
+        codes = np.concatenate(per_text) if per_text else np.zeros(0, dtype=np.uint64)
+        rows = np.repeat(np.arange(len(texts)), [c.size for c in per_text])
+
+        with np.errstate(over="ignore"):
+            buckets = ((codes * self._BUCKET_MULTIPLIER) >> np.uint64(32)) % np.uint64(self.dimensions)
+            signs = np.where(((codes * self._SIGN_MULTIPLIER) >> np.uint64(63)) == 1, -1.0, 1.0)
+
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        np.add.at(vectors, (rows, buckets.astype(np.intp)), signs.astype(np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return list(vectors / norms)
+
+
+class LatencyEmbeddingProvider(EmbeddingProvider):
+    """
+    Adds a fixed plus per-input delay to another provider's calls.
+    Args:
+        inner (EmbeddingProvider): The provider producing the embeddings.
+        latency_ms (float): Delay per call.
+        per_input_ms (float): Additional delay per input text.
+    """
+
+    def __init__(self, inner: EmbeddingProvider, latency_ms: float, per_input_ms: float = 0.0):
+        self.inner = inner
+        self.model = inner.model
+        self.rate_limited = inner.rate_limited
+        self.latency_ms = latency_ms
+        self.per_input_ms = per_input_ms
+
+    def _delay(self, texts) -> float:
+        return (self.latency_ms + self.per_input_ms * len(texts)) / 1000
+
+    def embed(self, texts, timeout=None):
+        time.sleep(self._delay(texts))
+        return self.inner.embed(texts, timeout=timeout)
+
+    async def embed_async(self, texts):
+        await asyncio.sleep(self._delay(texts))
+        return await self.inner.embed_async(texts)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+EMBEDDING_PROVIDERS = {
+    "openai": OpenAIEmbeddingProvider,
+    "local": LocalHashEmbeddingProvider,
+}
+
+
+def get_embedding_provider(name: str | None = None, model: str | None = None) -> EmbeddingProvider:
+    """
+    Build the configured embedding provider, wrapped with simulated latency if configured.
+    Args:
+        name (str, optional): "openai" or "local". Defaults to settings.EMBEDDING_PROVIDER.
+        model (str, optional): Model for providers that take one. Defaults to settings.EMBEDDING_MODEL.
+    Returns:
+        EmbeddingProvider: The provider.
+    """
+    name = (name or settings.EMBEDDING_PROVIDER).strip().lower()
+    try:
+        provider = EMBEDDING_PROVIDERS[name](model=model)
+    except KeyError:
+        raise ValueError(
+            f"Unknown embedding provider '{name}'. Expected one of: {', '.join(EMBEDDING_PROVIDERS)}"
+        )
+    if settings.EMBEDDING_PROVIDER_LATENCY_MS or settings.EMBEDDING_PROVIDER_LATENCY_PER_INPUT_MS:
+        provider = LatencyEmbeddingProvider(
+            provider,
+            latency_ms=settings.EMBEDDING_PROVIDER_LATENCY_MS,
+            per_input_ms=settings.EMBEDDING_PROVIDER_LATENCY_PER_INPUT_MS,
+        )
+    return provider
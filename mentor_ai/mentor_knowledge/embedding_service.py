@@ -1,46 +1,218 @@
-from openai import OpenAI
+import asyncio
+import logging
+import math
+
+import numpy as np
+from openai import APIConnectionError, InternalServerError, RateLimitError
 from django.conf import settings
-from typing import List
+from typing import List, Optional
+
+from mentor_knowledge.embedding_cache import (
+    EmbeddingCacheStats,
+    embedding_cache_key,
+    get_cached_embeddings,
+    normalize_text,
+    store_embeddings,
+)
+from mentor_knowledge.embedding_providers import get_embedding_provider
+from mentor_knowledge.rate_limit import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# Errors worth retrying a sub-batch for; anything else (e.g. a bad request) fails at once.
+RETRYABLE_ERRORS = (APIConnectionError, InternalServerError, RateLimitError)
+# Conservative bytes-per-token ratio used to estimate input tokens without a tokenizer.
+_BYTES_PER_TOKEN = 3
+
+def estimate_tokens(text: str) -> int:
+    """
+    Upper-bound estimate of the tokens a text is billed as.
+    Args:
+        text (str): The input text.
+    Returns:
+        int: Estimated token count (at least 1).
+    """
+    return max(1, math.ceil(len(text.encode("utf-8")) / _BYTES_PER_TOKEN))
+
+
+def token_counts_or_estimates(texts: List[str], token_counts: Optional[List[Optional[int]]] = None) -> List[int]:
+    """
+    Token count of every input: the precomputed count where there is one, estimate_tokens() otherwise.
+    Args:
+        texts (List[str]): The inputs, in order.
+        token_counts (List[Optional[int]] | None): Known counts (e.g. ContentChunk.token_count), aligned with texts.
+    Returns:
+        List[int]: Token count of each input.
+    """
+    if token_counts is None:
+        return [estimate_tokens(text) for text in texts]
+    return [
+        count if count is not None else estimate_tokens(text)
+        for text, count in zip(texts, token_counts)
+    ]
+
+
+def split_batches(
+    texts: List[str],
+    max_inputs: int,
+    max_tokens: int,
+    token_counts: Optional[List[Optional[int]]] = None,
+) -> List[List[int]]:
+    """
+    Split inputs into consecutive request batches within the per-request limits.
+    A single input larger than max_tokens gets a batch of its own.
+    Args:
+        texts (List[str]): The inputs, in order.
+        max_inputs (int): Maximum inputs per request.
+        max_tokens (int): Maximum tokens per request.
+        token_counts (List[Optional[int]] | None): Precomputed token counts; missing ones are estimated.
+    Returns:
+        List[List[int]]: Input positions of each batch, in order.
+    """
+    batches, current, current_tokens = [], [], 0
+    for position, tokens in enumerate(token_counts_or_estimates(texts, token_counts)):
+        if current and (len(current) >= max_inputs or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(position)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
 
 class EmbeddingService:
-    """Service for generating embeddings using OpenAI."""
+    """Service for generating embeddings with the configured provider (OpenAI by default)."""
 
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        self.model = settings.EMBEDDING_MODEL
+        self.provider = get_embedding_provider()
+        self.model = self.provider.model
+        self.use_cache = settings.EMBEDDING_CACHE_ENABLED
+        # Cache outcome of the most recent generate_embeddings_batch() call.
+        self.last_cache_stats = EmbeddingCacheStats()
 
-    def generate_embedding(self, text: str) -> List[float]:
+    def generate_embedding(self, text: str) -> np.ndarray:
         """
         Generate an embedding for the given text.
         Args:
             text (str): The text to generate embeddings for.    
         Returns:
-            List[float]: The embedding for the given text.
+            np.ndarray: The embedding for the given text.
         """
+        limiter = self._rate_limiter()
+        if limiter is not None:
+            limiter.acquire(estimate_tokens(text))
         try:
-            response = self.client.embeddings.create(
-                input=text,
-                model=self.model
-            )
-            return response.data[0].embedding
+            return self.provider.embed([text])[0]
         except Exception as e:
             raise Exception(f"Failed to create embedding: {str(e)}")
         
-    def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+    def generate_embeddings_batch(
+        self,
+        texts: List[str],
+        token_counts: Optional[List[Optional[int]]] = None,
+    ) -> List[np.ndarray]:
         """
         Generate embeddings for a list of texts.
+        Texts already embedded with the same model and dimensions are served from
+        the embedding cache in one lookup; only the distinct misses are sent to OpenAI.
         Args:
             texts (List[str]): The list of texts to generate embeddings for.
+            token_counts (List[Optional[int]] | None): Precomputed token counts of the texts
+                (ContentChunk.token_count), used for request batching and rate limiting
+                instead of estimates.
         Returns:
-            List[List[float]]: The embeddings for each text.
+            List[np.ndarray]: The embeddings for each text.
         """
+        tokens = token_counts_or_estimates(texts, token_counts)
+        if not self.use_cache:
+            self.last_cache_stats = EmbeddingCacheStats(misses=len(texts))
+            return self._request_embeddings(texts, tokens)
+
+        dimensions = settings.EMBEDDING_DIMENSIONS
+        keys = [embedding_cache_key(self.model, dimensions, normalize_text(text)) for text in texts]
+        embeddings = get_cached_embeddings(set(keys))
+
+        missing = {}
+        for key, text, count in zip(keys, texts, tokens):
+            if key not in embeddings:
+                missing.setdefault(key, (text, count))
+        if missing:
+            missing_texts, missing_tokens = zip(*missing.values())
+            fresh = dict(zip(missing, self._request_embeddings(list(missing_texts), list(missing_tokens))))
+            store_embeddings(model=self.model, dimensions=dimensions, embeddings=fresh)
+            embeddings.update(fresh)
+
+        misses = sum(1 for key in keys if key in missing)
+        self.last_cache_stats = EmbeddingCacheStats(hits=len(keys) - misses, misses=misses)
+        return [embeddings[key] for key in keys]
+
+    def _request_embeddings(self, texts: List[str], token_counts: List[int]) -> List[np.ndarray]:
+        """
+        Request embeddings for all texts from the provider, in input order.
+        Inputs are split by EMBEDDING_BATCH_MAX_INPUTS / EMBEDDING_BATCH_MAX_TOKENS
+        and the batches are sent concurrently on an event loop, at most
+        EMBEDDING_BATCH_CONCURRENCY at a time; each batch waits for the shared
+        RPM/TPM budget and is retried on its own.
+        Must not be called from a running event loop.
+        """
+        batches = split_batches(
+            texts,
+            settings.EMBEDDING_BATCH_MAX_INPUTS,
+            settings.EMBEDDING_BATCH_MAX_TOKENS,
+            token_counts,
+        )
+        batch_texts = [[texts[position] for position in batch] for batch in batches]
+        batch_tokens = [sum(token_counts[position] for position in batch) for batch in batches]
         try:
-            response = self.client.embeddings.create(
-                input=texts,
-                model=self.model
-            )
-            # Sort embeddings by index, as OpenAI may return them out of order
-            sorted_embeddings = sorted(response.data, key=lambda x: x.index)
-            return [item.embedding for item in sorted_embeddings]
+            results = asyncio.run(self._request_batches(batch_texts, batch_tokens))
         except Exception as e:
-            raise Exception(f"Failed to create embeddings: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Failed to create embeddings: {str(e)}")
+
+        embeddings = [None] * len(texts)
+        for batch, batch_embeddings in zip(batches, results):
+            for position, embedding in zip(batch, batch_embeddings):
+                embeddings[position] = embedding
+        return embeddings
+
+    def _rate_limiter(self):
+        """The shared RPM/TPM limiter, for providers that call the OpenAI API."""
+        return get_rate_limiter(self.model) if self.provider.rate_limited else None
+
+    async def _request_batches(self, batch_texts: List[List[str]], batch_tokens: List[int]) -> List[List[np.ndarray]]:
+        semaphore = asyncio.Semaphore(settings.EMBEDDING_BATCH_CONCURRENCY)
+        limiter = self._rate_limiter()
+
+        async def request(texts, tokens):
+            async with semaphore:
+                return await self._request_batch(limiter, texts, tokens)
+
+        try:
+            return await asyncio.gather(*(
+                request(texts, tokens) for texts, tokens in zip(batch_texts, batch_tokens)
+            ))
+        finally:
+            # Provider clients are bound to this run's event loop.
+            await self.provider.aclose()
+
+    async def _request_batch(self, limiter, texts: List[str], tokens: int) -> List[np.ndarray]:
+        """Request one batch of `tokens` tokens, retrying transient errors with exponential backoff."""
+        attempt = 0
+        while True:
+            if limiter is not None:
+                await limiter.acquire_async(tokens)
+            try:
+                return await self.provider.embed_async(texts)
+            except RETRYABLE_ERRORS as e:
+                if attempt >= settings.EMBEDDING_BATCH_MAX_RETRIES:
+                    raise
+                delay = settings.EMBEDDING_BATCH_RETRY_BACKOFF * 2 ** attempt
+                attempt += 1
+                logger.warning(
+                    "Embedding batch retry | inputs=%s attempt=%s delay_sec=%.1f error=%s",
+                    len(texts),
+                    attempt,
+                    delay,
+                    e,
+                )
+                await asyncio.sleep(delay)
@@ -0,0 +1,133 @@
+"""
+Versioned chunk generations with an atomic cut-over.
+
+Every chunk belongs to a generation of its video, and search only reads the
+video's active_generation. The chunks of that generation carry is_active
+(ContentChunk.objects.active()), so search filters the chunk table alone.
+Re-processing allocates a new generation and writes and embeds its chunks
+while the previous generation keeps serving; activating it moves the video's
+pointer and the chunks' flags in one transaction. Superseded generations (and
+those of failed runs) are deleted afterwards, in small batches, by
+collect_chunk_generations_task, which beat also runs periodically as a sweep.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+
+from mentor_knowledge.models import ContentChunk, Mentor, VideoContent, VideoTranscript
+
+logger = logging.getLogger(__name__)
+
+
+def allocate_generation(video: VideoContent) -> int:
+    """
+    Reserve a new generation number for the video's next set of chunks.
+    Args:
+        video (VideoContent): The video; its latest_generation is updated in place.
+    Returns:
+        int: The new generation.
+    """
+    with transaction.atomic():
+        VideoContent.objects.filter(pk=video.pk).update(latest_generation=F("latest_generation") + 1)
+        video.latest_generation = (
+            VideoContent.objects.filter(pk=video.pk).values_list("latest_generation", flat=True).get()
+        )
+    return video.latest_generation
+
+
+def activate_generation(video_id, generation: int) -> bool:
+    """
+    Make a fully embedded generation the one search reads, and mark the video READY.
+    The pointer never moves backwards, so a slow older run cannot replace a newer one.
+    Args:
+        video_id (UUID | str): The video id.
+        generation (int): The generation to activate.
+    Returns:
+        bool: True if the video was EMBEDDED and now serves `generation`.
+    """
+    with transaction.atomic():
+        activated = VideoContent.objects.filter(
+            pk=video_id,
+            status=VideoContent.Status.EMBEDDED,
+            active_generation__lte=generation,
+        ).update(active_generation=generation, status=VideoContent.Status.READY, updated_at=timezone.now())
+        if not activated:
+            return False
+        chunks = ContentChunk.objects.filter(video_id=video_id)
+        chunks.filter(generation=generation, is_active=False).update(is_active=True)
+        chunks.filter(is_active=True).exclude(generation=generation).update(is_active=False)
+
+    mentor_id = VideoContent.objects.filter(pk=video_id).values_list("mentor_id", flat=True).get()
+    # Cached rankings and vector indexes may point at the previous generation.
+    Mentor.bump_corpus_version(mentor_id)
+    schedule_generation_collection(video_id)
+    return True
+
+
+def schedule_generation_collection(video_id) -> None:
+    """
+    Queue the deletion of the video's stale generations once in-flight searches are done with them.
+    Args:
+        video_id (UUID | str): The video id.
+    """
+    # Imported here: tasks import the video processing service, which imports this module.
+    from mentor_knowledge.tasks import collect_chunk_generations_task
+
+    transaction.on_commit(lambda: collect_chunk_generations_task.apply_async(
+        args=[str(video_id)],
+        countdown=settings.CHUNK_GENERATION_GC_DELAY_SECONDS,
+    ))
+
+
+# Neither served (active) nor possibly still being written (latest).
+_CURRENT_GENERATIONS = Q(generation=F("video__active_generation")) | Q(generation=F("video__latest_generation"))
+
+
+def _stale_chunks():
+    return ContentChunk.objects.exclude(_CURRENT_GENERATIONS)
+
+
+def collect_stale_generations(video_id, batch_size: int | None = None) -> int:
+    """
+    Delete the chunks of a video's stale generations, one short transaction per batch,
+    then their transcripts (stored in the "blob" text layout).
+    Args:
+        video_id (UUID | str): The video id.
+        batch_size (int | None): Rows per batch; defaults to settings.CHUNK_GENERATION_GC_BATCH_SIZE.
+    Returns:
+        int: Number of chunks deleted.
+    """
+    batch_size = batch_size or settings.CHUNK_GENERATION_GC_BATCH_SIZE
+    stale = _stale_chunks().filter(video_id=video_id)
+    deleted = 0
+    while True:
+        ids = list(stale.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            break
+        with transaction.atomic():
+            count, _ = ContentChunk.objects.filter(id__in=ids).delete()
+        deleted += count
+    VideoTranscript.objects.filter(video_id=video_id).exclude(_CURRENT_GENERATIONS).delete()
+    if deleted:
+        logger.info("Stale chunk generations collected | video_id=%s chunks=%s", video_id, deleted)
+    return deleted
+
+
+def videos_with_stale_generations() -> list:
+    """
+    Returns:
+        list: Ids of the videos that still have chunks of a stale generation and were not
+            updated (e.g. cut over) in the last CHUNK_GENERATION_GC_DELAY_SECONDS, so the
+            sweep never deletes a generation in-flight searches may still be reading.
+    """
+    settled = timezone.now() - timedelta(seconds=settings.CHUNK_GENERATION_GC_DELAY_SECONDS)
+    return list(
+        VideoContent.objects
+        .filter(updated_at__lte=settled)
+        .filter(Exists(_stale_chunks().filter(video_id=OuterRef("pk"))))
+        .values_list("id", flat=True)
+    )
@@ -0,0 +1,144 @@
+import json
+import statistics
+import time
+import tracemalloc
+from dataclasses import astuple
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from mentor_knowledge.chunking_service import ChunkData, TokenBudgetChunker, TranscriptChunker
+from mentor_knowledge.transcript_store import compress_text, normalize_transcript
+
+
+def legacy_chunk_transcript(transcript, chunk_size: int, overlap: int) -> list[ChunkData]:
+    """
+    The previous dict-per-word chunker, kept as the benchmark baseline and the
+    reference output the array-backed chunker must reproduce exactly.
+    """
+    words = []
+    for segment in transcript:
+        text = segment.get('text', '').strip()
+        start = segment.get('start', 0.0)
+        duration = segment.get('duration', 0.0)
+        if not text:
+            continue
+        segment_words = text.split()
+        if not segment_words:
+            continue
+        avg_word_duration = duration / len(segment_words)
+        for i, word in enumerate(segment_words):
+            word_start = start + (i * avg_word_duration)
+            words.append({'word': word, 'start': word_start, 'end': word_start + avg_word_duration})
+
+    chunks = []
+    chunk_index = 0
+    start_idx = 0
+    while start_idx < len(words):
+        end_idx = min(start_idx + chunk_size, len(words))
+        chunk_words = words[start_idx:end_idx]
+        chunks.append(ChunkData(
+            text=' '.join([w['word'] for w in chunk_words]),
+            chunk_index=chunk_index,
+            start_seconds=round(chunk_words[0]['start'], 2),
+            end_seconds=round(chunk_words[-1]['end'], 2),
+            word_count=len(chunk_words),
+        ))
+        start_idx = end_idx - overlap
+        chunk_index += 1
+        if start_idx >= len(words) - overlap:
+            break
+    return chunks
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare time and peak memory of the dict-per-word chunker, the array-backed chunker '
+        'and the token-budget chunker'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--transcript',
+            type=str,
+            default=str(Path(settings.BASE_DIR) / 'transcript_full_test.json'),
+            help='Transcript JSON, either a list of entries or an object with an "entries" list'
+        )
+        parser.add_argument(
+            '--copies',
+            type=int,
+            default=15,
+            help='Concatenate this many time-shifted copies to simulate a long video (default: 15)'
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=5,
+            help='Timed runs per chunker (default: 5)'
+        )
+        parser.add_argument('--chunk-size', type=int, default=350, help='Words per chunk (default: 350)')
+        parser.add_argument('--overlap', type=int, default=50, help='Overlapping words (default: 50)')
+
+    def handle(self, *args, **options):
+        path = Path(options['transcript'])
+        if not path.exists():
+            raise CommandError(f"Transcript not found: {path}")
+        data = json.loads(path.read_text(encoding='utf-8'))
+        entries = data['entries'] if isinstance(data, dict) else data
+        if not entries or options['copies'] < 1 or options['runs'] < 1:
+            raise CommandError("Need a non-empty transcript and positive --copies/--runs")
+
+        span = max(entry.get('start', 0.0) + entry.get('duration', 0.0) for entry in entries)
+        transcript = [
+            {**entry, 'start': entry.get('start', 0.0) + copy * span}
+            for copy in range(options['copies'])
+            for entry in entries
+        ]
+        chunk_size, overlap = options['chunk_size'], options['overlap']
+        chunker = TranscriptChunker(chunk_size_words=chunk_size, overlap_words=overlap)
+        token_chunker = TokenBudgetChunker(
+            chunk_size_tokens=settings.CHUNK_SIZE_TOKENS,
+            overlap_tokens=settings.CHUNK_OVERLAP_TOKENS,
+            pause_seconds=settings.CHUNK_PAUSE_SECONDS,
+        )
+
+        expected = legacy_chunk_transcript(transcript, chunk_size, overlap)
+        actual = chunker.chunk_transcript(transcript)
+        if [astuple(chunk) for chunk in expected] != [astuple(chunk) for chunk in actual]:
+            raise CommandError("Array-backed chunker output differs from the baseline")
+
+        words = sum(len(entry.get('text', '').split()) for entry in transcript)
+        self.stdout.write(
+            f"{path.name} x{options['copies']}: {len(transcript)} segments, {words} words, "
+            f"{len(actual)} chunks (outputs identical)"
+        )
+        # Raw text bytes of both chunk text layouts for one copy (the copies would compress
+        # unrealistically well); offsets are two 4-byte integers per chunk.
+        single = chunker.chunk_transcript(entries)
+        inline_bytes = sum(len(chunk.text.encode('utf-8')) for chunk in single)
+        blob_bytes = len(compress_text(normalize_transcript(entries))) + 8 * len(single)
+        self.stdout.write(
+            f"chunk text per copy: inline={inline_bytes / 1024:.1f} KiB "
+            f"blob={blob_bytes / 1024:.1f} KiB ({blob_bytes / inline_bytes * 100:.1f}%)"
+        )
+        for label, run in (
+            ("dict per word", lambda: legacy_chunk_transcript(transcript, chunk_size, overlap)),
+            ("arrays", lambda: chunker.chunk_transcript(transcript)),
+            ("arrays, streamed", lambda: sum(1 for _ in chunker.iter_chunks(transcript))),
+            (f"tokens ({token_chunker.tokenizer.name})", lambda: token_chunker.chunk_transcript(transcript)),
+        ):
+            durations = []
+            for _ in range(options['runs']):
+                start = time.perf_counter()
+                run()
+                durations.append(time.perf_counter() - start)
+
+            tracemalloc.start()
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.stdout.write(
+                f"{label:<22} median={statistics.median(durations) * 1000:.1f} ms "
+                f"peak memory={peak / 1024 / 1024:.2f} MiB"
+            )
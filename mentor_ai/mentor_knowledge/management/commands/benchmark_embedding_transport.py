@@ -0,0 +1,98 @@
+import base64
+import json
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from pgvector import Vector
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare CPU time and peak memory of JSON float-list embeddings with text vector literals '
+        'against base64 float32 embeddings with binary vectors, per batch of chunks'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunks',
+            type=int,
+            default=1000,
+            help='Embeddings per simulated response (default: 1000)'
+        )
+        parser.add_argument(
+            '--dimensions',
+            type=int,
+            help='Embedding dimensions (defaults to EMBEDDING_DIMENSIONS)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timed repetitions per transport (default: 5)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Seed of the synthetic embeddings (default: 42)'
+        )
+
+    def handle(self, *args, **options):
+        chunks, repeat = options['chunks'], options['repeat']
+        if chunks < 1 or repeat < 1:
+            raise CommandError("--chunks and --repeat must be positive")
+        dimensions = options['dimensions'] or settings.EMBEDDING_DIMENSIONS
+
+        vectors = np.random.default_rng(options['seed']).standard_normal((chunks, dimensions), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        # Response bodies as the API sends them for encoding_format "float" and "base64".
+        float_body = json.dumps({"data": [
+            {"index": i, "embedding": [round(float(value), 9) for value in vector]}
+            for i, vector in enumerate(vectors)
+        ]})
+        base64_body = json.dumps({"data": [
+            {"index": i, "embedding": base64.b64encode(vector.astype("<f4").tobytes()).decode()}
+            for i, vector in enumerate(vectors)
+        ]})
+
+        self.stdout.write(f"{chunks} embeddings x {dimensions} dimensions, {repeat} runs")
+        for label, run, body in (
+            ("float lists + text literals", self._float_transport, float_body),
+            ("base64 + binary vectors", self._base64_transport, base64_body),
+        ):
+            cpu_seconds = []
+            for _ in range(repeat):
+                start = time.process_time()
+                run(body)
+                cpu_seconds.append(time.process_time() - start)
+
+            tracemalloc.start()
+            run(body)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            scale = 1000 / chunks
+            self.stdout.write(
+                f"{label:<28} body={len(body) / 1024 / 1024:.1f} MiB "
+                f"cpu/1000 chunks={statistics.median(cpu_seconds) * scale * 1000:.1f} ms "
+                f"peak memory/1000 chunks={peak * scale / 1024 / 1024:.1f} MiB"
+            )
+
+    @staticmethod
+    def _float_transport(body):
+        # Decode to Python floats, then format each vector as a '[...]' literal for pgvector.
+        data = sorted(json.loads(body)["data"], key=lambda item: item["index"])
+        return [Vector(item["embedding"]).to_text() for item in data]
+
+    @staticmethod
+    def _base64_transport(body):
+        # Decode straight into float32 arrays, then pgvector's binary wire format.
+        data = sorted(json.loads(body)["data"], key=lambda item: item["index"])
+        return [
+            Vector(np.frombuffer(base64.b64decode(item["embedding"]), dtype="<f4")).to_binary()
+            for item in data
+        ]
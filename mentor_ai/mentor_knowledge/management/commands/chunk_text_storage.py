@@ -0,0 +1,149 @@
+import statistics
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from mentor_knowledge.ann_index import CONTENT_CHUNK_TABLE
+from mentor_knowledge.models import ContentChunk, Mentor, VideoContent, VideoTranscript
+from mentor_knowledge.transcript_store import (
+    CHUNK_TEXT_STORAGE_BLOB,
+    CHUNK_TEXT_STORAGES,
+    TRANSCRIPT_CACHE,
+    check_text_storage_search,
+    move_chunks_inline,
+    move_chunks_to_blob,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Convert stored chunks between the inline and blob text layouts, '
+        'and compare storage size and retrieval latency before and after'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--to',
+            choices=list(CHUNK_TEXT_STORAGES),
+            help='Layout to convert the active chunk generations to (omit to only report)'
+        )
+        parser.add_argument(
+            '--mentor',
+            type=str,
+            help='Only convert/report chunks of this mentor slug'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per UPDATE statement (default: 1000); every video is converted in its own transaction'
+        )
+        parser.add_argument(
+            '--queries',
+            type=int,
+            default=50,
+            help='Sampled retrievals timed before and after the conversion (0 to skip)'
+        )
+        parser.add_argument(
+            '--k',
+            type=int,
+            default=6,
+            help='Chunks fetched per sampled retrieval (default: 6)'
+        )
+
+    def handle(self, *args, **options):
+        mentor_id = None
+        if options['mentor']:
+            try:
+                mentor_id = Mentor.objects.get(slug=options['mentor']).id
+            except Mentor.DoesNotExist:
+                raise CommandError(f"Mentor not found: {options['mentor']}")
+        if options['batch_size'] < 1 or options['k'] < 1:
+            raise CommandError("--batch-size and --k must be positive")
+        if options['to']:
+            try:
+                check_text_storage_search(options['to'])
+            except ImproperlyConfigured as e:
+                raise CommandError(str(e))
+
+        samples = self._sample(mentor_id, options['queries'], options['k'])
+        self._report("Current layout", mentor_id, samples)
+        if not options['to']:
+            return
+
+        converted = self._convert(options['to'], mentor_id, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"✓ Moved {converted} chunks to the {options['to']} layout"))
+        self._report(f"{options['to'].capitalize()} layout", mentor_id, samples)
+
+    def _chunks(self, mentor_id):
+        chunks = ContentChunk.objects.active()
+        return chunks.filter(mentor_id=mentor_id) if mentor_id else chunks
+
+    def _convert(self, storage, mentor_id, batch_size) -> int:
+        to_blob = storage == CHUNK_TEXT_STORAGE_BLOB
+        # Video generations with at least one chunk still in the other layout.
+        groups = list(
+            self._chunks(mentor_id)
+            .filter(text_start__isnull=to_blob)
+            .values_list('video_id', 'generation')
+            .distinct()
+        )
+        move = move_chunks_to_blob if to_blob else move_chunks_inline
+        total = 0
+        for position, (video_id, generation) in enumerate(groups, start=1):
+            total += move(video_id, generation, batch_size=batch_size)
+            self.stdout.write(f"  ... {position}/{len(groups)} videos, {total} chunks")
+        return total
+
+    def _sample(self, mentor_id, queries, k) -> list:
+        ids = list(self._chunks(mentor_id).order_by('?').values_list('id', flat=True)[:queries * k])
+        return [ids[start:start + k] for start in range(0, len(ids), k)]
+
+    def _report(self, label, mentor_id, samples):
+        mentor_filter = "WHERE mentor_id = %s" if mentor_id else ""
+        params = [mentor_id] if mentor_id else []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT count(*), count(text_start), coalesce(sum(pg_column_size(text)), 0), "
+                f"coalesce(sum(pg_column_size(text_start) + pg_column_size(text_end)), 0) "
+                f"FROM {CONTENT_CHUNK_TABLE} {mentor_filter}",
+                params,
+            )
+            rows, blob_rows, text_bytes, offset_bytes = cursor.fetchone()
+            cursor.execute(
+                f"SELECT count(*), coalesce(sum(pg_column_size(transcript.data)), 0), "
+                f"coalesce(sum(transcript.char_count), 0) "
+                f"FROM {VideoTranscript._meta.db_table} transcript "
+                f"JOIN {VideoContent._meta.db_table} video ON video.id = transcript.video_id "
+                f"{'WHERE video.mentor_id = %s' if mentor_id else ''}",
+                params,
+            )
+            transcripts, transcript_bytes, transcript_chars = cursor.fetchone()
+
+        mib = 1024 * 1024
+        total = text_bytes + offset_bytes + transcript_bytes
+        self.stdout.write(f"{label}: {rows} chunks ({blob_rows} stored as offsets), {transcripts} transcripts")
+        self.stdout.write(
+            f"  Text storage: inline text={text_bytes / mib:.2f} MiB, offsets={offset_bytes / mib:.2f} MiB, "
+            f"transcripts={transcript_bytes / mib:.2f} MiB ({transcript_chars} chars); "
+            f"total={total / mib:.2f} MiB"
+        )
+        if not samples:
+            return
+
+        # Imported here: the timing reuses the chat retrieval projection.
+        from mentors.retrieval import project_chunks
+
+        cold, warm = [], []
+        for ids in samples:
+            TRANSCRIPT_CACHE.clear()
+            for latencies in (cold, warm):
+                start = time.perf_counter()
+                project_chunks(ContentChunk.objects.filter(id__in=ids))
+                latencies.append(time.perf_counter() - start)
+        self.stdout.write(
+            f"  Fetching {len(samples[0])} chunks: median cold={statistics.median(cold) * 1000:.2f} ms, "
+            f"warm={statistics.median(warm) * 1000:.2f} ms over {len(samples)} samples"
+        )
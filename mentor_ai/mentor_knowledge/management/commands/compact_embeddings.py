@@ -0,0 +1,153 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from mentor_knowledge.ann_index import CONTENT_CHUNK_TABLE, VECTOR_COLUMNS, get_index_size_bytes
+from mentor_knowledge.compact_embeddings import COMPACT_TYPES, get_compact_type
+from mentor_knowledge.models import ContentChunk, Mentor
+
+
+class Command(BaseCommand):
+    help = 'Backfill a compact embedding column and report size and recall deltas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--type',
+            choices=list(COMPACT_TYPES),
+            required=True,
+            help='Compact representation to backfill'
+        )
+        parser.add_argument(
+            '--mentor',
+            type=str,
+            help='Only backfill/evaluate chunks of this mentor slug'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows updated per transaction (default: 1000)'
+        )
+        parser.add_argument(
+            '--recall-queries',
+            type=int,
+            default=20,
+            help='Sampled chunk embeddings used as queries for the recall check (0 to skip)'
+        )
+        parser.add_argument(
+            '--k',
+            type=int,
+            default=6,
+            help='Top-k used for the recall check (default: 6)'
+        )
+
+    def handle(self, *args, **options):
+        compact = get_compact_type(options['type'])
+        mentor_id = None
+        if options['mentor']:
+            try:
+                mentor_id = Mentor.objects.get(slug=options['mentor']).id
+            except Mentor.DoesNotExist:
+                raise CommandError(f"Mentor not found: {options['mentor']}")
+
+        updated = self._backfill(compact, mentor_id, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"✓ Backfilled {updated} chunks into {compact.field}"))
+
+        self._report_sizes(compact, mentor_id)
+        if options['recall_queries'] > 0:
+            self._report_recall(compact, mentor_id, options['recall_queries'], options['k'])
+
+    def _backfill(self, compact, mentor_id, batch_size) -> int:
+        mentor_filter = "AND mentor_id = %s" if mentor_id else ""
+        params = [mentor_id] if mentor_id else []
+        sql = (
+            f"UPDATE {CONTENT_CHUNK_TABLE} SET {compact.field} = "
+            f"{compact.backfill_sql()} "
+            f"WHERE id IN (SELECT id FROM {CONTENT_CHUNK_TABLE} "
+            f"WHERE {compact.field} IS NULL AND embedding IS NOT NULL {mentor_filter} LIMIT %s)"
+        )
+
+        total = 0
+        with connection.cursor() as cursor:
+            while True:
+                cursor.execute(sql, params + [batch_size])
+                if cursor.rowcount == 0:
+                    break
+                total += cursor.rowcount
+                self.stdout.write(f"  ... {total} chunks")
+        return total
+
+    def _report_sizes(self, compact, mentor_id):
+        mentor_filter = "WHERE mentor_id = %s" if mentor_id else ""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT count(*), coalesce(sum(pg_column_size(embedding)), 0), "
+                f"coalesce(sum(pg_column_size({compact.field})), 0) "
+                f"FROM {CONTENT_CHUNK_TABLE} {mentor_filter}",
+                [mentor_id] if mentor_id else [],
+            )
+            rows, full_bytes, compact_bytes = cursor.fetchone()
+            full_index = get_index_size_bytes(cursor, VECTOR_COLUMNS["embedding"].index_name) or 0
+            compact_index = get_index_size_bytes(cursor, VECTOR_COLUMNS[compact.field].index_name) or 0
+
+        mib = 1024 * 1024
+        self.stdout.write(f"Chunks: {rows}")
+        self.stdout.write(
+            f"Vector data: embedding={full_bytes / mib:.1f} MiB, "
+            f"{compact.field}={compact_bytes / mib:.1f} MiB "
+            f"({(compact_bytes / full_bytes * 100) if full_bytes else 0:.1f}%)"
+        )
+        self.stdout.write(
+            f"ANN index: embedding={full_index / mib:.1f} MiB, "
+            f"{compact.field}={compact_index / mib:.1f} MiB"
+        )
+
+    def _report_recall(self, compact, mentor_id, queries, k):
+        # Imported here: the evaluation reuses the chat retrieval code path.
+        from mentors.retrieval import RETRIEVAL_MODE_APPROXIMATE, RETRIEVAL_MODE_EXACT, _vector_search
+
+        # Superseded generations awaiting collection are never searched, so never sampled.
+        samples = ContentChunk.objects.active().filter(embedding__isnull=False)
+        if mentor_id:
+            samples = samples.filter(mentor_id=mentor_id)
+        samples = list(samples.order_by("?").values_list("mentor_id", "embedding")[:queries])
+        if not samples:
+            self.stdout.write(self.style.WARNING("No embedded chunks to evaluate recall on"))
+            return
+
+        recalls, full_latencies, compact_latencies = [], [], []
+        for sample_mentor_id, embedding in samples:
+            exact = _vector_search(
+                mentor_id=sample_mentor_id, query_embedding=embedding, k=k, mode=RETRIEVAL_MODE_EXACT
+            )
+
+            start = time.perf_counter()
+            _vector_search(
+                mentor_id=sample_mentor_id, query_embedding=embedding, k=k, mode=RETRIEVAL_MODE_APPROXIMATE
+            )
+            full_latencies.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            rescored = _vector_search(
+                mentor_id=sample_mentor_id,
+                query_embedding=embedding,
+                k=k,
+                mode=RETRIEVAL_MODE_APPROXIMATE,
+                compact_type=compact.name,
+            )
+            compact_latencies.append(time.perf_counter() - start)
+
+            expected = {chunk.id for chunk in exact}
+            if expected:
+                recalls.append(len(expected & {chunk.id for chunk in rescored}) / len(expected))
+
+        self.stdout.write(
+            f"Recall@{k} of {compact.name} + rescoring vs exact: {statistics.mean(recalls):.3f} "
+            f"over {len(recalls)} queries"
+        )
+        self.stdout.write(
+            f"Median latency: full ANN={statistics.median(full_latencies) * 1000:.1f} ms, "
+            f"{compact.name} + rescoring={statistics.median(compact_latencies) * 1000:.1f} ms"
+        )
@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from mentor_knowledge.models import Mentor
+from mentor_knowledge.partitioning import (
+    ensure_mentor_partition,
+    is_partitioned,
+    list_partitions,
+    partition_content_chunks,
+    unpartition_content_chunks,
+)
+
+
+class Command(BaseCommand):
+    help = 'Move ContentChunk rows between the plain and the per-mentor partitioned table layout'
+
+    def add_arguments(self, parser):
+        action = parser.add_mutually_exclusive_group()
+        action.add_argument(
+            '--convert',
+            action='store_true',
+            help='Convert to the partitioned layout with one partition per existing mentor'
+        )
+        action.add_argument(
+            '--revert',
+            action='store_true',
+            help='Convert back to a single plain table'
+        )
+        action.add_argument(
+            '--mentor',
+            type=str,
+            help='Give this mentor (slug) its own partition, moving its rows out of the default partition'
+        )
+        action.add_argument(
+            '--all-mentors',
+            action='store_true',
+            help='Give every mentor still in the default partition its own partition'
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        with transaction.atomic(), connection.cursor() as cursor:
+            if options['convert']:
+                partition_content_chunks(cursor, Mentor.objects.values_list('id', flat=True))
+            elif options['revert']:
+                unpartition_content_chunks(cursor)
+            elif options['mentor'] or options['all_mentors']:
+                if not is_partitioned(cursor):
+                    raise CommandError("ContentChunk is not partitioned; run with --convert first")
+                if options['mentor']:
+                    try:
+                        mentors = [Mentor.objects.get(slug=options['mentor'])]
+                    except Mentor.DoesNotExist:
+                        raise CommandError(f"Mentor not found: {options['mentor']}")
+                else:
+                    mentors = list(Mentor.objects.all())
+                for mentor in mentors:
+                    if ensure_mentor_partition(cursor, mentor.id):
+                        self.stdout.write(f"Created partition for {mentor.slug}")
+
+            partitioned = is_partitioned(cursor)
+            partitions = list_partitions(cursor) if partitioned else []
+
+        if any(options[name] for name in ('convert', 'revert', 'mentor', 'all_mentors')):
+            self.stdout.write(self.style.SUCCESS(f"✓ Done in {time.perf_counter() - start:.2f}s"))
+        self.stdout.write(f"Layout: {'partitioned by mentor' if partitioned else 'single table'}")
+        for name, rows in partitions:
+            self.stdout.write(f"  {name}: ~{max(rows, 0)} rows")
@@ -1,3 +1,5 @@
+import argparse
+
 from django.core.management.base import BaseCommand
 
 from mentor_knowledge.models import VideoContent
@@ -25,6 +27,15 @@ class Command(BaseCommand):
             action='store_true',
             help='Fetch transcript automatically from YouTube (requires youtube-transcript-api)'
         )
+        parser.add_argument(
+            '--incremental',
+            action=argparse.BooleanOptionalAction,
+            default=None,
+            help=(
+                'Only write chunks whose text or position changed; --no-incremental forces a full '
+                'rebuild as a new chunk generation (default: VIDEO_REPROCESS_INCREMENTAL)'
+            )
+        )
         parser.add_argument(
             '--process-all-new',
             action='store_true',
@@ -45,11 +56,13 @@ class Command(BaseCommand):
                     # Manual transcript from file
                     with open(options['transcript_file'], 'r', encoding='utf-8') as f:
                         transcript = json.load(f)
-                    result = service.process_video_with_transcript(video, transcript)
+                    result = service.process_video_with_transcript(
+                        video, transcript, incremental=options['incremental']
+                    )
 
                 elif options['from_youtube']:
                     # Automatic transcript from YouTube
-                    result = service.process_video_from_youtube(video)
+                    result = service.process_video_from_youtube(video, incremental=options['incremental'])
 
                 else:
                     self.stdout.write(self.style.ERROR(
@@ -58,7 +71,9 @@ class Command(BaseCommand):
                     return
 
                 self.stdout.write(self.style.SUCCESS(
-                    f"✓ Success! Created {result['chunks_created']} chunks"
+                    f"✓ Success! {result['chunks_total']} chunks: {result['chunks_created']} created, "
+                    f"{result['chunks_updated']} updated, {result['chunks_reused']} reused, "
+                    f"{result['chunks_deleted']} deleted"
                 ))
 
             except VideoContent.DoesNotExist:
@@ -90,7 +105,7 @@ class Command(BaseCommand):
             for i, video in enumerate(videos, 1):
                 try:
                     self.stdout.write(f"[{i}/{total}] Processing: {video.title}")
-                    result = service.process_video_from_youtube(video)
+                    result = service.process_video_from_youtube(video, incremental=options['incremental'])
                     self.stdout.write(self.style.SUCCESS(
                         f"  ✓ {result['chunks_created']} chunks"
                     ))
@@ -0,0 +1,106 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from mentor_knowledge.ann_index import (
+    INDEX_TYPES,
+    VECTOR_COLUMNS,
+    build_create_index_sql,
+    build_drop_index_sql,
+    get_index_size_bytes,
+    get_index_type,
+    get_vector_column,
+    mentor_index_name,
+    mentor_index_predicate,
+)
+from mentor_knowledge.models import Mentor
+from mentor_knowledge.partitioning import is_partitioned
+
+
+class Command(BaseCommand):
+    help = 'Create, rebuild or drop an ANN index on ContentChunk.embedding (or a compact vector column)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--type',
+            choices=INDEX_TYPES,
+            help='Index type to build (defaults to VECTOR_INDEX_TYPE)'
+        )
+        parser.add_argument(
+            '--column',
+            choices=list(VECTOR_COLUMNS),
+            default='embedding',
+            help='Vector column to index (default: embedding)'
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Drop the existing index before building it again (e.g. to switch hnsw <-> ivfflat)'
+        )
+        parser.add_argument(
+            '--drop',
+            action='store_true',
+            help='Drop the index and exit'
+        )
+        parser.add_argument(
+            '--mentor',
+            type=str,
+            help='Slug of a mentor to build a partial index for (only that mentor\'s chunks)'
+        )
+        parser.add_argument(
+            '--concurrently',
+            action='store_true',
+            help='Build/drop without blocking writes to the chunks table'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            index_type = get_index_type(options['type'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        concurrently = options['concurrently']
+        with connection.cursor() as cursor:
+            partitioned = is_partitioned(cursor)
+        if partitioned:
+            # Postgres builds an index on a partitioned table per partition and cannot do it concurrently.
+            if options['mentor']:
+                raise CommandError("ContentChunk is partitioned by mentor; each partition already has its own index")
+            if concurrently:
+                raise CommandError("--concurrently is not supported on the partitioned ContentChunk table")
+
+        vector_column = get_vector_column(options['column'])
+        index_name = vector_column.index_name
+        where = None
+
+        if options['mentor']:
+            try:
+                mentor = Mentor.objects.get(slug=options['mentor'])
+            except Mentor.DoesNotExist:
+                raise CommandError(f"Mentor not found: {options['mentor']}")
+            index_name = mentor_index_name(mentor.id, vector_column.column)
+            where = mentor_index_predicate(mentor.id)
+
+        with connection.cursor() as cursor:
+            if options['drop'] or options['rebuild']:
+                cursor.execute(build_drop_index_sql(index_name, concurrently=concurrently))
+                self.stdout.write(f"Dropped existing ANN index {index_name}")
+                if options['drop']:
+                    return
+
+            start = time.perf_counter()
+            cursor.execute(build_create_index_sql(
+                index_name=index_name,
+                column=vector_column.column,
+                opclass=vector_column.opclass,
+                index_type=index_type,
+                where=where,
+                concurrently=concurrently,
+            ))
+            duration = time.perf_counter() - start
+            size = get_index_size_bytes(cursor, index_name)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {index_type} index {index_name} ready in {duration:.2f}s ({(size or 0) / (1024 * 1024):.1f} MiB)"
+        ))
@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0006_alter_videocontent_status"),
+    ]
+
+    operations = [
+        # Fixed build parameters; 0022 renames the index and declares it on the model.
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS articles_contentchunk_embedding_ann ON articles_contentchunk "
+            "USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)",
+            "DROP INDEX IF EXISTS articles_contentchunk_embedding_ann",
+        ),
+    ]
@@ -0,0 +1,32 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0007_contentchunk_embedding_ann_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contentchunk",
+            name="mentor",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="chunks",
+                to="articles.mentor",
+            ),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE articles_contentchunk AS chunk
+                SET mentor_id = video.mentor_id
+                FROM articles_videocontent AS video
+                WHERE chunk.video_id = video.id AND chunk.mentor_id IS NULL
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,24 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Kept separate from the backfill in 0008: Postgres refuses ALTER TABLE while the
+    # deferred FK checks queued by the UPDATE are still pending in the same transaction.
+
+    dependencies = [
+        ("articles", "0008_contentchunk_mentor"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="contentchunk",
+            name="mentor",
+            field=models.ForeignKey(
+                editable=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="chunks",
+                to="articles.mentor",
+            ),
+        ),
+    ]
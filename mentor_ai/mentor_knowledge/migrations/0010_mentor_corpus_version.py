@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-17 06:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0009_alter_contentchunk_mentor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mentor',
+            name='corpus_version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text="Bumped whenever the mentor's searchable chunks change."),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.14 on 2026-10-17 06:28
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0010_mentor_corpus_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentchunk',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.SearchVector('text', config='english'), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='contentchunk',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='articles_chunk_search_gin'),
+        ),
+    ]
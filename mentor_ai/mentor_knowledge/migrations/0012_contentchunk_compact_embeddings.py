@@ -0,0 +1,35 @@
+# Generated by Django 5.0.14 on 2026-10-17 06:31
+
+import pgvector.django.bit
+import pgvector.django.halfvec
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0011_contentchunk_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentchunk',
+            name='embedding_bit',
+            field=pgvector.django.bit.BitField(blank=True, length=1536, null=True),
+        ),
+        migrations.AddField(
+            model_name='contentchunk',
+            name='embedding_half',
+            field=pgvector.django.halfvec.HalfVectorField(blank=True, dimensions=1536, null=True),
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS articles_contentchunk_embedding_half_ann ON articles_contentchunk "
+            "USING hnsw (embedding_half halfvec_cosine_ops) WITH (m = 16, ef_construction = 64)",
+            "DROP INDEX IF EXISTS articles_contentchunk_embedding_half_ann",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS articles_contentchunk_embedding_bit_ann ON articles_contentchunk "
+            "USING hnsw (embedding_bit bit_hamming_ops) WITH (m = 16, ef_construction = 64)",
+            "DROP INDEX IF EXISTS articles_contentchunk_embedding_bit_ann",
+        ),
+    ]
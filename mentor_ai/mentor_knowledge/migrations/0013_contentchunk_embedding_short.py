@@ -0,0 +1,24 @@
+# Generated by Django 5.0.14 on 2026-10-17 06:32
+
+import pgvector.django.vector
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0012_contentchunk_compact_embeddings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentchunk',
+            name='embedding_short',
+            field=pgvector.django.vector.VectorField(blank=True, dimensions=256, null=True),
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS articles_contentchunk_embedding_short_ann ON articles_contentchunk "
+            "USING hnsw (embedding_short vector_cosine_ops) WITH (m = 16, ef_construction = 64)",
+            "DROP INDEX IF EXISTS articles_contentchunk_embedding_short_ann",
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.db import migrations
+
+from mentor_knowledge.partitioning import partition_content_chunks, unpartition_content_chunks
+
+
+def partition_if_enabled(apps, schema_editor):
+    if not settings.CONTENT_CHUNK_PARTITIONING:
+        return
+    Mentor = apps.get_model('articles', 'Mentor')
+    with schema_editor.connection.cursor() as cursor:
+        partition_content_chunks(cursor, Mentor.objects.values_list('id', flat=True))
+
+
+def unpartition(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        unpartition_content_chunks(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0013_contentchunk_embedding_short'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_if_enabled, unpartition),
+    ]
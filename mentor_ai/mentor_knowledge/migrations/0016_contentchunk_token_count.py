@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-17 06:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0015_embeddingcacheentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentchunk',
+            name='token_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
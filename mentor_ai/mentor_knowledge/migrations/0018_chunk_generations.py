@@ -0,0 +1,64 @@
+# Generated by Django 5.0.14 on 2026-10-17 07:05
+
+from django.db import migrations, models
+
+from mentor_knowledge.partitioning import is_partitioned, replace_unique_constraint
+
+OLD_UNIQUE = ('video', 'chunk_index')
+NEW_UNIQUE = ('video', 'generation', 'chunk_index')
+
+
+def _swap_unique(apps, schema_editor, old, new):
+    ContentChunk = apps.get_model('articles', 'ContentChunk')
+    with schema_editor.connection.cursor() as cursor:
+        if is_partitioned(cursor):
+            # The partitioned table's constraint also covers mentor_id, which Django cannot match.
+            old_columns = [ContentChunk._meta.get_field(name).column for name in old]
+            new_columns = [ContentChunk._meta.get_field(name).column for name in new]
+            name = schema_editor._create_index_name(ContentChunk._meta.db_table, new_columns, suffix='_uniq')
+            replace_unique_constraint(cursor, old_columns, new_columns, name)
+            return
+    schema_editor.alter_unique_together(ContentChunk, [old], [new])
+
+
+def forwards(apps, schema_editor):
+    _swap_unique(apps, schema_editor, OLD_UNIQUE, NEW_UNIQUE)
+
+
+def backwards(apps, schema_editor):
+    _swap_unique(apps, schema_editor, NEW_UNIQUE, OLD_UNIQUE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0017_contentchunk_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentchunk',
+            name='generation',
+            field=models.PositiveIntegerField(default=1),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='videocontent',
+            name='active_generation',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='videocontent',
+            name='latest_generation',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(forwards, backwards)],
+            state_operations=[
+                migrations.AlterUniqueTogether(
+                    name='contentchunk',
+                    unique_together={NEW_UNIQUE},
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-17 07:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0019_chunk_text_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentchunk',
+            name='is_active',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE articles_contentchunk AS chunk
+                SET is_active = true
+                FROM articles_videocontent AS video
+                WHERE chunk.video_id = video.id AND chunk.generation = video.active_generation
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
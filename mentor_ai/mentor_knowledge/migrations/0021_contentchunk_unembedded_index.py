@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-17 07:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0020_contentchunk_is_active'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contentchunk',
+            index=models.Index(condition=models.Q(('embedding__isnull', True)), fields=['created_at'], name='articles_chunk_unembedded'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+import pgvector.django.indexes
+from django.db import migrations
+
+# (column, operator class, index name before this migration, declared name)
+ANN_INDEXES = [
+    ("embedding", "vector_cosine_ops", "articles_contentchunk_embedding_ann", "articles_chunk_embedding_ann"),
+    ("embedding_half", "halfvec_cosine_ops", "articles_contentchunk_embedding_half_ann", "articles_chunk_half_ann"),
+    ("embedding_bit", "bit_hamming_ops", "articles_contentchunk_embedding_bit_ann", "articles_chunk_bit_ann"),
+    ("embedding_short", "vector_cosine_ops", "articles_contentchunk_embedding_short_ann", "articles_chunk_short_ann"),
+]
+
+
+class Migration(migrations.Migration):
+    """
+    Declare the ANN indexes created by 0007, 0012 and 0013 on the model, under names
+    that fit Django's limit. The existing indexes are renamed, not rebuilt.
+    """
+
+    dependencies = [
+        ("articles", "0021_contentchunk_unembedded_index"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    f"ALTER INDEX IF EXISTS {old_name} RENAME TO {new_name}",
+                    f"ALTER INDEX IF EXISTS {new_name} RENAME TO {old_name}",
+                )
+                for _, _, old_name, new_name in ANN_INDEXES
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="contentchunk",
+                    index=pgvector.django.indexes.HnswIndex(
+                        fields=[column],
+                        name=new_name,
+                        m=16,
+                        ef_construction=64,
+                        opclasses=[opclass],
+                    ),
+                )
+                for column, opclass, _, new_name in ANN_INDEXES
+            ],
+        ),
+    ]
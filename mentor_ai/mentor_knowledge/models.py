@@ -2,9 +2,37 @@
 Mentor model for storing mentorship information.
 """
 import uuid
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 from django.core.validators import MinLengthValidator
-from pgvector.django import VectorField
+from pgvector.django import BitField, HalfVectorField, HnswIndex, VectorField
+
+from mentor_knowledge.ann_index import VECTOR_COLUMNS
+
+# Text search configuration used for ContentChunk.search_vector and lexical queries.
+SEARCH_CONFIG = "english"
+
+# Sizes of the vector columns, fixed by the migrations that created them. Changing one
+# needs a migration altering the columns (and re-embedding); the app refuses to start
+# while settings.EMBEDDING_DIMENSIONS / EMBEDDING_SHORT_DIMENSIONS differ from them.
+EMBEDDING_DIMENSIONS = 1536
+EMBEDDING_SHORT_DIMENSIONS = 256
+
+
+def _ann_index(column: str) -> HnswIndex:
+    """
+    The default HNSW index of a vector column (see ann_index.VECTOR_COLUMNS).
+    `vector_index --rebuild` can replace it with other VECTOR_* build settings.
+    """
+    vector_column = VECTOR_COLUMNS[column]
+    return HnswIndex(
+        fields=[vector_column.column],
+        name=vector_column.index_name,
+        m=16,
+        ef_construction=64,
+        opclasses=[vector_column.opclass],
+    )
 
 
 class Mentor(models.Model):
@@ -19,6 +47,8 @@ class Mentor(models.Model):
     primary_language = models.CharField(max_length=50, default="en")
     bio = models.TextField(blank=True, null=True, 
                            help_text="Short biography of the mentor.")
+    corpus_version = models.PositiveIntegerField(default=0, editable=False,
+                                                 help_text="Bumped whenever the mentor's searchable chunks change.")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -27,6 +57,11 @@ class Mentor(models.Model):
 
     def __str__(self):
         return self.name
+
+    @classmethod
+    def bump_corpus_version(cls, mentor_id) -> None:
+        """Invalidate derived search structures (vector indexes, caches) for a mentor."""
+        cls.objects.filter(pk=mentor_id).update(corpus_version=models.F("corpus_version") + 1)
     
 
 class VideoContent(models.Model):
@@ -53,7 +88,11 @@ class VideoContent(models.Model):
         choices=Status.choices,
         default=Status.NEW
     )
-
+    # Chunk generation served by search. Re-processing writes its chunks under a freshly
+    # allocated latest_generation and then flips this pointer, together with the
+    # chunks' is_active flags, in one transaction (see generations.py).
+    active_generation = models.PositiveIntegerField(default=1, editable=False)
+    latest_generation = models.PositiveIntegerField(default=1, editable=False)
 
     class Meta:
         unique_together = [("mentor", "youtube_video_id")]
@@ -66,22 +105,105 @@ class VideoContent(models.Model):
         return f"{self.title} by {self.mentor.name}"
     
 
+class ContentChunkQuerySet(models.QuerySet):
+    def active(self):
+        """Chunks of their video's active generation, the only ones search should see."""
+        return self.filter(is_active=True)
+
+
 class ContentChunk(models.Model):
     """Content chunk object."""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     video = models.ForeignKey(VideoContent, on_delete=models.CASCADE, related_name="chunks")
+    # Denormalized from video.mentor so mentor-scoped vector search filters a single table.
+    mentor = models.ForeignKey(Mentor, on_delete=models.CASCADE, related_name="chunks", editable=False)
+    # Set from video.active_generation on save() when not given.
+    generation = models.PositiveIntegerField()
+    # True for the chunks of video.active_generation, kept on the chunk so search
+    # filters this table alone (no join to the video).
+    is_active = models.BooleanField(default=False, editable=False)
     chunk_index = models.PositiveIntegerField() 
-    text = models.TextField()
+    # Empty in the "blob" text layout, where the text is
+    # video_transcript[text_start:text_end] (see transcript_store.py).
+    text = models.TextField(blank=True)
+    text_start = models.PositiveIntegerField(null=True, blank=True)
+    text_end = models.PositiveIntegerField(null=True, blank=True)
     start_seconds = models.IntegerField(null=True, blank=True)
     end_seconds = models.IntegerField(null=True, blank=True)
-    embedding = VectorField(dimensions=1536, null=True, blank=True)
+    # Tokens of `text` (see tokenizers.py), counted once at ingestion for embedding and prompt budgets.
+    token_count = models.PositiveIntegerField(null=True, blank=True)
+    # sha256 of `text`, so re-processing can match new chunks to unchanged rows (see chunk_diff.py).
+    content_hash = models.CharField(max_length=64, null=True, blank=True)
+    embedding = VectorField(dimensions=EMBEDDING_DIMENSIONS, null=True, blank=True)
+    # Optional compact copies of `embedding` for a cheap candidate pass (see compact_embeddings.py).
+    embedding_half = HalfVectorField(dimensions=EMBEDDING_DIMENSIONS, null=True, blank=True)
+    embedding_bit = BitField(length=EMBEDDING_DIMENSIONS, null=True, blank=True)
+    # Normalized Matryoshka prefix of `embedding` (first EMBEDDING_SHORT_DIMENSIONS values).
+    embedding_short = VectorField(dimensions=EMBEDDING_SHORT_DIMENSIONS, null=True, blank=True)
+    search_vector = models.GeneratedField(
+        expression=SearchVector("text", config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ContentChunkQuerySet.as_manager()
+
     class Meta:
-        unique_together = [("video", "chunk_index")]
+        unique_together = [("video", "generation", "chunk_index")]
         indexes = [
             models.Index(fields=["video", "chunk_index"]),
+            GinIndex(fields=["search_vector"], name="articles_chunk_search_gin"),
+            *(_ann_index(column) for column in VECTOR_COLUMNS),
+            # Tiny: only chunks waiting for the embedding coalescer (see requeue_unembedded_chunks).
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(embedding__isnull=True),
+                name="articles_chunk_unembedded",
+            ),
         ]
 
     def __str__(self) -> str:
         return f"{self.video.youtube_video_id} #{self.chunk_index}"
+
+    def save(self, *args, **kwargs):
+        if self.mentor_id is None and self.video_id is not None:
+            self.mentor_id = self.video.mentor_id
+        if self.generation is None and self.video_id is not None:
+            self.generation = self.video.active_generation
+        if self._state.adding and self.video_id is not None:
+            # A chunk added to the served generation is searchable right away.
+            self.is_active = self.generation == self.video.active_generation
+        super().save(*args, **kwargs)
+
+
+class VideoTranscript(models.Model):
+    """Normalized transcript of one chunk generation of a video, zlib-compressed (see transcript_store.py)."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    video = models.ForeignKey(VideoContent, on_delete=models.CASCADE, related_name="transcripts")
+    generation = models.PositiveIntegerField()
+    data = models.BinaryField()
+    char_count = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = [("video", "generation")]
+
+    def __str__(self) -> str:
+        return f"{self.video_id} transcript (generation {self.generation})"
+
+
+class EmbeddingCacheEntry(models.Model):
+    """
+    Content-addressed embedding of one normalized chunk text, so re-processing
+    a video never pays for re-embedding text that has not changed.
+    """
+    key = models.CharField(max_length=64, primary_key=True,
+                           help_text="sha256 of the model, dimensions and normalized text.")
+    model = models.CharField(max_length=100)
+    dimensions = models.PositiveIntegerField()
+    embedding = VectorField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"{self.model}/{self.dimensions} {self.key[:12]}"
@@ -0,0 +1,254 @@
+"""
+Opt-in LIST partitioning of the ContentChunk table by mentor.
+
+In the partitioned layout every mentor's chunks live in their own partition
+(with its own heap, vacuum cycle and copy of every index, including the ANN
+index), plus a DEFAULT partition for mentors without one yet. A query filtered
+on mentor_id is pruned to a single partition, so one mentor's reprocessing
+bloat never slows down another mentor's search.
+
+Postgres requires primary keys and unique constraints of a partitioned table
+to include the partition key, so in that layout:
+    PRIMARY KEY (id)                            -> PRIMARY KEY (id, mentor_id)
+    UNIQUE (video_id, generation, chunk_index)  -> UNIQUE (video_id, generation, chunk_index, mentor_id)
+Both are equivalent for this table: a video belongs to exactly one mentor and
+ids are random UUIDs. Django keeps treating `id` as the primary key. Converting
+back strips the trailing mentor_id again. Django finds unique_together
+constraints by their exact columns, so migrations changing them use
+replace_unique_constraint() while the table is partitioned.
+
+Conversion rewrites the whole table inside one transaction (writes to chunks
+block until it commits); run it during a quiet period.
+"""
+import logging
+
+from mentor_knowledge.ann_index import CONTENT_CHUNK_TABLE, VECTOR_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARTITION = f"{CONTENT_CHUNK_TABLE}_default"
+MENTOR_PARTITION_PREFIX = f"{CONTENT_CHUNK_TABLE}_m_"
+_OLD_TABLE = f"{CONTENT_CHUNK_TABLE}_old"
+
+_PARTITION_KEY_SUFFIX = ", mentor_id)"
+
+
+def mentor_partition_name(mentor_id) -> str:
+    """
+    Args:
+        mentor_id (UUID | str): The mentor id.
+    Returns:
+        str: Name of the mentor's partition (fits Postgres' 63-character limit).
+    """
+    return f"{MENTOR_PARTITION_PREFIX}{str(mentor_id).replace('-', '')}"
+
+
+def is_partitioned(cursor) -> bool:
+    """Whether the ContentChunk table currently uses the partitioned layout."""
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [CONTENT_CHUNK_TABLE])
+    row = cursor.fetchone()
+    return row is not None and row[0] == "p"
+
+
+def list_partitions(cursor) -> list[tuple[str, int]]:
+    """
+    Args:
+        cursor: A database cursor.
+    Returns:
+        list[tuple[str, int]]: (partition name, estimated row count) pairs.
+    """
+    cursor.execute(
+        """
+        SELECT child.relname, child.reltuples::bigint
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = to_regclass(%s)
+        ORDER BY child.relname
+        """,
+        [CONTENT_CHUNK_TABLE],
+    )
+    return cursor.fetchall()
+
+
+def _writable_columns(cursor, table: str) -> list[str]:
+    cursor.execute(
+        """
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = %s AND is_generated = 'NEVER'
+        ORDER BY ordinal_position
+        """,
+        [table],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _capture_schema(cursor) -> tuple[list[tuple[str, str]], list[tuple[str, str]], list[tuple[str, str]]]:
+    """
+    Definitions to recreate on the rebuilt table: primary key / unique
+    constraints, foreign keys, and standalone indexes, as (name, definition) pairs.
+    """
+    cursor.execute(
+        """
+        SELECT conname, contype, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = to_regclass(%s) AND contype IN ('p', 'u', 'f')
+        ORDER BY conname
+        """,
+        [CONTENT_CHUNK_TABLE],
+    )
+    keys, foreign_keys = [], []
+    for name, kind, definition in cursor.fetchall():
+        (foreign_keys if kind == "f" else keys).append((name, definition))
+
+    cursor.execute(
+        """
+        SELECT index_class.relname, pg_get_indexdef(index.indexrelid)
+        FROM pg_index index
+        JOIN pg_class index_class ON index_class.oid = index.indexrelid
+        WHERE index.indrelid = to_regclass(%s)
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conindid = index.indexrelid)
+        ORDER BY index_class.relname
+        """,
+        [CONTENT_CHUNK_TABLE],
+    )
+    # Indexes of a partitioned table are reported as "ON ONLY <table>".
+    indexes = [(name, definition.replace(" ON ONLY ", " ON ", 1)) for name, definition in cursor.fetchall()]
+    return keys, foreign_keys, indexes
+
+
+def _with_partition_key(definition: str, partitioned: bool) -> str:
+    """Add mentor_id to (or strip it from) a PRIMARY KEY / UNIQUE column list."""
+    has_key = definition.endswith(_PARTITION_KEY_SUFFIX)
+    if partitioned and not has_key and "mentor_id" not in definition:
+        return definition[:-1] + _PARTITION_KEY_SUFFIX
+    if not partitioned and has_key:
+        return definition[:-len(_PARTITION_KEY_SUFFIX)] + ")"
+    return definition
+
+
+def replace_unique_constraint(cursor, old_columns: list[str], new_columns: list[str], name: str) -> None:
+    """
+    Swap a UNIQUE constraint of the partitioned table for one on other columns (plus mentor_id).
+    Args:
+        cursor: A cursor inside a transaction.
+        old_columns (list[str]): Columns of the constraint to drop, without mentor_id.
+        new_columns (list[str]): Columns of the new constraint, without mentor_id.
+        name (str): Name of the new constraint.
+    """
+    cursor.execute(
+        """
+        SELECT conname FROM pg_constraint
+        WHERE conrelid = to_regclass(%s) AND contype = 'u' AND pg_get_constraintdef(oid) = %s
+        """,
+        [CONTENT_CHUNK_TABLE, f"UNIQUE ({', '.join(old_columns)}, mentor_id)"],
+    )
+    for (constraint,) in cursor.fetchall():
+        cursor.execute(f"ALTER TABLE {CONTENT_CHUNK_TABLE} DROP CONSTRAINT {constraint}")
+    cursor.execute(
+        f"ALTER TABLE {CONTENT_CHUNK_TABLE} ADD CONSTRAINT {name} UNIQUE ({', '.join(new_columns)}, mentor_id)"
+    )
+
+
+def _create_partition_sql(mentor_id) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {mentor_partition_name(mentor_id)} "
+        f"PARTITION OF {CONTENT_CHUNK_TABLE} FOR VALUES IN ('{mentor_id}')"
+    )
+
+
+def _rebuild(cursor, *, partitioned: bool, mentor_ids=()) -> None:
+    """
+    Recreate the table in the requested layout, copy every row and restore
+    constraints and indexes under their original names.
+    """
+    keys, foreign_keys, indexes = _capture_schema(cursor)
+    columns = ", ".join(_writable_columns(cursor, CONTENT_CHUNK_TABLE))
+    if partitioned:
+        # Per-mentor partial ANN indexes are superseded by the partitions' own indexes.
+        mentor_prefixes = tuple(column.mentor_index_prefix for column in VECTOR_COLUMNS.values())
+        indexes = [(name, definition) for name, definition in indexes if not name.startswith(mentor_prefixes)]
+
+    cursor.execute(f"ALTER TABLE {CONTENT_CHUNK_TABLE} RENAME TO {_OLD_TABLE}")
+    cursor.execute(
+        f"CREATE TABLE {CONTENT_CHUNK_TABLE} (LIKE {_OLD_TABLE} "
+        f"INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING STORAGE)"
+        + (" PARTITION BY LIST (mentor_id)" if partitioned else "")
+    )
+    if partitioned:
+        # Partitions exist before the copy so rows are routed straight to them.
+        cursor.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {CONTENT_CHUNK_TABLE} DEFAULT")
+        for mentor_id in mentor_ids:
+            cursor.execute(_create_partition_sql(mentor_id))
+
+    cursor.execute(f"INSERT INTO {CONTENT_CHUNK_TABLE} ({columns}) SELECT {columns} FROM {_OLD_TABLE}")
+    # Dropping the old table frees the constraint and index names for reuse.
+    cursor.execute(f"DROP TABLE {_OLD_TABLE}")
+
+    for name, definition in keys:
+        cursor.execute(
+            f"ALTER TABLE {CONTENT_CHUNK_TABLE} ADD CONSTRAINT {name} {_with_partition_key(definition, partitioned)}"
+        )
+    for name, definition in foreign_keys:
+        cursor.execute(f"ALTER TABLE {CONTENT_CHUNK_TABLE} ADD CONSTRAINT {name} {definition}")
+    for _, definition in indexes:
+        cursor.execute(definition)
+    cursor.execute(f"ANALYZE {CONTENT_CHUNK_TABLE}")
+
+
+def partition_content_chunks(cursor, mentor_ids) -> None:
+    """
+    Convert the ContentChunk table to the partitioned layout.
+    Args:
+        cursor: A cursor inside a transaction.
+        mentor_ids (Iterable): Mentors that get their own partition; others use the default partition.
+    """
+    if is_partitioned(cursor):
+        return
+    _rebuild(cursor, partitioned=True, mentor_ids=list(mentor_ids))
+
+
+def unpartition_content_chunks(cursor) -> None:
+    """
+    Convert the ContentChunk table back to a single plain table.
+    Args:
+        cursor: A cursor inside a transaction.
+    """
+    if not is_partitioned(cursor):
+        return
+    _rebuild(cursor, partitioned=False)
+
+
+def ensure_mentor_partition(cursor, mentor_id) -> bool:
+    """
+    Give a mentor its own partition, moving its rows out of the default partition.
+    The rows are moved into a standalone table which is then attached; attaching
+    builds that partition's copy of every index.
+    Args:
+        cursor: A cursor inside a transaction.
+        mentor_id (UUID | str): The mentor id.
+    Returns:
+        bool: True if a partition was created, False if it existed or the table is not partitioned.
+    """
+    if not is_partitioned(cursor):
+        return False
+    partition = mentor_partition_name(mentor_id)
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [partition])
+    if cursor.fetchone()[0]:
+        return False
+
+    columns = ", ".join(_writable_columns(cursor, CONTENT_CHUNK_TABLE))
+    cursor.execute(
+        f"CREATE TABLE {partition} (LIKE {CONTENT_CHUNK_TABLE} "
+        f"INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING STORAGE)"
+    )
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE mentor_id = %s RETURNING {columns}) "
+        f"INSERT INTO {partition} ({columns}) SELECT {columns} FROM moved",
+        [str(mentor_id)],
+    )
+    moved = cursor.rowcount
+    cursor.execute(
+        f"ALTER TABLE {CONTENT_CHUNK_TABLE} ATTACH PARTITION {partition} FOR VALUES IN ('{mentor_id}')"
+    )
+    logger.info("Mentor chunk partition created | mentor_id=%s partition=%s rows_moved=%s", mentor_id, partition, moved)
+    return True
@@ -0,0 +1,134 @@
+"""
+Distributed OpenAI rate limiting shared by every process that calls the API.
+
+Two token buckets live in Redis, one for requests per minute and one for
+tokens per minute, refilled continuously at limit/60 per second. A Lua script
+checks and debits both buckets atomically, using the Redis server clock, so all
+Celery workers and web processes draw from the same budget. When the budget is
+short the caller sleeps for the time the buckets need to refill instead of
+sending a request that would come back as a 429.
+
+If Redis is unreachable the limiter lets requests through (OpenAI's own 429s
+and the per-batch retries still apply) rather than stopping ingestion.
+"""
+import asyncio
+import logging
+import time
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# KEYS: request bucket, token bucket. ARGV: requests/min, tokens/min, tokens requested.
+# Returns 0 when both buckets were debited, otherwise the milliseconds to wait.
+_ACQUIRE_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local capacities = {tonumber(ARGV[1]), tonumber(ARGV[2])}
+local requested = {1, tonumber(ARGV[3])}
+local levels = {}
+local wait = 0
+for i = 1, 2 do
+    local state = redis.call('HMGET', KEYS[i], 'level', 'ts')
+    local level = tonumber(state[1]) or capacities[i]
+    local ts = tonumber(state[2]) or now
+    local rate = capacities[i] / 60000
+    level = math.min(capacities[i], level + math.max(0, now - ts) * rate)
+    levels[i] = level
+    if level < requested[i] then
+        wait = math.max(wait, math.ceil((requested[i] - level) / rate))
+    end
+end
+if wait > 0 then
+    return wait
+end
+for i = 1, 2 do
+    redis.call('HSET', KEYS[i], 'level', levels[i] - requested[i], 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], 120000)
+end
+return 0
+"""
+
+
+class RateLimitWaitTimeout(TimeoutError):
+    """Raised when the shared budget does not free up within the caller's max_wait."""
+
+
+class OpenAIRateLimiter:
+    """
+    RPM/TPM token buckets for one OpenAI model, shared through Redis.
+    Args:
+        model (str): The model the limits apply to (OpenAI limits are per model).
+        requests_per_minute (int): Requests per minute allowed across all processes.
+        tokens_per_minute (int): Input tokens per minute allowed across all processes.
+    """
+
+    def __init__(self, model: str, requests_per_minute: int, tokens_per_minute: int):
+        self.model = model
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.keys = [f"openai:ratelimit:{model}:rpm", f"openai:ratelimit:{model}:tpm"]
+        self._client = redis.Redis.from_url(settings.OPENAI_RATE_LIMIT_REDIS_URL)
+        self._script = self._client.register_script(_ACQUIRE_SCRIPT)
+
+    def _try_acquire(self, tokens: int) -> float:
+        """Debit one request and `tokens` tokens; return 0 on success, else seconds to wait."""
+        # A request larger than the whole bucket could never be admitted.
+        tokens = min(tokens, self.tokens_per_minute)
+        try:
+            wait_ms = self._script(
+                keys=self.keys,
+                args=[self.requests_per_minute, self.tokens_per_minute, tokens],
+            )
+        except redis.RedisError as e:
+            logger.warning("Rate limiter unavailable, not throttling | model=%s error=%s", self.model, e)
+            return 0.0
+        return int(wait_ms) / 1000
+
+    def acquire(self, tokens: int, max_wait: float | None = None) -> None:
+        """
+        Block until the request fits the shared budget.
+        Args:
+            tokens (int): Estimated input tokens of the request.
+            max_wait (float, optional): Give up after this many seconds.
+        Raises:
+            RateLimitWaitTimeout: If max_wait elapses first.
+        """
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        while wait := self._try_acquire(tokens):
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise RateLimitWaitTimeout(f"OpenAI {self.model} budget not available within {max_wait}s")
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int) -> None:
+        """
+        Wait (without blocking the event loop) until the request fits the shared budget.
+        The blocking Redis script call runs in a worker thread, so concurrent requests
+        on the loop keep running during the round trip.
+        Args:
+            tokens (int): Estimated input tokens of the request.
+        """
+        while wait := await asyncio.to_thread(self._try_acquire, tokens):
+            await asyncio.sleep(wait)
+
+
+_limiters: dict[str, OpenAIRateLimiter] = {}
+
+
+def get_rate_limiter(model: str) -> OpenAIRateLimiter | None:
+    """
+    Args:
+        model (str): The embedding model.
+    Returns:
+        OpenAIRateLimiter | None: The process-wide limiter for the model, or None when disabled.
+    """
+    if not settings.OPENAI_RATE_LIMIT_ENABLED:
+        return None
+    if model not in _limiters:
+        _limiters[model] = OpenAIRateLimiter(
+            model,
+            requests_per_minute=settings.OPENAI_EMBEDDING_RPM,
+            tokens_per_minute=settings.OPENAI_EMBEDDING_TPM,
+        )
+    return _limiters[model]
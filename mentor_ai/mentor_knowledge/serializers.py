@@ -3,6 +3,8 @@ Serializers for the Mentor AI application models.
 """
 from rest_framework import serializers
 from .models import Mentor, VideoContent, ContentChunk
+from .chunk_diff import chunk_content_hash
+from .transcript_store import slice_chunk_texts
 
 
 class MentorSerializer(serializers.ModelSerializer):
@@ -26,7 +28,51 @@ class VideoContentSerializer(serializers.ModelSerializer):
         read_only_fields = ["status", "created_at", "updated_at"]
 
 
+def resolve_chunk_texts(chunks) -> dict:
+    """
+    Slice the texts of chunks stored in the "blob" layout, loading each transcript once.
+    Args:
+        chunks (Iterable[ContentChunk]): The chunks about to be serialized.
+    Returns:
+        dict: Chunk id -> text, for the chunks stored as offsets.
+    """
+    sliced = [chunk for chunk in chunks if chunk.text_start is not None]
+    texts = slice_chunk_texts([
+        (chunk.video_id, chunk.generation, chunk.text_start, chunk.text_end) for chunk in sliced
+    ]) if sliced else []
+    return {chunk.id: text for chunk, text in zip(sliced, texts) if text is not None}
+
+
 class ContentChunkSerializer(serializers.ModelSerializer):
+    """
+    Chunks stored in the "blob" text layout are returned with their text sliced from the
+    transcript; pass the texts of a whole page as the "chunk_texts" context entry
+    (see resolve_chunk_texts()) to avoid loading them one chunk at a time.
+    A chunk's video is fixed once it exists: its mentor, generation and text offsets
+    all derive from that video.
+    """
+
     class Meta:
         model = ContentChunk
         fields = ["id", "video", "chunk_index", "text", "created_at"]
+
+    def validate_video(self, value):
+        if self.instance is not None and value.pk != self.instance.video_id:
+            raise serializers.ValidationError("A chunk cannot be moved to another video.")
+        return value
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if instance.text_start is not None:
+            texts = self.context.get("chunk_texts")
+            if texts is None:
+                texts = resolve_chunk_texts([instance])
+            data["text"] = texts.get(instance.id) or data["text"]
+        return data
+
+    def update(self, instance, validated_data):
+        if "text" in validated_data:
+            # Edited text is stored inline, and re-processing must not match it to its old text.
+            instance.text_start = instance.text_end = None
+            instance.content_hash = chunk_content_hash(validated_data["text"])
+        return super().update(instance, validated_data)
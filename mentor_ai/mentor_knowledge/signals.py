@@ -0,0 +1,33 @@
+import logging
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from mentor_knowledge.models import Mentor
+from mentor_knowledge.partitioning import ensure_mentor_partition
+
+logger = logging.getLogger(__name__)
+
+
+def _attach_mentor_partition(mentor_id):
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            ensure_mentor_partition(cursor, mentor_id)
+    except Exception:
+        # The mentor's chunks land in the default partition until
+        # `partition_chunks --all-mentors` gives it its own.
+        logger.exception("Creating the mentor chunk partition failed | mentor_id=%s", mentor_id)
+
+
+@receiver(post_save, sender=Mentor)
+def create_mentor_chunk_partition(sender, instance, created, **kwargs):
+    """
+    In the partitioned chunk layout, give every new mentor its own partition.
+    The DDL runs after the creating transaction commits, so it never holds that transaction's locks.
+    """
+    if not created or not settings.CONTENT_CHUNK_PARTITIONING:
+        return
+    mentor_id = instance.id
+    transaction.on_commit(lambda: _attach_mentor_partition(mentor_id))
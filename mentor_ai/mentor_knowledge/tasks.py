@@ -4,6 +4,9 @@ import time
 from celery import shared_task
 
 from mentor_knowledge.article_store import upsert_article
+from mentor_knowledge.embedding_coalescer import flush_pending, requeue_unembedded_chunks
+from mentor_knowledge.embedding_service import EmbeddingService
+from mentor_knowledge.generations import collect_stale_generations, videos_with_stale_generations
 from mentor_knowledge.models import VideoContent
 from mentor_knowledge.video_processing_service import VideoProcessingService
 
@@ -75,11 +78,14 @@ def process_video_transcript_task(self, video_id: str):
         result = service.process_video_from_youtube(video)
         duration = time.perf_counter() - start_time
         logger.info(
-            "Video transcript processing completed | task_id=%s video_id=%s duration_sec=%.2f chunks_created=%s transcript_entries=%s",
+            "Video transcript processing completed | task_id=%s video_id=%s duration_sec=%.2f chunks_created=%s chunks_reused=%s chunks_updated=%s chunks_deleted=%s transcript_entries=%s",
             self.request.id,
             video_id,
             duration,
             result.get("chunks_created"),
+            result.get("chunks_reused"),
+            result.get("chunks_updated"),
+            result.get("chunks_deleted"),
             result.get("transcript_entries"),
         )
         video.refresh_from_db(fields=["status"])
@@ -95,3 +101,63 @@ def process_video_transcript_task(self, video_id: str):
         )
         raise
 
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_kwargs={"max_retries": 5},
+)
+def flush_embedding_queue_task(self, force: bool = False):
+    """
+    Embed chunks queued by coalesced video processing (see embedding_coalescer).
+    Full batches are always flushed; `force` (the deadline run) also flushes the remainder.
+    """
+    start_time = time.perf_counter()
+    stats = flush_pending(EmbeddingService(), force=force)
+    logger.info(
+        "Embedding queue flushed | task_id=%s force=%s batches=%s chunks=%s videos_ready=%s duration_sec=%.2f",
+        self.request.id,
+        force,
+        stats["batches"],
+        stats["chunks"],
+        stats["videos_ready"],
+        time.perf_counter() - start_time,
+    )
+    return stats
+
+
+@shared_task(bind=True)
+def requeue_unembedded_chunks_task(self):
+    """
+    Periodic sweep: queue again the chunks whose ids were lost from the embedding queue
+    (see embedding_coalescer.requeue_unembedded_chunks).
+    """
+    queued = requeue_unembedded_chunks()
+    logger.info("Embedding queue sweep | task_id=%s chunks_requeued=%s", self.request.id, queued)
+    return {"chunks_requeued": queued}
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_kwargs={"max_retries": 5},
+)
+def collect_chunk_generations_task(self, video_id: str | None = None):
+    """
+    Delete chunks of superseded generations (see generations), in small batches.
+    Scheduled after every cut-over; without `video_id` it sweeps every video with stale chunks.
+    """
+    start_time = time.perf_counter()
+    video_ids = [video_id] if video_id else videos_with_stale_generations()
+    deleted = sum(collect_stale_generations(pk) for pk in video_ids)
+    logger.info(
+        "Chunk generations collected | task_id=%s videos=%s chunks_deleted=%s duration_sec=%.2f",
+        self.request.id,
+        len(video_ids),
+        deleted,
+        time.perf_counter() - start_time,
+    )
+    return {"videos": len(video_ids), "chunks_deleted": deleted}
@@ -0,0 +1,52 @@
+import struct
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from mentor_knowledge.binary_copy import _copy_fields, encode_rows
+from mentor_knowledge.models import ContentChunk, EmbeddingCacheEntry
+
+
+def _read_fields(payload: bytes, offset: int) -> tuple[list, int]:
+    (count,) = struct.unpack_from(">h", payload, offset)
+    offset += 2
+    values = []
+    for _ in range(count):
+        (length,) = struct.unpack_from(">i", payload, offset)
+        offset += 4
+        if length == -1:
+            values.append(None)
+            continue
+        values.append(payload[offset:offset + length])
+        offset += length
+    return values, offset
+
+
+class BinaryCopyTests(SimpleTestCase):
+    def test_encodes_header_rows_and_trailer(self):
+        entry = EmbeddingCacheEntry(key="k" * 64, model="m", dimensions=2, embedding=np.array([0.5, -1.0]))
+        payload = encode_rows([entry], _copy_fields(EmbeddingCacheEntry)).getvalue()
+
+        self.assertTrue(payload.startswith(b"PGCOPY\n\xff\r\n\x00"))
+        self.assertTrue(payload.endswith(struct.pack(">h", -1)))
+        values, _ = _read_fields(payload, 19)
+        key, model, dimensions, embedding, created_at = values
+        self.assertEqual(key, b"k" * 64)
+        self.assertEqual(struct.unpack(">i", dimensions), (2,))
+        # pgvector wire format: dimensions, unused, big-endian float32 values.
+        self.assertEqual(embedding, struct.pack(">HHff", 2, 0, 0.5, -1.0))
+        self.assertEqual(len(created_at), 8)
+
+    def test_generated_search_vector_is_not_copied(self):
+        columns = [field.column for field in _copy_fields(ContentChunk)]
+        self.assertNotIn("search_vector", columns)
+        self.assertIn("embedding", columns)
+
+    def test_nulls_are_encoded_as_minus_one_length(self):
+        chunk = ContentChunk(video_id="00000000-0000-0000-0000-000000000001", chunk_index=0, text="t")
+        chunk.mentor_id = "00000000-0000-0000-0000-000000000002"
+        fields = _copy_fields(ContentChunk)
+        values, _ = _read_fields(encode_rows([chunk], fields).getvalue(), 19)
+
+        self.assertIsNone(values[[field.column for field in fields].index("embedding")])
+        self.assertEqual(values[[field.column for field in fields].index("is_active")], b"\x00")
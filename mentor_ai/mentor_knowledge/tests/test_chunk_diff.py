@@ -0,0 +1,75 @@
+from django.test import SimpleTestCase
+
+from mentor_knowledge.chunk_diff import StoredChunk, chunk_content_hash, diff_chunks
+from mentor_knowledge.chunking_service import ChunkData
+
+
+def _chunk(index, text, start, end, tokens=2):
+    return ChunkData(text=text, chunk_index=index, start_seconds=start, end_seconds=end, word_count=2, token_count=tokens)
+
+
+def _stored(chunk_id, index, text, start, end, tokens=2):
+    return StoredChunk(
+        id=chunk_id,
+        chunk_index=index,
+        content_hash=chunk_content_hash(text),
+        start_seconds=start,
+        end_seconds=end,
+        token_count=tokens,
+    )
+
+
+class DiffChunksTests(SimpleTestCase):
+    def test_unchanged_transcript_reuses_every_row(self):
+        stored = [_stored("a", 0, "one two", 0, 5), _stored("b", 1, "three four", 5, 10)]
+
+        diff = diff_chunks(stored, [_chunk(0, "one two", 0.0, 5.4), _chunk(1, "three four", 5.4, 10.9)])
+
+        self.assertEqual(
+            diff.stats(),
+            {"chunks_reused": 2, "chunks_updated": 0, "chunks_created": 0, "chunks_deleted": 0},
+        )
+
+    def test_inserted_chunk_shifts_following_rows(self):
+        stored = [_stored("a", 0, "one two", 0, 5), _stored("b", 1, "three four", 5, 10)]
+        chunks = [_chunk(0, "intro text", 0.0, 3.0), _chunk(1, "one two", 3.0, 8.0), _chunk(2, "three four", 8.0, 13.0)]
+
+        diff = diff_chunks(stored, chunks)
+
+        self.assertEqual([(row.id, chunk.chunk_index) for row, chunk in diff.updated], [("a", 1), ("b", 2)])
+        self.assertEqual([chunk.text for chunk in diff.created], ["intro text"])
+        self.assertEqual(diff.reused, [])
+        self.assertEqual(diff.deleted, [])
+
+    def test_changed_text_creates_new_row_and_deletes_orphan(self):
+        stored = [_stored("a", 0, "one two", 0, 5), _stored("b", 1, "three four", 5, 10)]
+
+        diff = diff_chunks(stored, [_chunk(0, "one two", 0.0, 5.0), _chunk(1, "three five", 5.0, 10.0)])
+
+        self.assertEqual([row.id for row in diff.reused], ["a"])
+        self.assertEqual([chunk.text for chunk in diff.created], ["three five"])
+        self.assertEqual([row.id for row in diff.deleted], ["b"])
+
+    def test_token_count_change_updates_row(self):
+        stored = [_stored("a", 0, "one two", 0, 5, tokens=None)]
+
+        diff = diff_chunks(stored, [_chunk(0, "one two", 0.0, 5.0, tokens=2)])
+
+        self.assertEqual([row.id for row, _ in diff.updated], ["a"])
+
+    def test_repeated_text_is_matched_in_position_order(self):
+        stored = [_stored("late", 4, "same words", 40, 45), _stored("early", 1, "same words", 10, 15)]
+        chunks = [_chunk(0, "same words", 10.0, 15.0), _chunk(1, "same words", 40.0, 45.0)]
+
+        diff = diff_chunks(stored, chunks)
+
+        self.assertEqual([(row.id, chunk.start_seconds) for row, chunk in diff.updated], [("early", 10.0), ("late", 40.0)])
+
+    def test_moved_transcript_offsets_update_the_row(self):
+        stored = [_stored("a", 0, "one two", 0, 5)]
+        chunk = _chunk(0, "one two", 0.0, 5.0)
+        chunk.text_start, chunk.text_end = 6, 13
+
+        diff = diff_chunks(stored, [chunk])
+
+        self.assertEqual([row.id for row, _ in diff.updated], ["a"])
@@ -0,0 +1,190 @@
+import json
+from dataclasses import astuple
+from pathlib import Path
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from mentor_knowledge.chunking_service import TokenBudgetChunker, TranscriptChunker, get_transcript_chunker
+from mentor_knowledge.management.commands.benchmark_chunker import legacy_chunk_transcript
+from mentor_knowledge.tokenizers import ApproximateTokenizer, Tokenizer, get_tokenizer
+
+
+def _as_rows(chunks):
+    # Types included: timings must stay Python floats, not NumPy scalars.
+    return [tuple((type(value), value) for value in astuple(chunk)) for chunk in chunks]
+
+
+class TranscriptChunkerTests(SimpleTestCase):
+    def assertSameAsLegacy(self, transcript, chunk_size, overlap):
+        chunker = TranscriptChunker(chunk_size_words=chunk_size, overlap_words=overlap)
+        self.assertEqual(
+            _as_rows(chunker.chunk_transcript(transcript)),
+            _as_rows(legacy_chunk_transcript(transcript, chunk_size, overlap)),
+        )
+
+    def test_matches_legacy_output_on_full_transcript(self):
+        path = Path(settings.BASE_DIR) / "transcript_full_test.json"
+        entries = json.loads(path.read_text(encoding="utf-8"))["entries"]
+        for chunk_size, overlap in ((350, 50), (40, 10), (7, 0), (1, 0)):
+            with self.subTest(chunk_size=chunk_size, overlap=overlap):
+                self.assertSameAsLegacy(entries, chunk_size, overlap)
+
+    def test_matches_legacy_output_on_irregular_segments(self):
+        transcript = [
+            {"text": "  hello   wide\tworld ", "start": 1, "duration": 3},
+            {"text": "", "start": 4.0, "duration": 1.0},
+            {"text": "   ", "start": 5.0, "duration": 1.0},
+            {"text": "héllo again", "start": 5.123, "duration": 0},
+            {"text": "no timing"},
+        ]
+        for chunk_size, overlap in ((3, 1), (2, 0), (10, 2)):
+            with self.subTest(chunk_size=chunk_size, overlap=overlap):
+                self.assertSameAsLegacy(transcript, chunk_size, overlap)
+
+    def test_empty_transcripts_produce_no_chunks(self):
+        chunker = TranscriptChunker()
+        self.assertEqual(chunker.chunk_transcript([]), [])
+        self.assertEqual(chunker.chunk_transcript([{"text": " ", "start": 0.0, "duration": 1.0}]), [])
+
+    def test_iter_chunks_is_lazy(self):
+        chunker = TranscriptChunker(chunk_size_words=2, overlap_words=0)
+        chunks = chunker.iter_chunks([{"text": "one two three four five", "start": 0.0, "duration": 5.0}])
+
+        first = next(chunks)
+        self.assertEqual((first.text, first.start_seconds, first.end_seconds), ("one two", 0.0, 2.0))
+        self.assertEqual([chunk.text for chunk in chunks], ["three four", "five"])
+
+
+class WordTokenizer(Tokenizer):
+    """One token per word, so expected chunks are easy to count by hand."""
+
+    def count(self, text):
+        return len(text.split())
+
+
+def _segment(text, start, duration=1.0):
+    return {"text": text, "start": start, "duration": duration}
+
+
+class TokenBudgetChunkerTests(SimpleTestCase):
+    def _chunker(self, chunk_size, overlap=0, pause_seconds=1.0):
+        return TokenBudgetChunker(
+            chunk_size_tokens=chunk_size,
+            overlap_tokens=overlap,
+            pause_seconds=pause_seconds,
+            tokenizer=WordTokenizer(),
+        )
+
+    def test_cuts_at_last_sentence_end_within_budget(self):
+        transcript = [
+            _segment("one two three.", 0.0),
+            _segment("four five", 1.0),
+            _segment("six seven", 2.0),
+            _segment("eight nine.", 3.0),
+        ]
+
+        chunks = self._chunker(chunk_size=6).chunk_transcript(transcript)
+
+        self.assertEqual([chunk.text for chunk in chunks], ["one two three.", "four five six seven eight nine."])
+        self.assertEqual([chunk.token_count for chunk in chunks], [3, 6])
+        self.assertEqual([chunk.word_count for chunk in chunks], [3, 6])
+        self.assertEqual([(chunk.start_seconds, chunk.end_seconds) for chunk in chunks], [(0.0, 1.0), (1.0, 4.0)])
+
+    def test_pause_between_segments_is_a_boundary(self):
+        transcript = [_segment("one two", 0.0), _segment("three four", 5.0), _segment("five six", 6.0)]
+
+        chunks = self._chunker(chunk_size=5).chunk_transcript(transcript)
+
+        self.assertEqual([chunk.text for chunk in chunks], ["one two", "three four five six"])
+
+    def test_ignores_boundaries_that_leave_a_chunk_under_half_full(self):
+        transcript = [_segment("one.", 0.0), _segment("two three", 1.0), _segment("four five", 2.0)]
+
+        chunks = self._chunker(chunk_size=4).chunk_transcript(transcript)
+
+        self.assertEqual([chunk.text for chunk in chunks], ["one. two three", "four five"])
+
+    def test_overlap_repeats_whole_trailing_segments(self):
+        transcript = [_segment(f"w{i} x{i}.", float(i)) for i in range(4)]
+
+        chunks = self._chunker(chunk_size=4, overlap=2).chunk_transcript(transcript)
+
+        self.assertEqual([chunk.text for chunk in chunks], ["w0 x0. w1 x1.", "w1 x1. w2 x2.", "w2 x2. w3 x3."])
+        self.assertEqual([chunk.chunk_index for chunk in chunks], [0, 1, 2])
+
+    def test_splits_segments_over_the_budget(self):
+        transcript = [_segment("a b c d e f g", 10.0, duration=7.0)]
+
+        chunks = self._chunker(chunk_size=3).chunk_transcript(transcript)
+
+        self.assertEqual([chunk.text for chunk in chunks], ["a b c", "d e", "f g"])
+        self.assertEqual([(chunk.start_seconds, chunk.end_seconds) for chunk in chunks], [(10.0, 13.0), (13.0, 15.0), (15.0, 17.0)])
+
+    def test_segment_with_fewer_words_than_budget_pieces_is_split_per_word(self):
+        # 8 estimated tokens over a budget of 2 would need 4 runs, but there are only 2 words.
+        transcript = [_segment("abcdefghijklmnop qrstuvwxyzabcdef", 0.0, duration=2.0)]
+        chunker = TokenBudgetChunker(chunk_size_tokens=2, overlap_tokens=0, tokenizer=ApproximateTokenizer())
+
+        chunks = chunker.chunk_transcript(transcript)
+
+        self.assertEqual([chunk.text for chunk in chunks], ["abcdefghijklmnop", "qrstuvwxyzabcdef"])
+        self.assertEqual([(chunk.start_seconds, chunk.end_seconds) for chunk in chunks], [(0.0, 1.0), (1.0, 2.0)])
+
+    def test_full_transcript_chunks_stay_within_budget_and_cover_every_word(self):
+        path = Path(settings.BASE_DIR) / "transcript_full_test.json"
+        entries = json.loads(path.read_text(encoding="utf-8"))["entries"]
+        tokenizer = ApproximateTokenizer()
+        chunker = TokenBudgetChunker(chunk_size_tokens=300, overlap_tokens=0, tokenizer=tokenizer)
+
+        chunks = chunker.chunk_transcript(entries)
+
+        self.assertTrue(all(chunk.token_count <= 300 for chunk in chunks))
+        self.assertEqual([chunk.token_count for chunk in chunks], tokenizer.count_many([chunk.text for chunk in chunks]))
+        self.assertEqual(
+            " ".join(chunk.text for chunk in chunks).split(),
+            " ".join(entry["text"] for entry in entries).split(),
+        )
+
+    def test_empty_transcripts_produce_no_chunks(self):
+        self.assertEqual(self._chunker(chunk_size=5).chunk_transcript([]), [])
+        self.assertEqual(self._chunker(chunk_size=5).chunk_transcript([_segment(" ", 0.0)]), [])
+
+
+class ChunkerFactoryTests(SimpleTestCase):
+    @override_settings(CHUNKING_MODE="tokens", CHUNK_SIZE_TOKENS=123, CHUNK_TOKENIZER="approximate")
+    def test_tokens_mode_builds_token_budget_chunker(self):
+        chunker = get_transcript_chunker()
+        self.assertIsInstance(chunker, TokenBudgetChunker)
+        self.assertEqual(chunker.chunk_size, 123)
+
+    @override_settings(CHUNKING_MODE="words", CHUNK_SIZE_WORDS=200)
+    def test_words_mode_builds_word_chunker(self):
+        chunker = get_transcript_chunker()
+        self.assertIsInstance(chunker, TranscriptChunker)
+        self.assertEqual(chunker.chunk_size, 200)
+
+    def test_unknown_mode_raises(self):
+        with self.assertRaises(ValueError):
+            get_transcript_chunker("sentences")
+
+
+class TokenizerTests(SimpleTestCase):
+    def test_approximate_counts_started_four_character_runs(self):
+        tokenizer = ApproximateTokenizer()
+        self.assertEqual(tokenizer.count("I'm motivated!"), 7)  # I, ', m, moti-vate-d, !
+        self.assertEqual(tokenizer.count(""), 0)
+        self.assertEqual(tokenizer.count_many(["a b", "abcde"]), [2, 2])
+
+    def test_approximate_is_selected_explicitly(self):
+        self.assertIsInstance(get_tokenizer("approximate"), ApproximateTokenizer)
+
+    def test_unknown_tokenizer_raises(self):
+        with self.assertRaises(ValueError):
+            get_tokenizer("words")
+
+    def test_default_tokenizer_follows_settings(self):
+        with override_settings(CHUNK_TOKENIZER="approximate"):
+            self.assertIsInstance(get_tokenizer(), ApproximateTokenizer)
+        with override_settings(CHUNK_TOKENIZER="words"), self.assertRaises(ValueError):
+            get_tokenizer()
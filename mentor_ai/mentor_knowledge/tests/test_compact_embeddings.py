@@ -0,0 +1,31 @@
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+from pgvector import HalfVector
+
+from mentor_knowledge.compact_embeddings import compact_field_values, get_compact_type
+
+
+class CompactEmbeddingsTests(SimpleTestCase):
+    def test_bit_type_keeps_the_sign_of_each_dimension(self):
+        values = compact_field_values([0.5, -0.1, 0.0, 2.0], ["bit"])
+
+        self.assertEqual(values, {"embedding_bit": "1001"})
+
+    def test_halfvec_type_builds_half_vector(self):
+        values = compact_field_values([0.5, -0.25], ["halfvec"])
+
+        self.assertIsInstance(values["embedding_half"], HalfVector)
+        self.assertEqual(values["embedding_half"].to_list(), [0.5, -0.25])
+
+    @override_settings(EMBEDDING_SHORT_DIMENSIONS=2)
+    def test_short_type_keeps_normalized_prefix(self):
+        values = compact_field_values([3.0, 4.0, 12.0], ["short"])
+
+        np.testing.assert_allclose(values["embedding_short"], [0.6, 0.8])
+
+    def test_no_values_for_missing_embedding(self):
+        self.assertEqual(compact_field_values(None, ["halfvec", "bit"]), {})
+
+    def test_unknown_type_is_rejected(self):
+        with self.assertRaises(ValueError):
+            get_compact_type("int4")
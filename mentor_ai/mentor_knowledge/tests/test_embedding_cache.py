@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+
+from django.test import SimpleTestCase, override_settings
+
+from mentor_knowledge.embedding_cache import embedding_cache_key, normalize_text
+from mentor_knowledge.embedding_service import EmbeddingService
+
+
+class EmbeddingCacheKeyTests(SimpleTestCase):
+    def test_whitespace_differences_share_a_key(self):
+        self.assertEqual(normalize_text("  hello\n\tworld  "), "hello world")
+        self.assertEqual(
+            embedding_cache_key("m", 1536, normalize_text("hello  world")),
+            embedding_cache_key("m", 1536, normalize_text("hello world\n")),
+        )
+
+    def test_model_and_dimensions_are_part_of_the_key(self):
+        key = embedding_cache_key("m", 1536, "hello")
+        self.assertNotEqual(key, embedding_cache_key("other", 1536, "hello"))
+        self.assertNotEqual(key, embedding_cache_key("m", 256, "hello"))
+        self.assertEqual(len(key), 64)
+
+
+@override_settings(
+    EMBEDDING_CACHE_ENABLED=True,
+    EMBEDDING_MODEL="text-embedding-3-small",
+    EMBEDDING_DIMENSIONS=2,
+    OPENAI_RATE_LIMIT_ENABLED=False,
+    EMBEDDING_PROVIDER="openai",
+    EMBEDDING_PROVIDER_LATENCY_MS=0,
+)
+class EmbeddingServiceCacheTests(SimpleTestCase):
+    def setUp(self):
+        with mock.patch("mentor_knowledge.embedding_providers.OpenAI"):
+            self.service = EmbeddingService()
+        async_client = mock.Mock(close=mock.AsyncMock())
+        async_client.embeddings.create = mock.AsyncMock(side_effect=lambda input, **kwargs: SimpleNamespace(
+            data=[SimpleNamespace(index=i, embedding=[float(len(text)), 0.0]) for i, text in enumerate(input)]
+        ))
+        self.create = async_client.embeddings.create
+        patcher = mock.patch("mentor_knowledge.embedding_providers.AsyncOpenAI", return_value=async_client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch("mentor_knowledge.embedding_service.store_embeddings")
+    @mock.patch("mentor_knowledge.embedding_service.get_cached_embeddings")
+    def test_only_distinct_misses_are_requested(self, get_cached, store):
+        cached_key = embedding_cache_key("text-embedding-3-small", 2, "cached")
+        get_cached.return_value = {cached_key: [9.0, 9.0]}
+
+        embeddings = self.service.generate_embeddings_batch(["cached", "new", "new ", "cached"])
+
+        self.create.assert_called_once()
+        self.assertEqual(self.create.call_args.kwargs["input"], ["new"])
+        np.testing.assert_array_equal(embeddings, [[9.0, 9.0], [3.0, 0.0], [3.0, 0.0], [9.0, 9.0]])
+        np.testing.assert_array_equal(list(store.call_args.kwargs["embeddings"].values()), [[3.0, 0.0]])
+        self.assertEqual((self.service.last_cache_stats.hits, self.service.last_cache_stats.misses), (2, 2))
+        self.assertEqual(self.service.last_cache_stats.hit_ratio, 0.5)
+
+    @mock.patch("mentor_knowledge.embedding_service.store_embeddings")
+    @mock.patch("mentor_knowledge.embedding_service.get_cached_embeddings")
+    def test_full_hit_makes_no_request(self, get_cached, store):
+        get_cached.return_value = {embedding_cache_key("text-embedding-3-small", 2, "a"): [1.0, 0.0]}
+
+        self.assertEqual(self.service.generate_embeddings_batch(["a"]), [[1.0, 0.0]])
+        self.create.assert_not_called()
+        store.assert_not_called()
@@ -0,0 +1,154 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from mentor_knowledge import embedding_coalescer
+from mentor_knowledge.chunking_service import ChunkData
+from mentor_knowledge.models import ContentChunk, Mentor, VideoContent
+from mentor_knowledge.video_processing_service import VideoProcessingService
+
+
+@override_settings(EMBEDDING_COALESCE_BATCH_SIZE=2)
+class FlushPendingTests(SimpleTestCase):
+    def setUp(self):
+        self.redis = mock.Mock()
+        patcher = mock.patch.object(embedding_coalescer, "_redis", return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = mock.Mock(last_cache_stats=mock.Mock(hit_ratio=0.0))
+
+    @mock.patch.object(embedding_coalescer, "mark_ready_videos", return_value=[])
+    @mock.patch.object(embedding_coalescer, "embed_chunk_batch", return_value={"video-1": 2})
+    @mock.patch.object(embedding_coalescer, "_pop_batch", return_value=["a", "b"])
+    def test_only_full_batches_without_force(self, pop, embed, mark_ready):
+        self.redis.llen.side_effect = [3, 1]
+
+        stats = embedding_coalescer.flush_pending(self.service)
+
+        self.assertEqual(stats["batches"], 1)
+        pop.assert_called_once_with(2)
+        self.redis.delete.assert_not_called()
+
+    @mock.patch.object(embedding_coalescer, "mark_ready_videos", return_value=["video-1"])
+    @mock.patch.object(embedding_coalescer, "embed_chunk_batch", return_value={"video-1": 2})
+    @mock.patch.object(embedding_coalescer, "_pop_batch", side_effect=[["a", "b"], ["c"]])
+    def test_force_flushes_the_remainder_and_opens_a_new_window(self, pop, embed, mark_ready):
+        self.redis.llen.side_effect = [3, 1, 0]
+
+        stats = embedding_coalescer.flush_pending(self.service, force=True)
+
+        self.assertEqual(stats, {"batches": 2, "chunks": 3, "videos_ready": 2})
+        self.redis.delete.assert_called_once_with(embedding_coalescer.DEADLINE_KEY)
+
+    @mock.patch.object(embedding_coalescer, "_requeue")
+    @mock.patch.object(embedding_coalescer, "embed_chunk_batch", side_effect=RuntimeError("boom"))
+    @mock.patch.object(embedding_coalescer, "_pop_batch", return_value=["a", "b"])
+    def test_failed_batch_is_requeued(self, pop, embed, requeue):
+        self.redis.llen.return_value = 2
+
+        with self.assertRaises(RuntimeError):
+            embedding_coalescer.flush_pending(self.service)
+        requeue.assert_called_once_with(["a", "b"])
+
+    @mock.patch.object(embedding_coalescer, "mark_ready_videos", return_value=[])
+    @mock.patch.object(embedding_coalescer, "embed_chunk_batch", return_value={})
+    @mock.patch.object(embedding_coalescer, "_pop_batch", return_value=["a", "b"])
+    def test_written_batch_is_no_longer_tracked(self, pop, embed, mark_ready):
+        self.redis.llen.side_effect = [2, 0]
+
+        embedding_coalescer.flush_pending(self.service)
+
+        self.redis.hdel.assert_called_once_with(embedding_coalescer.TRACKED_KEY, "a", "b")
+
+    def test_only_untracked_or_long_popped_ids_are_lost(self):
+        # queued, popped recently, popped before the cut-off, untracked
+        self.redis.hmget.return_value = [b"0", b"950.5", b"800", None]
+
+        lost = embedding_coalescer._lost_chunk_ids(["queued", "in-flight", "stale", "missing"], 900.0)
+
+        self.assertEqual(lost, ["stale", "missing"])
+
+
+@override_settings(EMBEDDING_COALESCE_ENABLED=True, EMBEDDING_COMPACT_TYPES=[])
+class CoalescedProcessingTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch("mentor_knowledge.video_processing_service.EmbeddingService")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mentor = Mentor.objects.create(name="Test Mentor", slug="test-mentor")
+        self.video = VideoContent.objects.create(
+            mentor=self.mentor,
+            title="A long enough title",
+            youtube_video_id="dQw4w9WgXcQ",
+        )
+
+    @mock.patch("mentor_knowledge.video_processing_service.enqueue_chunks")
+    def test_chunks_are_queued_and_marked_ready_by_the_flush(self, enqueue):
+        service = VideoProcessingService()
+        service.chunker = mock.Mock(iter_chunks=mock.Mock(return_value=iter([
+            ChunkData(text="first", chunk_index=0, start_seconds=0.0, end_seconds=2.0, word_count=1),
+            ChunkData(text="second", chunk_index=1, start_seconds=2.0, end_seconds=4.0, word_count=1),
+        ])))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = service.process_video_with_transcript(self.video, [{"text": "x", "start": 0.0, "duration": 4.0}])
+
+        self.assertTrue(result["embedding_queued"])
+        self.video.refresh_from_db()
+        self.assertEqual(self.video.status, VideoContent.Status.EMBEDDED)
+        queued = list(enqueue.call_args.args[0])
+        self.assertEqual(len(queued), 2)
+        self.assertFalse(ContentChunk.objects.filter(video=self.video, token_count__isnull=True).exists())
+        # The new generation is written but not served until the flush activates it.
+        self.assertFalse(ContentChunk.objects.active().filter(video=self.video).exists())
+
+        embedding_service = mock.Mock()
+        embedding_service.generate_embeddings_batch.side_effect = lambda texts, token_counts=None: [[0.1] * 1536 for _ in texts]
+        video_generations = embedding_coalescer.embed_chunk_batch(
+            [str(chunk_id) for chunk_id in queued], embedding_service
+        )
+
+        self.assertEqual(video_generations, {self.video.id: result["generation"]})
+        self.assertEqual(embedding_coalescer.mark_ready_videos(video_generations), [self.video.id])
+        self.video.refresh_from_db()
+        self.assertEqual(self.video.status, VideoContent.Status.READY)
+        self.assertEqual(self.video.active_generation, result["generation"])
+        self.assertEqual(ContentChunk.objects.active().filter(video=self.video).count(), 2)
+        self.assertFalse(ContentChunk.objects.filter(video=self.video, embedding__isnull=True).exists())
+
+    @mock.patch("mentor_knowledge.video_processing_service.enqueue_chunks")
+    def test_incremental_reprocessing_embeds_before_serving(self, enqueue):
+        service = VideoProcessingService()
+        service.embedding_service.generate_embeddings_batch.side_effect = (
+            lambda texts, token_counts=None: [[0.1] * 1536 for _ in texts]
+        )
+        service.chunker = mock.Mock(chunk_transcript=mock.Mock(return_value=[
+            ChunkData(text="first", chunk_index=0, start_seconds=0.0, end_seconds=2.0, word_count=1),
+        ]))
+
+        result = service.process_video_with_transcript(self.video, [{"text": "x"}], incremental=True)
+
+        enqueue.assert_not_called()
+        self.assertNotIn("embedding_queued", result)
+        self.video.refresh_from_db()
+        self.assertEqual(self.video.status, VideoContent.Status.READY)
+        chunks = ContentChunk.objects.active().filter(video=self.video)
+        self.assertEqual(chunks.count(), 1)
+        self.assertFalse(chunks.filter(embedding__isnull=True).exists())
+
+    @mock.patch.object(embedding_coalescer, "_redis")
+    @mock.patch.object(embedding_coalescer, "enqueue_chunks")
+    def test_sweep_requeues_chunks_left_unembedded(self, enqueue, redis_client):
+        redis_client.return_value.hmget.return_value = [None]
+        self.video.status = VideoContent.Status.EMBEDDED
+        self.video.save()
+        lost = ContentChunk.objects.create(video=self.video, generation=2, chunk_index=0, text="lost")
+        ContentChunk.objects.create(video=self.video, generation=2, chunk_index=1, text="recent")
+        ContentChunk.objects.filter(id=lost.id).update(created_at=timezone.now() - timedelta(hours=1))
+
+        with override_settings(EMBEDDING_COALESCE_SWEEP_SECONDS=600):
+            self.assertEqual(embedding_coalescer.requeue_unembedded_chunks(), 1)
+
+        enqueue.assert_called_once_with([lost.id])
@@ -0,0 +1,77 @@
+import base64
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from mentor_knowledge.embedding_providers import (
+    LatencyEmbeddingProvider,
+    LocalHashEmbeddingProvider,
+    OpenAIEmbeddingProvider,
+    get_embedding_provider,
+)
+
+
+class LocalHashEmbeddingProviderTests(SimpleTestCase):
+    def setUp(self):
+        self.provider = LocalHashEmbeddingProvider(dimensions=256)
+
+    def test_embeddings_are_deterministic_normalized_and_sized(self):
+        first = self.provider.embed(["Stay motivated every day", ""])
+        second = LocalHashEmbeddingProvider(dimensions=256).embed(["Stay motivated every day", ""])
+
+        np.testing.assert_array_equal(first, second)
+        self.assertEqual(first[0].shape, (256,))
+        self.assertEqual(first[0].dtype, np.float32)
+        self.assertAlmostEqual(float(np.linalg.norm(first[0])), 1.0, places=5)
+        self.assertFalse(first[1].any())
+
+    def test_similar_texts_are_closer_than_unrelated_ones(self):
+        anchor, similar, unrelated = np.array(
+            self.provider.embed(["how to stay motivated", "How to stay  motivated?", "quarterly tax filing rules"])
+        )
+        self.assertGreater(anchor @ similar, anchor @ unrelated)
+
+    def test_batch_matches_single_calls(self):
+        texts = ["alpha beta", "gamma", "delta epsilon zeta"]
+        np.testing.assert_array_equal(self.provider.embed(texts), [self.provider.embed([text])[0] for text in texts])
+
+
+class EmbeddingProviderRegistryTests(SimpleTestCase):
+    @override_settings(EMBEDDING_PROVIDER="local", EMBEDDING_PROVIDER_LATENCY_MS=0, EMBEDDING_PROVIDER_LATENCY_PER_INPUT_MS=0)
+    def test_selects_provider_from_settings(self):
+        provider = get_embedding_provider()
+        self.assertIsInstance(provider, LocalHashEmbeddingProvider)
+        self.assertFalse(provider.rate_limited)
+
+    @override_settings(EMBEDDING_PROVIDER_LATENCY_MS=20, EMBEDDING_PROVIDER_LATENCY_PER_INPUT_MS=0)
+    def test_latency_wrapper_delays_calls(self):
+        provider = get_embedding_provider("local")
+        self.assertIsInstance(provider, LatencyEmbeddingProvider)
+
+        start = time.perf_counter()
+        provider.embed(["hello"])
+        self.assertGreaterEqual(time.perf_counter() - start, 0.02)
+
+    def test_unknown_provider_is_rejected(self):
+        with self.assertRaises(ValueError):
+            get_embedding_provider("nope")
+
+
+class OpenAIEmbeddingProviderTests(SimpleTestCase):
+    @override_settings(EMBEDDING_DIMENSIONS=3)
+    def test_requests_base64_and_decodes_float32(self):
+        vector = np.array([0.5, -0.25, 1.0], dtype="<f4")
+        with mock.patch("mentor_knowledge.embedding_providers.OpenAI") as openai:
+            provider = OpenAIEmbeddingProvider(model="text-embedding-3-small")
+        openai.return_value.embeddings.create.return_value = SimpleNamespace(
+            data=[SimpleNamespace(index=0, embedding=base64.b64encode(vector.tobytes()).decode())]
+        )
+
+        [embedding] = provider.embed(["hello"])
+
+        self.assertEqual(openai.return_value.embeddings.create.call_args.kwargs["encoding_format"], "base64")
+        self.assertEqual(embedding.dtype, np.float32)
+        np.testing.assert_array_equal(embedding, vector)
@@ -0,0 +1,148 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+import httpx
+import redis
+from django.test import SimpleTestCase, override_settings
+from openai import APIConnectionError, BadRequestError
+
+from mentor_knowledge.embedding_service import EmbeddingService, estimate_tokens, split_batches
+from mentor_knowledge.rate_limit import OpenAIRateLimiter, RateLimitWaitTimeout
+
+
+def _response(texts):
+    # Reversed on purpose: results must be re-sorted by index.
+    return SimpleNamespace(
+        data=[SimpleNamespace(index=i, embedding=[float(len(text))]) for i, text in reversed(list(enumerate(texts)))]
+    )
+
+
+class SplitBatchesTests(SimpleTestCase):
+    def test_respects_max_inputs(self):
+        self.assertEqual(split_batches(["a"] * 5, max_inputs=2, max_tokens=100), [[0, 1], [2, 3], [4]])
+
+    def test_respects_max_tokens(self):
+        texts = ["x" * 30, "x" * 30, "x" * 30]  # 10 estimated tokens each
+        self.assertEqual(estimate_tokens(texts[0]), 10)
+        self.assertEqual(split_batches(texts, max_inputs=10, max_tokens=25), [[0, 1], [2]])
+
+    def test_oversized_input_gets_its_own_batch(self):
+        self.assertEqual(split_batches(["a", "x" * 300, "b"], max_inputs=10, max_tokens=20), [[0], [1], [2]])
+
+    def test_precomputed_token_counts_replace_estimates(self):
+        texts = ["x" * 30, "x" * 30, "x" * 30]
+        self.assertEqual(split_batches(texts, max_inputs=10, max_tokens=25, token_counts=[8, 8, None]), [[0, 1], [2]])
+        self.assertEqual(split_batches(texts, max_inputs=10, max_tokens=25, token_counts=[8, 8, 8]), [[0, 1, 2]])
+
+
+@override_settings(
+    EMBEDDING_CACHE_ENABLED=False,
+    EMBEDDING_BATCH_MAX_INPUTS=2,
+    EMBEDDING_BATCH_MAX_TOKENS=1000,
+    EMBEDDING_BATCH_CONCURRENCY=3,
+    EMBEDDING_BATCH_MAX_RETRIES=2,
+    EMBEDDING_BATCH_RETRY_BACKOFF=0,
+    OPENAI_RATE_LIMIT_ENABLED=False,
+    EMBEDDING_PROVIDER="openai",
+    EMBEDDING_PROVIDER_LATENCY_MS=0,
+)
+class EmbeddingServiceBatchingTests(SimpleTestCase):
+    def setUp(self):
+        with mock.patch("mentor_knowledge.embedding_providers.OpenAI"):
+            self.service = EmbeddingService()
+        async_client = mock.Mock(close=mock.AsyncMock())
+        async_client.embeddings.create = mock.AsyncMock()
+        self.create = async_client.embeddings.create
+        patcher = mock.patch("mentor_knowledge.embedding_providers.AsyncOpenAI", return_value=async_client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_batches_are_reassembled_in_input_order(self):
+        self.create.side_effect = lambda input, **kwargs: _response(input)
+        texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+
+        embeddings = self.service.generate_embeddings_batch(texts)
+
+        self.assertEqual([embedding.tolist() for embedding in embeddings], [[1.0], [2.0], [3.0], [4.0], [5.0]])
+        self.assertEqual(self.create.call_count, 3)
+
+    def test_only_the_failed_batch_is_retried(self):
+        failures = {"ccc": 1}
+
+        def create(input, **kwargs):
+            if failures.get(input[0]):
+                failures[input[0]] -= 1
+                raise APIConnectionError(request=httpx.Request("POST", "https://api.openai.com"))
+            return _response(input)
+
+        self.create.side_effect = create
+
+        embeddings = self.service.generate_embeddings_batch(["a", "bb", "ccc", "dddd"])
+
+        self.assertEqual([embedding.tolist() for embedding in embeddings], [[1.0], [2.0], [3.0], [4.0]])
+        sent = [call.kwargs["input"] for call in self.create.call_args_list]
+        self.assertEqual(sorted(map(tuple, sent)), [("a", "bb"), ("ccc", "dddd"), ("ccc", "dddd")])
+
+    def test_non_retryable_error_fails_without_retry(self):
+        request = httpx.Request("POST", "https://api.openai.com")
+        self.create.side_effect = BadRequestError(
+            "too long", response=httpx.Response(400, request=request), body=None
+        )
+
+        with self.assertRaisesMessage(Exception, "Failed to create embeddings"):
+            self.service.generate_embeddings_batch(["a"])
+        self.assertEqual(self.create.call_count, 1)
+
+
+@override_settings(OPENAI_RATE_LIMIT_REDIS_URL="redis://localhost:6379/3")
+class OpenAIRateLimiterTests(SimpleTestCase):
+    def setUp(self):
+        self.limiter = OpenAIRateLimiter("text-embedding-3-small", requests_per_minute=60, tokens_per_minute=1000)
+
+    @mock.patch("mentor_knowledge.rate_limit.time.sleep")
+    def test_waits_until_budget_is_granted(self, sleep):
+        self.limiter._try_acquire = mock.Mock(side_effect=[0.5, 0.25, 0.0])
+
+        self.limiter.acquire(10)
+
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [0.5, 0.25])
+
+    @mock.patch("mentor_knowledge.rate_limit.time.sleep")
+    def test_gives_up_after_max_wait(self, sleep):
+        self.limiter._try_acquire = mock.Mock(return_value=30.0)
+
+        with self.assertRaises(RateLimitWaitTimeout):
+            self.limiter.acquire(10, max_wait=10)
+        sleep.assert_not_called()
+
+    def test_async_acquire_calls_redis_off_the_event_loop(self):
+        loop_threads = []
+
+        def try_acquire(tokens):
+            loop_threads.append(threading.get_ident())
+            return 0.0
+
+        self.limiter._try_acquire = try_acquire
+
+        async def acquire():
+            await self.limiter.acquire_async(10)
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(acquire())
+
+        self.assertEqual(len(loop_threads), 1)
+        self.assertNotEqual(loop_threads[0], loop_thread)
+
+    def test_redis_errors_do_not_throttle(self):
+        self.limiter._script = mock.Mock(side_effect=redis.ConnectionError("down"))
+
+        self.assertEqual(self.limiter._try_acquire(10), 0.0)
+
+    def test_oversized_request_is_clamped_to_the_bucket(self):
+        self.limiter._script = mock.Mock(return_value=0)
+
+        self.limiter._try_acquire(5000)
+
+        self.assertEqual(self.limiter._script.call_args.kwargs["args"], [60, 1000, 1000])
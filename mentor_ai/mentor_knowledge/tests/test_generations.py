@@ -0,0 +1,61 @@
+from django.test import TestCase, override_settings
+
+from mentor_knowledge.generations import (
+    activate_generation,
+    allocate_generation,
+    collect_stale_generations,
+    videos_with_stale_generations,
+)
+from mentor_knowledge.models import ContentChunk, Mentor, VideoContent
+
+
+class ChunkGenerationTests(TestCase):
+    def setUp(self):
+        self.mentor = Mentor.objects.create(name="Test Mentor", slug="test-mentor")
+        self.video = VideoContent.objects.create(
+            mentor=self.mentor,
+            title="A long enough title",
+            youtube_video_id="dQw4w9WgXcQ",
+            status=VideoContent.Status.EMBEDDED,
+        )
+
+    def _chunks(self, generation, count):
+        for index in range(count):
+            ContentChunk.objects.create(video=self.video, generation=generation, chunk_index=index, text=f"g{generation}")
+
+    def test_cut_over_flips_the_pointer_and_stale_generations_are_collected(self):
+        self._chunks(1, 2)
+        generation = allocate_generation(self.video)
+        self._chunks(generation, 3)
+        self.assertEqual(set(ContentChunk.objects.active().values_list("text", flat=True)), {"g1"})
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertTrue(activate_generation(self.video.id, generation))
+
+        self.assertEqual(len(callbacks), 1)
+        self.video.refresh_from_db()
+        self.mentor.refresh_from_db()
+        self.assertEqual((self.video.active_generation, self.video.status), (2, VideoContent.Status.READY))
+        self.assertEqual(self.mentor.corpus_version, 1)
+        self.assertEqual(set(ContentChunk.objects.active().values_list("text", flat=True)), {"g2"})
+        self.assertFalse(ContentChunk.objects.filter(generation=1, is_active=True).exists())
+        with override_settings(CHUNK_GENERATION_GC_DELAY_SECONDS=300):
+            self.assertEqual(videos_with_stale_generations(), [])
+        with override_settings(CHUNK_GENERATION_GC_DELAY_SECONDS=0):
+            self.assertEqual(videos_with_stale_generations(), [self.video.id])
+        self.assertEqual(collect_stale_generations(self.video.id, batch_size=1), 2)
+        self.assertEqual(ContentChunk.objects.filter(video=self.video).count(), 3)
+
+    def test_pointer_never_moves_backwards(self):
+        VideoContent.objects.filter(pk=self.video.pk).update(active_generation=3, latest_generation=3)
+
+        self.assertFalse(activate_generation(self.video.id, 2))
+        self.video.refresh_from_db()
+        self.assertEqual((self.video.active_generation, self.video.status), (3, VideoContent.Status.EMBEDDED))
+
+    def test_generation_being_written_is_not_collected(self):
+        self._chunks(1, 1)
+        self._chunks(allocate_generation(self.video), 1)
+
+        self.assertEqual(collect_stale_generations(self.video.id), 0)
+        self.assertEqual(ContentChunk.objects.filter(video=self.video).count(), 2)
@@ -49,3 +49,17 @@ class ModelsTests(TestCase):
                     text="duplicate chunk index",
                 )
 
+
+    def test_content_chunk_inherits_mentor_from_video(self):
+        video = VideoContent.objects.create(
+            mentor=self.mentor,
+            title="Learning in Public",
+            youtube_video_id="xvFZjo5PgG0",
+        )
+        chunk = ContentChunk.objects.create(
+            video=video,
+            chunk_index=0,
+            text="first chunk",
+        )
+
+        self.assertEqual(chunk.mentor_id, self.mentor.id)
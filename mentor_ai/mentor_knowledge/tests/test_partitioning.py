@@ -0,0 +1,37 @@
+import uuid
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from mentor_knowledge import signals
+from mentor_knowledge.partitioning import _with_partition_key, mentor_partition_name
+
+
+class PartitioningTests(SimpleTestCase):
+    def test_partition_key_is_added_and_stripped(self):
+        self.assertEqual(_with_partition_key("PRIMARY KEY (id)", True), "PRIMARY KEY (id, mentor_id)")
+        self.assertEqual(
+            _with_partition_key("UNIQUE (video_id, chunk_index, mentor_id)", False),
+            "UNIQUE (video_id, chunk_index)",
+        )
+        self.assertEqual(
+            _with_partition_key("UNIQUE (video_id, chunk_index, mentor_id)", True),
+            "UNIQUE (video_id, chunk_index, mentor_id)",
+        )
+
+    def test_partition_name_fits_identifier_limit(self):
+        mentor_id = uuid.uuid4()
+
+        name = mentor_partition_name(mentor_id)
+
+        self.assertTrue(name.endswith(mentor_id.hex))
+        self.assertLessEqual(len(name), 63)
+
+    def test_new_mentor_partition_is_created_after_commit_only_when_enabled(self):
+        mentor = mock.Mock(id=uuid.uuid4())
+        for enabled, created, expected in ((False, True, 0), (True, False, 0), (True, True, 1)):
+            with override_settings(CONTENT_CHUNK_PARTITIONING=enabled), \
+                    mock.patch.object(signals.transaction, "on_commit") as on_commit:
+                signals.create_mentor_chunk_partition(sender=None, instance=mentor, created=created)
+
+            self.assertEqual(on_commit.call_count, expected)
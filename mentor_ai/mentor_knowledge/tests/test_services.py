@@ -1,9 +1,11 @@
 from unittest import mock
 
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 
-from mentor_knowledge.chunking_service import ChunkData
+from mentor_knowledge.chunking_service import ChunkData, TranscriptChunker
+from mentor_knowledge.generations import collect_stale_generations
 from mentor_knowledge.models import ContentChunk, Mentor, VideoContent
+from mentor_knowledge.transcript_store import normalize_transcript
 from mentor_knowledge.video_processing_service import VideoProcessingService
 
 
@@ -68,8 +70,8 @@ class VideoProcessingServiceTests(TestCase):
         )
         service = VideoProcessingService()
         service.chunker = mock.Mock(
-            chunk_transcript=mock.Mock(
-                return_value=[
+            iter_chunks=mock.Mock(
+                return_value=iter([
                     ChunkData(
                         text="new chunk",
                         chunk_index=0,
@@ -77,7 +79,7 @@ class VideoProcessingServiceTests(TestCase):
                         end_seconds=2.0,
                         word_count=2,
                     )
-                ]
+                ])
             )
         )
         service._create_chunks_with_embeddings = mock.Mock()
@@ -90,5 +92,80 @@ class VideoProcessingServiceTests(TestCase):
         self.video.refresh_from_db()
         self.assertEqual(self.video.status, VideoContent.Status.READY)
         self.assertEqual(result["chunks_created"], 1)
-        self.assertEqual(ContentChunk.objects.filter(video=self.video).count(), 0)
+        self.assertEqual(result["generation"], 2)
+        self.assertEqual(self.video.active_generation, 2)
+        # The old generation is no longer served, and is deleted by the collector after the cut-over.
+        self.assertFalse(ContentChunk.objects.active().filter(video=self.video).exists())
+        self.assertEqual(collect_stale_generations(self.video.id, batch_size=1), 1)
+        self.assertFalse(ContentChunk.objects.filter(video=self.video).exists())
 
+
+    def test_incremental_reprocessing_only_writes_changed_chunks(self):
+        service = VideoProcessingService()
+        service.embedding_service.generate_embeddings_batch.side_effect = (
+            lambda texts, token_counts=None: [[0.1] * 1536 for _ in texts]
+        )
+
+        def process(*texts):
+            service.chunker = mock.Mock(chunk_transcript=mock.Mock(return_value=[
+                ChunkData(text=text, chunk_index=i, start_seconds=i * 5.0, end_seconds=i * 5.0 + 5, word_count=2)
+                for i, text in enumerate(texts)
+            ]))
+            return service.process_video_with_transcript(self.video, [{"text": "x"}], incremental=True)
+
+        process("first chunk", "second chunk", "third chunk")
+        original_ids = dict(ContentChunk.objects.filter(video=self.video).values_list("text", "id"))
+
+        result = process("new intro", "first chunk", "second chunk")
+
+        self.assertEqual(
+            {key: result[key] for key in ("chunks_reused", "chunks_updated", "chunks_created", "chunks_deleted")},
+            {"chunks_reused": 0, "chunks_updated": 2, "chunks_created": 1, "chunks_deleted": 1},
+        )
+        rows = list(ContentChunk.objects.filter(video=self.video).order_by("chunk_index").values_list("text", "id"))
+        self.assertEqual([text for text, _ in rows], ["new intro", "first chunk", "second chunk"])
+        self.assertEqual(rows[1][1], original_ids["first chunk"])
+        self.assertEqual(rows[2][1], original_ids["second chunk"])
+        self.assertEqual(service.embedding_service.generate_embeddings_batch.call_args.args, (["new intro"],))
+
+        result = process("new intro", "first chunk", "second chunk")
+        self.assertEqual((result["chunks_reused"], result["chunks_created"]), (3, 0))
+
+
+@override_settings(EMBEDDING_COALESCE_ENABLED=False, CHUNK_WRITE_BATCH_SIZE=2)
+class StreamedChunkWriteTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch("mentor_knowledge.video_processing_service.EmbeddingService")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.video = mock.Mock(id="video-1", mentor_id="mentor-1", active_generation=1)
+        self.transcript = [{"text": f"word{i} word{i}", "start": float(i), "duration": 1.0} for i in range(5)]
+        self.service = VideoProcessingService()
+        self.service.chunker = TranscriptChunker(chunk_size_words=2, overlap_words=0)
+        self.service._create_chunks_with_embeddings = mock.Mock()
+
+    def test_chunks_are_written_in_batches(self):
+        created, last_chunk = self.service._write_chunks_streaming(self.video, self.transcript, None, 2)
+
+        batches = [call.args[1] for call in self.service._create_chunks_with_embeddings.call_args_list]
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual((created, last_chunk.chunk_index), (5, 4))
+        self.assertTrue(all(chunk.token_count for batch in batches for chunk in batch))
+
+    @mock.patch("mentor_knowledge.video_processing_service.store_transcript")
+    def test_blob_offsets_carry_across_batches(self, store):
+        self.transcript = [{"text": "hello world", "start": float(i), "duration": 1.0} for i in range(5)]
+        text = normalize_transcript(self.transcript)
+
+        self.service._write_chunks_streaming(self.video, self.transcript, text, 2)
+
+        chunks = [chunk for call in self.service._create_chunks_with_embeddings.call_args_list for chunk in call.args[1]]
+        store.assert_called_once_with("video-1", 2, text)
+        self.assertEqual([text[chunk.text_start:chunk.text_end] for chunk in chunks], [chunk.text for chunk in chunks])
+        # Every chunk is the same two words, so only the carried search offset keeps them in order.
+        self.assertEqual({chunk.text for chunk in chunks}, {"hello world"})
+        self.assertEqual([chunk.text_start for chunk in chunks], [0, 12, 24, 36, 48])
+
+    def test_empty_transcript_raises(self):
+        with self.assertRaises(ValueError):
+            self.service._write_chunks_streaming(self.video, [], None, 2)
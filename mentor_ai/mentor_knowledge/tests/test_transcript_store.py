@@ -0,0 +1,156 @@
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from mentor_knowledge import transcript_store
+from mentor_knowledge.chunking_service import TokenBudgetChunker, TranscriptChunker
+from mentor_knowledge.models import ContentChunk, Mentor, VideoContent, VideoTranscript
+from mentor_knowledge.tokenizers import ApproximateTokenizer
+from mentor_knowledge.video_processing_service import VideoProcessingService
+from mentors.retrieval import project_chunks
+
+TRANSCRIPT = [
+    {"text": f"segment {i} says hello  world again.", "start": i * 2.0, "duration": 2.0}
+    for i in range(40)
+]
+
+
+class TranscriptStoreTests(SimpleTestCase):
+    def test_chunks_are_slices_of_the_normalized_transcript(self):
+        text = transcript_store.normalize_transcript(TRANSCRIPT)
+        for chunker in (
+            TranscriptChunker(chunk_size_words=25, overlap_words=5),
+            TokenBudgetChunker(chunk_size_tokens=40, overlap_tokens=10, tokenizer=ApproximateTokenizer()),
+        ):
+            texts = [chunk.text for chunk in chunker.chunk_transcript(TRANSCRIPT)]
+
+            offsets = transcript_store.locate_chunks(text, texts)
+
+            self.assertEqual([text[start:end] for start, end in offsets], texts)
+            self.assertEqual(transcript_store.stitch_chunk_texts(texts), text)
+
+    def test_repeated_passages_resolve_in_order(self):
+        offsets = transcript_store.locate_chunks("intro a b intro c d intro", ["intro a", "intro c", "intro"])
+
+        self.assertEqual(offsets, [(0, 7), (10, 17), (20, 25)])
+
+    def test_text_that_is_not_a_slice_is_not_located(self):
+        self.assertEqual(transcript_store.locate_chunks("a b c", ["b c", "a  b", ""]), [(2, 5), None, None])
+
+    def test_compression_round_trip(self):
+        text = transcript_store.normalize_transcript(TRANSCRIPT)
+
+        data = transcript_store.compress_text(text)
+
+        self.assertLess(len(data), len(text))
+        self.assertEqual(transcript_store.decompress_text(memoryview(data)), text)
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = transcript_store.TranscriptCache(max_entries=2)
+        cache.set("a", "A")
+        cache.set("b", "B")
+        cache.get_many(["a"])
+        cache.set("c", "C")
+
+        self.assertEqual(cache.get_many(["a", "b", "c"]), {"a": "A", "c": "C"})
+
+    def test_inline_chunks_are_filled_without_loading_transcripts(self):
+        chunk = mock.Mock(text="inline")
+        with mock.patch.object(transcript_store, "load_transcripts") as load:
+            transcript_store.fill_chunk_texts([chunk], [("video", 1, None, None)])
+
+        load.assert_not_called()
+        self.assertEqual(chunk.text, "inline")
+
+    def test_blob_chunks_are_sliced_in_bulk(self):
+        chunks = [mock.Mock(text=""), mock.Mock(text="kept"), mock.Mock(text="")]
+        spans = [("v1", 1, 0, 5), ("v1", 1, None, None), ("v2", 3, 6, 11)]
+        transcripts = {("v1", 1): "hello world", ("v2", 3): "other world"}
+        with mock.patch.object(transcript_store, "load_transcripts", return_value=transcripts) as load:
+            transcript_store.fill_chunk_texts(chunks, spans)
+
+        self.assertEqual(set(load.call_args.args[0]), {("v1", 1), ("v2", 3)})
+        self.assertEqual([chunk.text for chunk in chunks], ["hello", "kept", "world"])
+
+    @override_settings(RETRIEVAL_SEARCH_MODE="vector", RETRIEVAL_LEXICAL_FALLBACK=False)
+    def test_blob_storage_requires_vector_only_search(self):
+        transcript_store.check_text_storage_search("blob")
+        transcript_store.check_text_storage_search("inline")
+        with override_settings(RETRIEVAL_LEXICAL_FALLBACK=True), self.assertRaises(ImproperlyConfigured):
+            transcript_store.check_text_storage_search("blob")
+        with override_settings(RETRIEVAL_SEARCH_MODE="hybrid"), self.assertRaises(ImproperlyConfigured):
+            transcript_store.check_text_storage_search("blob")
+        with override_settings(RETRIEVAL_SEARCH_MODE="hybrid"):
+            transcript_store.check_text_storage_search("inline")
+
+    @override_settings(CHUNK_TEXT_STORAGE="json")
+    def test_unknown_storage_is_rejected(self):
+        with self.assertRaises(ValueError):
+            transcript_store.get_chunk_text_storage()
+
+
+@override_settings(CHUNK_TEXT_STORAGE="blob", EMBEDDING_COALESCE_ENABLED=False, EMBEDDING_COMPACT_TYPES=[])
+class BlobStorageTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch("mentor_knowledge.video_processing_service.EmbeddingService")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(transcript_store.TRANSCRIPT_CACHE.clear)
+        self.mentor = Mentor.objects.create(name="Test Mentor", slug="test-mentor")
+        self.video = VideoContent.objects.create(
+            mentor=self.mentor,
+            title="A long enough title",
+            youtube_video_id="dQw4w9WgXcQ",
+        )
+
+    def _process(self):
+        service = VideoProcessingService()
+        service.chunker = TranscriptChunker(chunk_size_words=25, overlap_words=5)
+        service.embedding_service.generate_embeddings_batch.side_effect = (
+            lambda texts, token_counts=None: [[0.1] * 1536 for _ in texts]
+        )
+        service.process_video_with_transcript(self.video, TRANSCRIPT)
+        return [chunk.text for chunk in service.chunker.chunk_transcript(TRANSCRIPT)]
+
+    def test_chunks_store_offsets_and_retrieval_slices_their_text(self):
+        expected = self._process()
+
+        self.video.refresh_from_db()
+        transcript = VideoTranscript.objects.get(video=self.video, generation=self.video.active_generation)
+        self.assertEqual(
+            transcript_store.decompress_text(transcript.data),
+            transcript_store.normalize_transcript(TRANSCRIPT),
+        )
+        self.assertFalse(ContentChunk.objects.filter(video=self.video).exclude(text="").exists())
+
+        chunks = project_chunks(ContentChunk.objects.active().filter(video=self.video).order_by("chunk_index"))
+        self.assertEqual([chunk.text for chunk in chunks], expected)
+
+    def test_conversion_round_trip(self):
+        expected = self._process()
+        self.video.refresh_from_db()
+        generation = self.video.active_generation
+
+        self.assertEqual(transcript_store.move_chunks_inline(self.video.id, generation), len(expected))
+        self.assertFalse(VideoTranscript.objects.filter(video=self.video).exists())
+        inline = list(ContentChunk.objects.filter(video=self.video).order_by("chunk_index").values_list("text", flat=True))
+        self.assertEqual(inline, expected)
+
+        self.assertEqual(transcript_store.move_chunks_to_blob(self.video.id, generation), len(expected))
+        chunks = project_chunks(ContentChunk.objects.filter(video=self.video).order_by("chunk_index"))
+        self.assertEqual([chunk.text for chunk in chunks], expected)
+
+    def test_chunk_api_slices_a_page_of_texts_in_one_pass(self):
+        expected = self._process()
+
+        with mock.patch.object(
+            transcript_store, "load_transcripts", wraps=transcript_store.load_transcripts
+        ) as load:
+            response = self.client.get(reverse("contentchunk-list"))
+
+        texts = [chunk["text"] for chunk in response.data["results"]]
+        self.assertGreater(len(texts), 1)
+        self.assertEqual(load.call_count, 1)
+        self.assertEqual(texts, expected[:len(texts)])
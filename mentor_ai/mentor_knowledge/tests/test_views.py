@@ -2,6 +2,7 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from mentor_knowledge.chunk_diff import chunk_content_hash
 from mentor_knowledge.models import ContentChunk, Mentor, VideoContent
 
 
@@ -52,3 +53,42 @@ class ArticlesApiViewsTests(APITestCase):
         self.assertEqual(response.data["count"], 1)
         self.assertEqual(str(response.data["results"][0]["video"]), str(self.video.id))
 
+    def test_chunk_cannot_be_moved_to_another_mentors_video(self):
+        other_mentor = Mentor.objects.create(name="Other Mentor", slug="other-mentor")
+        other_video = VideoContent.objects.create(
+            mentor=other_mentor,
+            title="Another valid title",
+            youtube_video_id="xvFZjo5PgG0",
+        )
+
+        response = self.client.patch(
+            reverse("contentchunk-detail", kwargs={"pk": self.chunk.pk}),
+            {"video": str(other_video.id)},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.chunk.refresh_from_db()
+        self.assertEqual(self.chunk.video_id, self.video.id)
+        self.assertEqual(self.chunk.mentor_id, self.mentor.id)
+        other_mentor.refresh_from_db()
+        self.assertEqual(other_mentor.corpus_version, 0)
+
+    def test_chunk_edit_and_video_delete_bump_corpus_version(self):
+        response = self.client.patch(
+            reverse("contentchunk-detail", kwargs={"pk": self.chunk.pk}),
+            {"text": "Edited chunk text"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.chunk.refresh_from_db()
+        self.assertEqual(self.chunk.content_hash, chunk_content_hash("Edited chunk text"))
+        self.mentor.refresh_from_db()
+        self.assertEqual(self.mentor.corpus_version, 1)
+
+        response = self.client.delete(reverse("videocontent-detail", kwargs={"pk": self.video.pk}))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.mentor.refresh_from_db()
+        self.assertEqual(self.mentor.corpus_version, 2)
+        self.assertFalse(ContentChunk.objects.exists())
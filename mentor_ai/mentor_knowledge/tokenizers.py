@@ -0,0 +1,112 @@
+"""
+Token counters for chunking and budgeting.
+
+The exact counter uses tiktoken (an optional dependency) with the encoding of
+the embedding model. Without it, an approximate counter splits text into
+word and punctuation runs and charges one token per started 4 characters of
+each run; on English transcripts this lands slightly above the BPE count, so
+budgets computed with it hold when the exact tokenizer is used later.
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+
+TOKENIZER_AUTO = "auto"
+TOKENIZER_TIKTOKEN = "tiktoken"
+TOKENIZER_APPROXIMATE = "approximate"
+TOKENIZERS = (TOKENIZER_AUTO, TOKENIZER_TIKTOKEN, TOKENIZER_APPROXIMATE)
+
+# Word and punctuation runs cut into pieces of at most 4 characters: one match per estimated token.
+_TOKEN_RE = re.compile(r"\w{1,4}|[^\w\s]{1,4}")
+
+
+class Tokenizer:
+    """Counts the tokens of texts."""
+
+    name = ""
+    exact = False
+
+    def count(self, text: str) -> int:
+        """
+        Args:
+            text (str): The text to count.
+        Returns:
+            int: Number of tokens in the text.
+        """
+        raise NotImplementedError
+
+    def count_many(self, texts: list[str]) -> list[int]:
+        """
+        Args:
+            texts (list[str]): The texts to count.
+        Returns:
+            list[int]: Number of tokens of each text, in order.
+        """
+        return [self.count(text) for text in texts]
+
+
+class ApproximateTokenizer(Tokenizer):
+    """Dependency-free estimate: one token per started 4 characters of every word/punctuation run."""
+
+    name = TOKENIZER_APPROXIMATE
+
+    def count(self, text: str) -> int:
+        return len(_TOKEN_RE.findall(text))
+
+
+class TiktokenTokenizer(Tokenizer):
+    """
+    Exact BPE counts with tiktoken.
+    Args:
+        model (str): Model whose encoding to use; unknown models fall back to cl100k_base.
+    """
+
+    name = TOKENIZER_TIKTOKEN
+    exact = True
+
+    def __init__(self, model: str):
+        import tiktoken
+
+        try:
+            self.encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            self.encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode_ordinary(text))
+
+    def count_many(self, texts: list[str]) -> list[int]:
+        return [len(tokens) for tokens in self.encoding.encode_ordinary_batch(texts)]
+
+
+def get_tokenizer(name: str | None = None, model: str | None = None) -> Tokenizer:
+    """
+    Resolve a tokenizer by name (instances are cached per resolved name and model,
+    so changed settings take effect).
+    Args:
+        name (str | None): "auto", "tiktoken" or "approximate"; defaults to settings.CHUNK_TOKENIZER.
+            "auto" uses tiktoken when it is installed and the approximate counter otherwise.
+        model (str | None): Model whose encoding tiktoken uses; defaults to settings.EMBEDDING_MODEL.
+    Returns:
+        Tokenizer: The tokenizer.
+    Raises:
+        ValueError: If the name is unknown.
+        ImportError: If "tiktoken" is requested but not installed.
+    """
+    name = (name or settings.CHUNK_TOKENIZER).strip().lower()
+    if name not in TOKENIZERS:
+        raise ValueError(f"tokenizer must be one of: {', '.join(TOKENIZERS)}")
+    return _cached_tokenizer(name, model or settings.EMBEDDING_MODEL)
+
+
+@lru_cache(maxsize=None)
+def _cached_tokenizer(name: str, model: str) -> Tokenizer:
+    if name == TOKENIZER_APPROXIMATE:
+        return ApproximateTokenizer()
+    try:
+        return TiktokenTokenizer(model)
+    except ImportError:
+        if name == TOKENIZER_TIKTOKEN:
+            raise
+        return ApproximateTokenizer()
@@ -0,0 +1,343 @@
+"""
+Compact chunk text storage: one compressed transcript per video generation.
+
+In the "blob" layout (settings.CHUNK_TEXT_STORAGE), processing stores the
+normalized transcript of a chunk generation (every word joined by single
+spaces, the text both chunkers slice) once, zlib-compressed, in
+VideoTranscript. Each chunk keeps only its character offsets into it and an
+empty `text`, so the words overlapping chunks share are stored once and rows
+no longer carry their own TOASTed text.
+
+Retrieval slices the texts of all its hits in bulk: one query finds the
+transcripts of the distinct videos, one more loads those this process has
+not decompressed yet (a bounded LRU keyed by transcript id; a replaced
+transcript gets a new id). Chunks stored inline pass through untouched.
+
+Full-text search indexes ContentChunk.text, which is empty in this layout,
+so it requires vector-only search: check_text_storage_search() refuses the
+"blob" layout (at startup and before converting chunks to it) while
+RETRIEVAL_SEARCH_MODE is lexical/hybrid or RETRIEVAL_LEXICAL_FALLBACK is on.
+The chunk_text_storage command converts stored chunks between the layouts
+and compares their size and retrieval latency.
+"""
+import threading
+import zlib
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Q
+
+from mentor_knowledge.chunk_diff import chunk_content_hash
+from mentor_knowledge.models import ContentChunk, VideoTranscript
+
+CHUNK_TEXT_STORAGE_INLINE = "inline"
+CHUNK_TEXT_STORAGE_BLOB = "blob"
+CHUNK_TEXT_STORAGES = (CHUNK_TEXT_STORAGE_INLINE, CHUNK_TEXT_STORAGE_BLOB)
+
+
+def get_chunk_text_storage(storage: str | None = None) -> str:
+    """
+    Resolve and validate the chunk text layout.
+    Args:
+        storage (str | None): "inline", "blob", or None to use settings.CHUNK_TEXT_STORAGE.
+    Returns:
+        str: The layout.
+    Raises:
+        ValueError: If the layout is unknown.
+    """
+    storage = (storage or settings.CHUNK_TEXT_STORAGE).strip().lower()
+    if storage not in CHUNK_TEXT_STORAGES:
+        raise ValueError(f"chunk text storage must be one of: {', '.join(CHUNK_TEXT_STORAGES)}")
+    return storage
+
+
+def check_text_storage_search(storage: str | None = None) -> None:
+    """
+    Refuse the "blob" layout while chat may search chunk text lexically: its
+    chunks have an empty `text`, so full-text search would silently find nothing.
+    Args:
+        storage (str | None): The layout to check, or None to use settings.CHUNK_TEXT_STORAGE.
+    Raises:
+        ImproperlyConfigured: If the layout is "blob" and lexical search is configured.
+    """
+    if get_chunk_text_storage(storage) != CHUNK_TEXT_STORAGE_BLOB:
+        return
+    search_mode = settings.RETRIEVAL_SEARCH_MODE.strip().lower()
+    if search_mode != "vector" or settings.RETRIEVAL_LEXICAL_FALLBACK:
+        raise ImproperlyConfigured(
+            "The blob chunk text layout leaves ContentChunk.text (and its full-text index) empty; "
+            "it requires RETRIEVAL_SEARCH_MODE=vector and RETRIEVAL_LEXICAL_FALLBACK=false "
+            f"(got RETRIEVAL_SEARCH_MODE={search_mode}, "
+            f"RETRIEVAL_LEXICAL_FALLBACK={settings.RETRIEVAL_LEXICAL_FALLBACK})."
+        )
+
+
+def normalize_transcript(transcript) -> str:
+    """
+    Args:
+        transcript (list[dict]): Transcript segments with a 'text' key.
+    Returns:
+        str: Every word of the transcript joined by single spaces.
+    """
+    return " ".join(word for segment in transcript for word in segment.get("text", "").split())
+
+
+def stitch_chunk_texts(texts) -> str:
+    """
+    Rebuild the normalized transcript from consecutive chunk texts, dropping the words
+    each chunk repeats from the previous one (used to convert chunks stored inline).
+    Args:
+        texts (Iterable[str]): Chunk texts in chunk_index order.
+    Returns:
+        str: The stitched text.
+    """
+    words = []
+    previous = []
+    for text in texts:
+        chunk_words = text.split()
+        if not chunk_words:
+            continue
+        overlap = 0
+        # Longest suffix of the previous chunk that starts this one.
+        for position in range(max(0, len(previous) - len(chunk_words)), len(previous)):
+            if previous[position] == chunk_words[0] and previous[position:] == chunk_words[:len(previous) - position]:
+                overlap = len(previous) - position
+                break
+        words.extend(chunk_words[overlap:])
+        previous = chunk_words
+    return " ".join(words)
+
+
+def locate_chunks(transcript_text: str, texts, search_from: int = 0) -> list:
+    """
+    Find the character offsets of chunk texts in the transcript.
+    Each chunk is searched from just past the previous chunk's start, so repeated
+    passages keep their order (and the transcript is scanned once, not per chunk).
+    Args:
+        transcript_text (str): The normalized transcript.
+        texts (Iterable[str]): Chunk texts in chunk_index order.
+        search_from (int): Where to search for the first text (just past the start of the
+            chunk before it, when chunks are located batch by batch).
+    Returns:
+        list: (start, end) per chunk, or None for a chunk that is not a slice of the transcript.
+    """
+    offsets = []
+    cursor = search_from
+    for text in texts:
+        start = transcript_text.find(text, cursor) if text else -1
+        if start < 0 and text:
+            start = transcript_text.find(text)
+        if start < 0:
+            offsets.append(None)
+            continue
+        offsets.append((start, start + len(text)))
+        cursor = start + 1
+    return offsets
+
+
+def compress_text(text: str) -> bytes:
+    """
+    Args:
+        text (str): The transcript.
+    Returns:
+        bytes: zlib-compressed UTF-8 bytes.
+    """
+    return zlib.compress(text.encode("utf-8"), zlib.Z_BEST_COMPRESSION)
+
+
+def decompress_text(data) -> str:
+    """
+    Args:
+        data (bytes | memoryview): Output of compress_text().
+    Returns:
+        str: The transcript.
+    """
+    return zlib.decompress(bytes(data)).decode("utf-8")
+
+
+def store_transcript(video_id, generation: int, text: str) -> VideoTranscript:
+    """
+    Save (or replace) the transcript of a video generation.
+    Args:
+        video_id (UUID | str): The video id.
+        generation (int): The chunk generation whose offsets point into the text.
+        text (str): The normalized transcript.
+    Returns:
+        VideoTranscript: The new row.
+    """
+    VideoTranscript.objects.filter(video_id=video_id, generation=generation).delete()
+    return VideoTranscript.objects.create(
+        video_id=video_id,
+        generation=generation,
+        data=compress_text(text),
+        char_count=len(text),
+    )
+
+
+class TranscriptCache:
+    """
+    Bounded LRU of decompressed transcripts, keyed by VideoTranscript id.
+    Args:
+        max_entries (int): Maximum transcripts kept in process memory.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, transcript_ids) -> dict:
+        """Return the cached texts among `transcript_ids`."""
+        found = {}
+        with self._lock:
+            for transcript_id in transcript_ids:
+                text = self._entries.get(transcript_id)
+                if text is not None:
+                    self._entries.move_to_end(transcript_id)
+                    found[transcript_id] = text
+        return found
+
+    def set(self, transcript_id, text: str) -> None:
+        with self._lock:
+            self._entries[transcript_id] = text
+            self._entries.move_to_end(transcript_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+TRANSCRIPT_CACHE = TranscriptCache(max_entries=settings.TRANSCRIPT_CACHE_SIZE)
+
+
+def load_transcripts(keys) -> dict:
+    """
+    Load decompressed transcripts in bulk.
+    Args:
+        keys (Iterable[tuple]): (video_id, generation) pairs.
+    Returns:
+        dict: (video_id, generation) -> text, for the transcripts that exist.
+    """
+    keys = set(keys)
+    if not keys:
+        return {}
+    condition = Q()
+    for video_id, generation in keys:
+        condition |= Q(video_id=video_id, generation=generation)
+    ids = {
+        transcript_id: (video_id, generation)
+        for transcript_id, video_id, generation in
+        VideoTranscript.objects.filter(condition).values_list("id", "video_id", "generation")
+    }
+    texts = TRANSCRIPT_CACHE.get_many(ids)
+    missing = [transcript_id for transcript_id in ids if transcript_id not in texts]
+    if missing:
+        for transcript_id, data in VideoTranscript.objects.filter(id__in=missing).values_list("id", "data"):
+            texts[transcript_id] = decompress_text(data)
+            TRANSCRIPT_CACHE.set(transcript_id, texts[transcript_id])
+    return {ids[transcript_id]: text for transcript_id, text in texts.items()}
+
+
+def slice_chunk_texts(spans) -> list:
+    """
+    Slice the texts of chunks stored as offsets, loading each transcript once.
+    Args:
+        spans (list[tuple]): (video_id, generation, text_start, text_end) per chunk.
+    Returns:
+        list: The text of each chunk, or None where it has no offsets (stored inline)
+            or its transcript is gone.
+    """
+    transcripts = load_transcripts(
+        (video_id, generation) for video_id, generation, start, _ in spans if start is not None
+    )
+    texts = []
+    for video_id, generation, start, end in spans:
+        transcript = transcripts.get((video_id, generation)) if start is not None else None
+        texts.append(transcript[start:end] if transcript is not None else None)
+    return texts
+
+
+def fill_chunk_texts(chunks, spans) -> None:
+    """
+    Set `text` on the chunks stored as offsets; no query when every chunk is stored inline.
+    Args:
+        chunks (list): Objects with a `text` attribute (RetrievedChunk, ContentChunk).
+        spans (list[tuple]): (video_id, generation, text_start, text_end) per chunk.
+    """
+    if all(start is None for _, _, start, _ in spans):
+        return
+    for chunk, text in zip(chunks, slice_chunk_texts(spans)):
+        if text is not None:
+            chunk.text = text
+
+
+def move_chunks_to_blob(video_id, generation: int, batch_size: int = 1000) -> int:
+    """
+    Convert the chunks of a video generation to the "blob" layout: stitch their texts
+    into the transcript, store it, and replace each chunk's text by its offsets.
+    Args:
+        video_id (UUID | str): The video id.
+        generation (int): The chunk generation.
+        batch_size (int): Rows per UPDATE statement.
+    Returns:
+        int: Number of chunks now stored as offsets.
+    """
+    rows = list(
+        ContentChunk.objects
+        .filter(video_id=video_id, generation=generation)
+        .order_by("chunk_index")
+        .values("id", "text", "text_start", "text_end", "content_hash")
+    )
+    sliced = slice_chunk_texts([(video_id, generation, row["text_start"], row["text_end"]) for row in rows])
+    texts = [text if text is not None else row["text"] for row, text in zip(rows, sliced)]
+    transcript_text = stitch_chunk_texts(texts)
+
+    updates = [
+        ContentChunk(
+            id=row["id"],
+            text="",
+            text_start=span[0],
+            text_end=span[1],
+            content_hash=row["content_hash"] or chunk_content_hash(text),
+        )
+        for row, text, span in zip(rows, texts, locate_chunks(transcript_text, texts))
+        if span is not None
+    ]
+    with transaction.atomic():
+        store_transcript(video_id, generation, transcript_text)
+        ContentChunk.objects.bulk_update(
+            updates, ["text", "text_start", "text_end", "content_hash"], batch_size=batch_size
+        )
+    return len(updates)
+
+
+def move_chunks_inline(video_id, generation: int, batch_size: int = 1000) -> int:
+    """
+    Convert the chunks of a video generation back to the "inline" layout and drop its transcript.
+    Args:
+        video_id (UUID | str): The video id.
+        generation (int): The chunk generation.
+        batch_size (int): Rows per UPDATE statement.
+    Returns:
+        int: Number of chunks whose text was written back.
+    """
+    rows = list(
+        ContentChunk.objects
+        .filter(video_id=video_id, generation=generation, text_start__isnull=False)
+        .values_list("id", "text_start", "text_end")
+    )
+    texts = slice_chunk_texts([(video_id, generation, start, end) for _, start, end in rows])
+    updates = [
+        ContentChunk(id=chunk_id, text=text, text_start=None, text_end=None)
+        for (chunk_id, _, _), text in zip(rows, texts)
+        if text is not None
+    ]
+    with transaction.atomic():
+        ContentChunk.objects.bulk_update(updates, ["text", "text_start", "text_end"], batch_size=batch_size)
+        if len(updates) == len(rows):
+            VideoTranscript.objects.filter(video_id=video_id, generation=generation).delete()
+    return len(updates)
@@ -1,11 +1,26 @@
 import logging
 import time
+from itertools import islice
+from django.conf import settings
 from django.db import transaction
 from typing import Dict, List
 
-from mentor_knowledge.chunking_service import TranscriptChunker
+from mentor_knowledge.binary_copy import copy_insert
+from mentor_knowledge.chunk_diff import ChunkDiff, StoredChunk, chunk_content_hash, diff_chunks
+from mentor_knowledge.chunking_service import get_transcript_chunker
+from mentor_knowledge.compact_embeddings import compact_field_values
+from mentor_knowledge.embedding_coalescer import enqueue_chunks
 from mentor_knowledge.embedding_service import EmbeddingService
+from mentor_knowledge.generations import activate_generation, allocate_generation
 from mentor_knowledge.models import ContentChunk, VideoContent
+from mentor_knowledge.tokenizers import get_tokenizer
+from mentor_knowledge.transcript_store import (
+    CHUNK_TEXT_STORAGE_BLOB,
+    get_chunk_text_storage,
+    locate_chunks,
+    normalize_transcript,
+    store_transcript,
+)
 from .youtube_transcript import get_transcript
 
 logger = logging.getLogger(__name__)
@@ -14,55 +29,118 @@ logger = logging.getLogger(__name__)
 class VideoProcessingService:
     """
     Service for processing video transcripts into chunked embeddings.
-    This service uses TranscriptChunker to split transcripts into chunks
+    This service uses the configured chunker (settings.CHUNKING_MODE) to split transcripts into chunks
     """
 
     def __init__(self, mock_embeddings=False):
         self.mock_embeddings = mock_embeddings
-        self.chunker = TranscriptChunker()
+        self.chunker = get_transcript_chunker()
         self.embedding_service = EmbeddingService()
 
     def process_video_with_transcript(
         self, 
         video: VideoContent, 
-        transcript: List[Dict]
+        transcript: List[Dict],
+        incremental: bool | None = None,
     ) -> dict:
+        """
+        Chunk and embed a transcript, replacing the video's previous chunks.
+        A full run writes a new chunk generation while search keeps reading the
+        active one, then flips VideoContent.active_generation (see generations.py).
+        It streams the chunker's output, writing CHUNK_WRITE_BATCH_SIZE chunks at a time.
+
+        Args:
+            video (VideoContent): The video content object.
+            transcript (List[Dict]): Transcript segments with 'text', 'start' and 'duration' keys.
+            incremental (bool | None): Diff the new chunks against the stored ones and only
+                write what changed (see chunk_diff.py) instead of rebuilding every chunk.
+                Defaults to settings.VIDEO_REPROCESS_INCREMENTAL.
+
+        Returns:
+            dict: success, generation, chunks_total, the reused/updated/created/deleted chunk counts
+                and total_duration. A full run deletes nothing itself: the superseded generation is
+                collected after the cut-over.
+        """
+        if incremental is None:
+            incremental = settings.VIDEO_REPROCESS_INCREMENTAL
         total_start = time.perf_counter()
 
         try:
-            # Re-processing should replace previous chunks rather than failing on unique constraints.
-            video.chunks.all().delete()
+            # The generation pointers are only ever written with single-column UPDATEs.
+            video.refresh_from_db(fields=['active_generation', 'latest_generation'])
+            if incremental:
+                # Rows of the served generation are patched in place.
+                generation = video.active_generation
+            else:
+                # Written next to the served generation, which stays searchable until the flip.
+                generation = allocate_generation(video)
 
             # Chunking
             video.status = VideoContent.Status.CHUNKED
-            video.save()
+            video.save(update_fields=['status', 'updated_at'])
 
             chunking_start = time.perf_counter()
-            chunks_data = self.chunker.chunk_transcript(transcript)
-            if not chunks_data:
-                raise ValueError("No chunks were created from the transcript.")
-            logger.info(
-                "Chunking completed | video_id=%s chunks=%s duration_sec=%.2f",
-                video.id,
-                len(chunks_data),
-                time.perf_counter() - chunking_start,
-            )
-            
+            transcript_text = self._normalized_transcript(transcript)
+            if incremental:
+                # The diff matches every new chunk against the stored ones, so they are all needed at once.
+                chunks_data = self.chunker.chunk_transcript(transcript)
+                if not chunks_data:
+                    raise ValueError("No chunks were created from the transcript.")
+                self._count_tokens(chunks_data)
+                self._locate_texts(transcript_text, chunks_data)
+                logger.info(
+                    "Chunking completed | video_id=%s chunks=%s duration_sec=%.2f",
+                    video.id,
+                    len(chunks_data),
+                    time.perf_counter() - chunking_start,
+                )
+
             # Embedding
             video.status = VideoContent.Status.EMBEDDED
-            video.save()
+            video.save(update_fields=['status', 'updated_at'])
             embedding_start = time.perf_counter()
-            self._create_chunks_with_embeddings(video, chunks_data)
+            if incremental:
+                diff = self._update_chunks_incrementally(video, chunks_data, transcript_text)
+                counts = diff.stats()
+                logger.info(
+                    "Incremental chunk update | video_id=%s reused=%s updated=%s created=%s deleted=%s",
+                    video.id,
+                    counts['chunks_reused'],
+                    counts['chunks_updated'],
+                    counts['chunks_created'],
+                    counts['chunks_deleted'],
+                )
+                last_chunk = chunks_data[-1]
+            else:
+                created, last_chunk = self._write_chunks_streaming(video, transcript, transcript_text, generation)
+                counts = {'chunks_reused': 0, 'chunks_updated': 0, 'chunks_created': created, 'chunks_deleted': 0}
+            counts['generation'] = generation
+            counts['chunks_total'] = last_chunk.chunk_index + 1
+
+            if settings.EMBEDDING_COALESCE_ENABLED and not incremental:
+                # The embedding queue flush activates the generation once all its chunks are embedded.
+                logger.info(
+                    "Chunks queued for coalesced embedding | video_id=%s chunks=%s",
+                    video.id,
+                    counts['chunks_created'],
+                )
+                return {
+                    'success': True,
+                    **counts,
+                    'embedding_queued': True,
+                    'total_duration': last_chunk.end_seconds,
+                }
+
             logger.info(
                 "Embedding completed | video_id=%s chunks=%s duration_sec=%.2f",
                 video.id,
-                len(chunks_data),
+                counts['chunks_created'],
                 time.perf_counter() - embedding_start,
             )
 
-            # Finalize
-            video.status = VideoContent.Status.READY
-            video.save()
+            # Finalize: one transaction moves the pointer and the chunks' is_active flags.
+            activate_generation(video.id, generation)
+            video.refresh_from_db(fields=['status', 'active_generation'])
             total_duration = time.perf_counter() - total_start
             logger.info(
                 "Video processing finished | video_id=%s total_duration_sec=%.2f",
@@ -72,19 +150,20 @@ class VideoProcessingService:
 
             return {
                 'success': True,
-                'chunks_created': len(chunks_data),
-                'total_duration': chunks_data[-1].end_seconds if chunks_data else 0
+                **counts,
+                'total_duration': last_chunk.end_seconds,
             }
         
         except Exception as e:
             video.status = VideoContent.Status.FAILED
-            video.save()
+            video.save(update_fields=['status', 'updated_at'])
             logger.exception("Video processing failed | video_id=%s", video.id)
             raise Exception(f"Video processing failed: {str(e)}")
 
-    def process_video_from_youtube(self, video: VideoContent) -> dict:
+    def process_video_from_youtube(self, video: VideoContent, incremental: bool | None = None) -> dict:
         """
         Fetch transcript from YouTube and process the video end-to-end.
+        `incremental` is passed on to process_video_with_transcript().
         """
         logger.info("Fetching transcript | video_id=%s youtube_video_id=%s", video.id, video.youtube_video_id)
         transcript_result = get_transcript(video.youtube_video_id)
@@ -106,38 +185,331 @@ class VideoProcessingService:
             transcript_result.get("entries_count", 0),
         )
 
-        result = self.process_video_with_transcript(video, transcript_entries)
+        result = self.process_video_with_transcript(video, transcript_entries, incremental=incremental)
         return {
             **result,
             "transcript_entries": transcript_result.get("entries_count", 0),
         }
         
-    @transaction.atomic
-    def _create_chunks_with_embeddings(self, video: VideoContent, chunks_data: List):
+    def _count_tokens(self, chunks_data: List):
+        """
+        Fill in the token count of chunks whose chunker did not count them (word mode).
+
+        Args:
+            chunks_data (List): List of chunk data with text and metadata.
+        """
+        uncounted = [chunk for chunk in chunks_data if chunk.token_count is None]
+        if not uncounted:
+            return
+        counts = get_tokenizer().count_many([chunk.text for chunk in uncounted])
+        for chunk, count in zip(uncounted, counts):
+            chunk.token_count = count
+
+    def _normalized_transcript(self, transcript: List[Dict]) -> str | None:
+        """
+        Args:
+            transcript (List[Dict]): Transcript segments with 'text', 'start' and 'duration' keys.
+
+        Returns:
+            str | None: The normalized transcript to store in the "blob" text layout
+                (settings.CHUNK_TEXT_STORAGE), or None when chunk text is stored inline.
+        """
+        if get_chunk_text_storage() != CHUNK_TEXT_STORAGE_BLOB:
+            return None
+        return normalize_transcript(transcript)
+
+    def _locate_texts(self, transcript_text: str | None, chunks_data: List, search_from: int = 0) -> int:
+        """
+        In the "blob" text layout, set each chunk's offsets into the normalized transcript
+        (see transcript_store.py).
+
+        Args:
+            transcript_text (str | None): Output of _normalized_transcript(); None does nothing.
+            chunks_data (List): List of chunk data with text and metadata, in chunk_index order.
+            search_from (int): Offset the search starts at (returned for the previous batch).
+
+        Returns:
+            int: Offset to search the next batch of chunks from.
+        """
+        if transcript_text is None:
+            return search_from
+        offsets = locate_chunks(transcript_text, [chunk.text for chunk in chunks_data], search_from=search_from)
+        for chunk, span in zip(chunks_data, offsets):
+            # A chunk that is not a slice of the transcript keeps its text inline.
+            if span is not None:
+                chunk.text_start, chunk.text_end = span
+                search_from = chunk.text_start + 1
+        return search_from
+
+    def _write_chunks_streaming(
+        self,
+        video: VideoContent,
+        transcript: List[Dict],
+        transcript_text: str | None,
+        generation: int,
+    ) -> tuple:
+        """
+        Chunk the transcript lazily and write a new generation batch by batch, so at most
+        settings.CHUNK_WRITE_BATCH_SIZE chunks and their embeddings are held at once.
+        The generation is not served before it is activated, and the rows of a run that
+        fails halfway are collected like any other stale generation.
+
+        Args:
+            video (VideoContent): The video content object.
+            transcript (List[Dict]): Transcript segments with 'text', 'start' and 'duration' keys.
+            transcript_text (str | None): Normalized transcript, in the "blob" text layout.
+            generation (int): Chunk generation the rows belong to.
+
+        Returns:
+            tuple: (number of chunks written, the last ChunkData).
+
+        Raises:
+            ValueError: If the transcript produces no chunks.
+        """
+        if transcript_text is not None:
+            store_transcript(video.id, generation, transcript_text)
+        coalesce = settings.EMBEDDING_COALESCE_ENABLED
+        chunks = self.chunker.iter_chunks(transcript)
+        queued_ids = []
+        created, search_from, last_chunk = 0, 0, None
+        while batch := list(islice(chunks, settings.CHUNK_WRITE_BATCH_SIZE)):
+            self._count_tokens(batch)
+            search_from = self._locate_texts(transcript_text, batch, search_from)
+            if coalesce:
+                queued_ids.extend(self._insert_chunks_for_coalescing(video, batch, generation))
+            else:
+                self._create_chunks_with_embeddings(video, batch, generation)
+            created += len(batch)
+            last_chunk = batch[-1]
+        if last_chunk is None:
+            raise ValueError("No chunks were created from the transcript.")
+        if coalesce:
+            # Queued once every row exists, so a flush cannot activate a partly written generation.
+            transaction.on_commit(lambda: enqueue_chunks(queued_ids))
+        return created, last_chunk
+
+    @staticmethod
+    def _text_fields(chunk_data) -> dict:
+        """ContentChunk text columns of a chunk: its offsets, or the text itself when it has none."""
+        return {
+            'text': chunk_data.text if chunk_data.text_start is None else '',
+            'text_start': chunk_data.text_start,
+            'text_end': chunk_data.text_end,
+        }
+
+    def _create_chunks_with_embeddings(self, video: VideoContent, chunks_data: List, generation: int):
         """
         Create video chunks and their embeddings in the database.
+        Embeddings are generated outside the transaction, so the embedding
+        cache entries written for them survive a failed insert and a retry
+        does not pay for them again.
 
         Args:
             video (VideoContent): The video content object.
             chunks_data (List): List of chunk data with text and metadata.
+            generation (int): Chunk generation the rows belong to.
         """
+        # Bulk insert chunks with a binary COPY (vectors travel as float32 bytes, not text)
+        copy_insert(ContentChunk, self._build_chunks_with_embeddings(video, chunks_data, generation))
+
+    def _build_chunks_with_embeddings(
+        self,
+        video: VideoContent,
+        chunks_data: List,
+        generation: int,
+    ) -> List[ContentChunk]:
+        """
+        Embed chunk texts and build the unsaved ContentChunk rows.
+
+        Args:
+            video (VideoContent): The video content object.
+            chunks_data (List): List of chunk data with text and metadata.
+            generation (int): Chunk generation the rows belong to.
+
+        Returns:
+            List[ContentChunk]: Rows ready for copy_insert().
+        """
+        if not chunks_data:
+            return []
         # Generate embeddings for all chunks
         texts = [chunk.text for chunk in chunks_data]
-        embeddings = self.embedding_service.generate_embeddings_batch(texts)
+        embeddings = self.embedding_service.generate_embeddings_batch(
+            texts,
+            token_counts=[chunk.token_count for chunk in chunks_data],
+        )
+        stats = self.embedding_service.last_cache_stats
+        logger.info(
+            "Embedding cache | video_id=%s hits=%s misses=%s hit_ratio=%.2f",
+            video.id,
+            stats.hits,
+            stats.misses,
+            stats.hit_ratio,
+        )
 
         # Create ContentChunk objects
         chunks_to_create = []
         for chunk_data, embedding in zip(chunks_data, embeddings):
             chunk = ContentChunk(
                 video=video,
+                mentor_id=video.mentor_id,
+                generation=generation,
+                is_active=generation == video.active_generation,
                 chunk_index=chunk_data.chunk_index,
-                text=chunk_data.text,
+                **self._text_fields(chunk_data),
                 start_seconds=int(chunk_data.start_seconds),
                 end_seconds=int(chunk_data.end_seconds),
-                embedding=embedding
+                token_count=chunk_data.token_count,
+                content_hash=chunk_content_hash(chunk_data.text),
+                embedding=embedding,
+                **compact_field_values(embedding),
             )
             chunks_to_create.append(chunk)
+        return chunks_to_create
+
+    def _insert_chunks_for_coalescing(self, video: VideoContent, chunks_data: List, generation: int) -> List:
+        """
+        Insert video chunks without embeddings.
+
+        Args:
+            video (VideoContent): The video content object.
+            chunks_data (List): List of chunk data with text and metadata.
+            generation (int): Chunk generation the rows belong to.
+
+        Returns:
+            List: Ids of the new rows, to queue for the embedding coalescer.
+        """
+        chunks = ContentChunk.objects.bulk_create([
+            ContentChunk(
+                video=video,
+                mentor_id=video.mentor_id,
+                generation=generation,
+                is_active=generation == video.active_generation,
+                chunk_index=chunk_data.chunk_index,
+                **self._text_fields(chunk_data),
+                start_seconds=int(chunk_data.start_seconds),
+                end_seconds=int(chunk_data.end_seconds),
+                token_count=chunk_data.token_count,
+                content_hash=chunk_content_hash(chunk_data.text),
+            )
+            for chunk_data in chunks_data
+        ])
+        return [chunk.id for chunk in chunks]
+
+    def _update_chunks_incrementally(
+        self,
+        video: VideoContent,
+        chunks_data: List,
+        transcript_text: str | None = None,
+    ) -> ChunkDiff:
+        """
+        Turn the chunks of the video's active generation into chunks_data with the fewest writes:
+        unchanged rows are kept, moved rows updated in place, orphans deleted,
+        and only chunks with new text are created (and embedded).
+        The created chunks are served as soon as the transaction commits, so they are embedded
+        before it even with EMBEDDING_COALESCE_ENABLED.
 
-        # Bulk create chunks in the database
-        ContentChunk.objects.bulk_create(chunks_to_create)
+        Args:
+            video (VideoContent): The video content object.
+            chunks_data (List): List of chunk data with text and metadata.
+            transcript_text (str | None): Normalized transcript replacing the generation's
+                stored one, in the "blob" text layout.
+
+        Returns:
+            ChunkDiff: What was reused, updated, created and deleted.
+        """
+        generation = video.active_generation
+        stored, unhashed = self._stored_chunks(video)
+        diff = diff_chunks(stored, chunks_data)
+        # Embedded before the transaction, like full processing.
+        new_chunks = self._build_chunks_with_embeddings(video, diff.created, generation)
+
+        with transaction.atomic():
+            if transcript_text is not None:
+                store_transcript(video.id, generation, transcript_text)
+            if diff.deleted:
+                ContentChunk.objects.filter(id__in=[row.id for row in diff.deleted]).delete()
+            self._update_stored_chunks(diff, unhashed)
+            copy_insert(ContentChunk, new_chunks)
+        return diff
+
+    def _stored_chunks(self, video: VideoContent):
+        """
+        Load the diff columns of the chunks of the video's active generation.
+        Rows stored before content_hash existed are hashed from their text.
+
+        Args:
+            video (VideoContent): The video content object.
+
+        Returns:
+            tuple: (List[StoredChunk], set of ids whose content_hash column is still empty)
+        """
+        chunks = video.chunks.filter(generation=video.active_generation)
+        rows = list(chunks.values_list(
+            'id', 'chunk_index', 'content_hash', 'start_seconds', 'end_seconds', 'token_count',
+            'text_start', 'text_end',
+        ))
+        unhashed = {row[0] for row in rows if row[2] is None}
+        texts = dict(chunks.filter(id__in=unhashed).values_list('id', 'text')) if unhashed else {}
+        stored = [
+            StoredChunk(
+                id=chunk_id,
+                chunk_index=chunk_index,
+                content_hash=content_hash or chunk_content_hash(texts[chunk_id]),
+                start_seconds=start_seconds,
+                end_seconds=end_seconds,
+                token_count=token_count,
+                text_start=text_start,
+                text_end=text_end,
+            )
+            for chunk_id, chunk_index, content_hash, start_seconds, end_seconds, token_count, text_start, text_end
+            in rows
+        ]
+        return stored, unhashed
+
+    def _update_stored_chunks(self, diff: ChunkDiff, unhashed: set):
+        """
+        Write the new position, timing, token count and text offsets of moved rows, and backfill
+        missing hashes. The text column is rewritten only when a row moves between text layouts.
+        (video, generation, chunk_index) is unique, so rows changing index are first moved past every index
+        in use, then set to their final index; orphans must already be deleted.
+
+        Args:
+            diff (ChunkDiff): The diff being applied.
+            unhashed (set): Ids of stored rows whose content_hash column is empty.
+        """
+        updates = [
+            ContentChunk(
+                id=row.id,
+                chunk_index=chunk.chunk_index,
+                start_seconds=int(chunk.start_seconds),
+                end_seconds=int(chunk.end_seconds),
+                token_count=chunk.token_count,
+                content_hash=row.content_hash,
+                **self._text_fields(chunk),
+            )
+            for row, chunk in diff.updated
+        ]
+        fields = ['chunk_index', 'start_seconds', 'end_seconds', 'token_count', 'content_hash', 'text_start', 'text_end']
+        if any((row.text_start is None) != (chunk.text_start is None) for row, chunk in diff.updated):
+            fields.append('text')
+        reindexed = [(row, chunk) for row, chunk in diff.updated if row.chunk_index != chunk.chunk_index]
+        if reindexed:
+            offset = 1 + max(
+                max(row.chunk_index for row, _ in diff.updated),
+                max(chunk.chunk_index for _, chunk in diff.updated),
+                max((row.chunk_index for row in diff.reused), default=0),
+            )
+            ContentChunk.objects.bulk_update(
+                [ContentChunk(id=row.id, chunk_index=offset + chunk.chunk_index) for row, chunk in reindexed],
+                ['chunk_index'],
+            )
+        if updates:
+            ContentChunk.objects.bulk_update(updates, fields)
 
+        backfill = [
+            ContentChunk(id=row.id, content_hash=row.content_hash)
+            for row in diff.reused
+            if row.id in unhashed
+        ]
+        if backfill:
+            ContentChunk.objects.bulk_update(backfill, ['content_hash'])
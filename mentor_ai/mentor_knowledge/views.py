@@ -5,7 +5,7 @@ from rest_framework.response import Response
 from rest_framework import status
 
 from .models import Mentor, VideoContent, ContentChunk
-from .serializers import MentorSerializer, VideoContentSerializer, ContentChunkSerializer
+from .serializers import MentorSerializer, VideoContentSerializer, ContentChunkSerializer, resolve_chunk_texts
 from .tasks import process_video_transcript_task
 
 
@@ -22,6 +22,12 @@ class VideoContentViewSet(ModelViewSet):
     queryset = VideoContent.objects.select_related("mentor").order_by("id")
     serializer_class = VideoContentSerializer
 
+    def perform_destroy(self, instance):
+        mentor_id = instance.mentor_id
+        super().perform_destroy(instance)
+        # The video's chunks were deleted with it; cached rankings and vector indexes still hold them.
+        Mentor.bump_corpus_version(mentor_id)
+
     @action(detail=True, methods=["post"], url_path="enqueue-transcript")
     def enqueue_transcript(self, request, pk=None):
         video = self.get_object()
@@ -86,5 +92,31 @@ class VideoContentViewSet(ModelViewSet):
 
 
 class ContentChunkViewSet(ModelViewSet):
-    queryset = ContentChunk.objects.select_related("video", "video__mentor").order_by("video_id", "chunk_index", "id")
+    """
+    Chunk edits change what search returns, so each one bumps the mentor's
+    corpus_version (invalidating cached rankings and vector indexes).
+    """
+    queryset = ContentChunk.objects.active().select_related("video", "video__mentor").order_by("video_id", "chunk_index", "id")
     serializer_class = ContentChunkSerializer
+
+    def get_serializer(self, *args, **kwargs):
+        if args and args[0] is not None:
+            # Texts of the page's chunks stored in the "blob" layout, sliced in bulk.
+            chunks = list(args[0]) if kwargs.get("many") else [args[0]]
+            if kwargs.get("many"):
+                args = (chunks, *args[1:])
+            kwargs["context"] = {**self.get_serializer_context(), "chunk_texts": resolve_chunk_texts(chunks)}
+        return super().get_serializer(*args, **kwargs)
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        Mentor.bump_corpus_version(serializer.instance.mentor_id)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        Mentor.bump_corpus_version(serializer.instance.mentor_id)
+
+    def perform_destroy(self, instance):
+        mentor_id = instance.mentor_id
+        super().perform_destroy(instance)
+        Mentor.bump_corpus_version(mentor_id)
@@ -73,7 +73,7 @@ class AuthResponseSerializer(serializers.Serializer):
 
 class RetrievedChunkSerializer(serializers.Serializer):
     chunk_id = serializers.CharField()
-    distance = serializers.FloatField()
+    distance = serializers.FloatField(allow_null=True)
     video_id = serializers.CharField()
     video_title = serializers.CharField()
     youtube_video_id = serializers.CharField()
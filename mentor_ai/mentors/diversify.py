@@ -0,0 +1,236 @@
+"""
+Diversification of retrieved chunks before they are sent to the LLM.
+
+Chunks overlap by CHUNK_OVERLAP_WORDS words, so a plain top-k often contains
+neighbouring chunks that repeat the same sentences. These passes shrink the context:
+
+1. Maximal marginal relevance (MMR) over an over-fetched candidate set picks
+   chunks that are relevant to the query but dissimilar to those already picked.
+   Candidate similarities are computed in Postgres, so no vectors are loaded.
+2. Optionally, each hit is expanded with its +/-N neighbouring chunks so a
+   passage cut mid-thought arrives whole (all neighbours come from one query).
+3. Chunks of the same video with consecutive chunk_index are merged into one
+   span, dropping the words they share.
+4. Optionally, the spans are cut to a token budget (CHAT_CONTEXT_MAX_TOKENS)
+   using the token counts stored at ingestion, so nothing is re-tokenized.
+"""
+import copy
+import operator
+from functools import reduce
+
+import numpy as np
+from django.db import connection
+from django.db.models import Q
+
+from mentor_knowledge.models import ContentChunk
+from mentor_knowledge.tokenizers import get_tokenizer
+from mentors.retrieval import RetrievedChunk, project_chunks
+
+# Pairwise cosine similarity of the candidates, computed where the vectors live
+# so they never have to be transferred and parsed.
+_PAIRWISE_SIMILARITY_SQL = f"""
+SELECT a.id, b.id, 1 - (a.embedding <=> b.embedding)
+FROM {ContentChunk._meta.db_table} a
+JOIN {ContentChunk._meta.db_table} b ON b.id = ANY(%s::uuid[]) AND a.id < b.id
+WHERE a.id = ANY(%s::uuid[])
+"""
+
+
+def _mmr(relevance: np.ndarray, similarity: np.ndarray, k: int, lambda_mult: float) -> list[int]:
+    """
+    Maximal marginal relevance over precomputed query relevance [n] and candidate similarity [n, n].
+    Each step picks argmax(lambda * relevance(c) - (1 - lambda) * max similarity(c, selected)).
+    """
+    n = relevance.shape[0]
+    max_similarity = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+
+    selected = []
+    for _ in range(min(k, n)):
+        redundancy = np.where(np.isfinite(max_similarity), max_similarity, 0.0)
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        max_similarity = np.maximum(max_similarity, similarity[:, best])
+    return selected
+
+
+def _pairwise_similarity(chunks) -> np.ndarray:
+    """Cosine similarity matrix of the chunks' embeddings, computed in one query."""
+    position = {chunk.id: i for i, chunk in enumerate(chunks)}
+    ids = [str(chunk_id) for chunk_id in position]
+    similarity = np.eye(len(chunks), dtype=np.float32)
+    with connection.cursor() as cursor:
+        cursor.execute(_PAIRWISE_SIMILARITY_SQL, [ids, ids])
+        for a, b, value in cursor.fetchall():
+            i, j = position[a], position[b]
+            similarity[i, j] = similarity[j, i] = value if value is not None else 0.0
+    return similarity
+
+
+def _join_overlapping(first: str, second: str, max_overlap: int) -> str:
+    """Concatenate two texts, dropping the longest suffix of `first` that starts `second`."""
+    first_words = first.split()
+    second_words = second.split()
+    for size in range(min(max_overlap, len(first_words), len(second_words)), 0, -1):
+        if first_words[-size:] == second_words[:size]:
+            return " ".join(first_words + second_words[size:])
+    return " ".join(first_words + second_words)
+
+
+def merge_adjacent_chunks(chunks, max_overlap_words: int) -> list:
+    """
+    Collapse chunks of the same video with consecutive chunk_index into one span.
+    Chunks with no distance of their own (expanded neighbours) should be passed
+    after the hits so a span always takes the rank of its best hit.
+    Merged spans are shallow copies of their best-ranked member, with the joined
+    text, the covering time range, the smallest distance, the summed token_count
+    and `merged_chunk_ids`.
+    Args:
+        chunks (list): Ranked chunks, best first.
+        max_overlap_words (int): Longest word overlap to look for between neighbours.
+    Returns:
+        list: Spans ordered by the rank of their best member.
+    """
+    rank = {chunk.id: position for position, chunk in enumerate(chunks)}
+    by_position = sorted(chunks, key=lambda chunk: (str(chunk.video_id), chunk.chunk_index))
+
+    groups = []
+    for chunk in by_position:
+        previous = groups[-1][-1] if groups else None
+        if (
+            previous is not None
+            and previous.video_id == chunk.video_id
+            and chunk.chunk_index == previous.chunk_index + 1
+        ):
+            groups[-1].append(chunk)
+        else:
+            groups.append([chunk])
+
+    spans = []
+    for group in groups:
+        best = min(group, key=lambda chunk: rank[chunk.id])
+        if len(group) == 1:
+            spans.append(best)
+            continue
+
+        span = copy.copy(best)
+        text = group[0].text
+        for chunk in group[1:]:
+            text = _join_overlapping(text, chunk.text, max_overlap_words)
+        span.text = text
+        span.chunk_index = group[0].chunk_index
+        span.start_seconds = group[0].start_seconds
+        span.end_seconds = group[-1].end_seconds
+        distances = [d for d in (getattr(chunk, "distance", None) for chunk in group) if d is not None]
+        span.distance = min(distances) if distances else None
+        # Upper bound: the overlap dropped from the joined text is still counted.
+        token_counts = [getattr(chunk, "token_count", None) for chunk in group]
+        span.token_count = None if None in token_counts else sum(token_counts)
+        span.merged_chunk_ids = [chunk.id for chunk in group]
+        spans.append(span)
+
+    return sorted(spans, key=lambda span: rank[span.id])
+
+
+def select_diverse_chunks(chunks, *, query_embedding, k: int, lambda_mult: float) -> list:
+    """
+    Reduce over-fetched candidates to at most k diverse chunks.
+    Args:
+        chunks (list): Ranked candidate chunks, best first.
+        query_embedding: The query vector, or None (lexical search), which keeps the first k.
+        k (int): Maximum number of chunks to keep.
+        lambda_mult (float): MMR relevance/diversity trade-off.
+    Returns:
+        list: Selected chunks, best first.
+    """
+    if query_embedding is None or len(chunks) <= k:
+        return chunks[:k]
+    # Relevance comes from the distances retrieval already computed.
+    relevance = np.array(
+        [0.0 if chunk.distance is None else 1.0 - chunk.distance for chunk in chunks],
+        dtype=np.float32,
+    )
+    selected = _mmr(relevance, _pairwise_similarity(chunks), k, lambda_mult)
+    return [chunks[i] for i in selected]
+
+
+def _neighbour_ranges(chunks, window: int) -> dict:
+    """
+    Inclusive chunk_index ranges to fetch per video, with overlapping or
+    touching windows coalesced.
+    """
+    windows_by_video = {}
+    for chunk in chunks:
+        windows_by_video.setdefault(chunk.video_id, []).append(
+            (max(0, chunk.chunk_index - window), chunk.chunk_index + window)
+        )
+
+    ranges_by_video = {}
+    for video_id, windows in windows_by_video.items():
+        windows.sort()
+        ranges = [list(windows[0])]
+        for low, high in windows[1:]:
+            if low <= ranges[-1][1] + 1:
+                ranges[-1][1] = max(ranges[-1][1], high)
+            else:
+                ranges.append([low, high])
+        ranges_by_video[video_id] = [tuple(r) for r in ranges]
+    return ranges_by_video
+
+
+def fetch_neighbour_chunks(chunks, window: int) -> list[RetrievedChunk]:
+    """
+    Fetch the chunks within `window` positions of each hit, in one query.
+    Overlapping windows of the same video are coalesced into a single
+    chunk_index range, so the query is an OR of (video, chunk_index) range
+    predicates. Chunks are unique per (video, generation, chunk_index), so the
+    ranges are restricted to the active generation (is_active, see
+    ContentChunk.objects.active()) and never return a superseded chunk.
+    Args:
+        chunks (list): Retrieved chunks.
+        window (int): Number of neighbours to fetch on each side of a hit.
+    Returns:
+        list[RetrievedChunk]: Neighbours not already in `chunks`, ordered by video and chunk_index.
+    """
+    if window < 1 or not chunks:
+        return []
+
+    predicates = [
+        Q(video_id=video_id, chunk_index__gte=low, chunk_index__lte=high)
+        for video_id, ranges in _neighbour_ranges(chunks, window).items()
+        for low, high in ranges
+    ]
+    return project_chunks(
+        ContentChunk.objects
+        .active()
+        .filter(reduce(operator.or_, predicates))
+        .exclude(id__in=[chunk.id for chunk in chunks])
+        .order_by("video_id", "chunk_index")
+    )
+
+
+def fit_token_budget(chunks, max_tokens: int) -> list:
+    """
+    Keep the best-ranked chunks whose token counts fit in max_tokens.
+    A chunk that does not fit is skipped, so a smaller lower-ranked one may
+    still take the remaining room; the best chunk is always kept.
+    Chunks without a stored token_count (ingested before it existed) are counted here.
+    Args:
+        chunks (list): Ranked chunks or spans, best first.
+        max_tokens (int): Token budget of the context.
+    Returns:
+        list: The kept chunks, in rank order.
+    """
+    kept, used = [], 0
+    for chunk in chunks:
+        tokens = getattr(chunk, "token_count", None)
+        if tokens is None:
+            tokens = get_tokenizer().count(chunk.text)
+        if kept and used + tokens > max_tokens:
+            continue
+        kept.append(chunk)
+        used += tokens
+    return kept
@@ -0,0 +1,122 @@
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from pgvector.django import CosineDistance
+
+from mentor_knowledge.models import ContentChunk, Mentor
+from mentors.retrieval import (
+    RETRIEVAL_MODE_APPROXIMATE,
+    RETRIEVAL_MODES,
+    _vector_search,
+    _vector_search_session,
+)
+
+
+class Command(BaseCommand):
+    help = 'Compare latency and allocation of model-instance retrieval vs the lean RetrievedChunk projection'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--mentor',
+            type=str,
+            required=True,
+            help='Slug of the mentor to search'
+        )
+        parser.add_argument(
+            '--queries',
+            type=int,
+            default=20,
+            help='Sampled chunk embeddings used as queries (default: 20)'
+        )
+        parser.add_argument(
+            '--k',
+            type=int,
+            nargs='+',
+            default=[6, 12],
+            help='Top-k values to benchmark (default: 6 12)'
+        )
+        parser.add_argument(
+            '--mode',
+            choices=RETRIEVAL_MODES,
+            default=RETRIEVAL_MODE_APPROXIMATE,
+            help='Vector search mode (default: approximate)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            mentor = Mentor.objects.get(slug=options['mentor'])
+        except Mentor.DoesNotExist:
+            raise CommandError(f"Mentor not found: {options['mentor']}")
+
+        queries = list(
+            ContentChunk.objects
+            .filter(mentor_id=mentor.id, embedding__isnull=False)
+            .order_by("?")
+            .values_list("embedding", flat=True)[:options['queries']]
+        )
+        if not queries:
+            raise CommandError(f"Mentor {mentor.slug} has no embedded chunks")
+
+        mode = options['mode']
+        self.stdout.write(f"Mentor {mentor.slug}: {len(queries)} queries, mode={mode}")
+        for k in options['k']:
+            for label, search in (
+                ("model instances", self._model_instances),
+                ("RetrievedChunk", self._projection),
+            ):
+                latencies, allocations = self._measure(search, mentor.id, queries, k, mode)
+                self.stdout.write(
+                    f"k={k:<3} {label:<16} "
+                    f"p50={statistics.median(latencies) * 1000:.2f} ms "
+                    f"p95={self._p95(latencies) * 1000:.2f} ms "
+                    f"peak alloc/request={statistics.mean(allocations) / 1024:.1f} KiB"
+                )
+
+    @staticmethod
+    def _model_instances(mentor_id, query_embedding, k, mode):
+        # The pre-projection path: full rows, embedding included, plus joined models.
+        qs = (
+            ContentChunk.objects
+            .filter(mentor_id=mentor_id, embedding__isnull=False)
+            .select_related("video", "video__mentor")
+            .annotate(distance=CosineDistance("embedding", query_embedding))
+            .order_by("distance")[:k]
+        )
+        with _vector_search_session(mode, k):
+            return list(qs)
+
+    @staticmethod
+    def _projection(mentor_id, query_embedding, k, mode):
+        return _vector_search(mentor_id=mentor_id, query_embedding=query_embedding, k=k, mode=mode)
+
+    @staticmethod
+    def _measure(search, mentor_id, queries, k, mode):
+        # Warm up connection and plan caches before measuring.
+        search(mentor_id, queries[0], k, mode)
+
+        latencies = []
+        for query_embedding in queries:
+            start = time.perf_counter()
+            search(mentor_id, query_embedding, k, mode)
+            latencies.append(time.perf_counter() - start)
+
+        # Allocation is measured in a separate pass: tracing slows every allocation down.
+        allocations = []
+        tracemalloc.start()
+        try:
+            for query_embedding in queries:
+                tracemalloc.reset_peak()
+                baseline, _ = tracemalloc.get_traced_memory()
+                search(mentor_id, query_embedding, k, mode)
+                _, peak = tracemalloc.get_traced_memory()
+                allocations.append(peak - baseline)
+        finally:
+            tracemalloc.stop()
+        return latencies, allocations
+
+    @staticmethod
+    def _p95(values):
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
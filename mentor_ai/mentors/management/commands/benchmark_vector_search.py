@@ -0,0 +1,334 @@
+import json
+import math
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from mentor_knowledge.ann_index import (
+    CONTENT_CHUNK_TABLE,
+    INDEX_TYPES,
+    VECTOR_COLUMNS,
+    build_create_index_sql,
+    build_drop_index_sql,
+    get_index_size_bytes,
+    get_index_type,
+)
+from mentor_knowledge.compact_embeddings import COMPACT_TYPES, compact_field_values, get_compact_type
+from mentor_knowledge.models import ContentChunk, Mentor, VideoContent
+from mentors.retrieval import (
+    RETRIEVAL_MODE_APPROXIMATE,
+    RETRIEVAL_MODE_EXACT,
+    _numpy_search,
+    _vector_search,
+)
+
+DISTRIBUTIONS = ("random", "clustered")
+BACKENDS = ("approximate", "numpy")
+# Norm of the noise added around cluster centers (centers are unit vectors).
+CLUSTER_SPREAD = 0.5
+# Rows generated (from their own seeded RNG) and inserted per batch; fixed so
+# the corpus for a given seed and size is always the same.
+GENERATION_BATCH = 2000
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate deterministic synthetic mentors and report vector retrieval latency, '
+        'recall@k against exact search, and index build time/size as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[1000, 10000],
+            help='Chunk counts of the synthetic mentors, one mentor per size (default: 1000 10000)'
+        )
+        parser.add_argument(
+            '--distribution',
+            choices=DISTRIBUTIONS,
+            default='clustered',
+            help='Embedding distribution (default: clustered)'
+        )
+        parser.add_argument(
+            '--clusters',
+            type=int,
+            default=64,
+            help='Cluster count for the clustered distribution (default: 64)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Seed for corpus and query generation (default: 42)'
+        )
+        parser.add_argument(
+            '--queries',
+            type=int,
+            default=50,
+            help='Size of the fixed query set (default: 50)'
+        )
+        parser.add_argument(
+            '--k',
+            type=int,
+            default=6,
+            help='Top-k for latency and recall (default: 6)'
+        )
+        parser.add_argument(
+            '--chunks-per-video',
+            type=int,
+            default=200,
+            help='Synthetic chunks per synthetic video (default: 200)'
+        )
+        parser.add_argument(
+            '--index-type',
+            choices=INDEX_TYPES,
+            help='ANN index type to build (defaults to VECTOR_INDEX_TYPE)'
+        )
+        parser.add_argument(
+            '--backends',
+            nargs='+',
+            choices=BACKENDS,
+            default=list(BACKENDS),
+            help='Backends compared against exact search (default: approximate numpy)'
+        )
+        parser.add_argument(
+            '--compact',
+            nargs='*',
+            choices=list(COMPACT_TYPES),
+            default=[],
+            help='Also benchmark compact candidate search + rescoring for these types'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Write the JSON report to this file instead of stdout'
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep the synthetic mentors; a later run with the same options reuses them'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            index_type = get_index_type(options['index_type'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        if options['queries'] < 1 or options['k'] < 1:
+            raise CommandError("--queries and --k must be positive")
+
+        dimensions = settings.EMBEDDING_DIMENSIONS
+        centers = self._cluster_centers(options, dimensions)
+        mentors = [self._ensure_corpus(size, options, dimensions, centers) for size in options['sizes']]
+
+        report = {
+            "config": {
+                "sizes": options['sizes'],
+                "distribution": options['distribution'],
+                "clusters": options['clusters'] if options['distribution'] == 'clustered' else None,
+                "seed": options['seed'],
+                "queries": options['queries'],
+                "k": options['k'],
+                "dimensions": dimensions,
+                "index_type": index_type,
+                "hnsw_ef_search": settings.VECTOR_HNSW_EF_SEARCH,
+                "ivfflat_probes": settings.VECTOR_IVFFLAT_PROBES,
+            },
+            "indexes": self._build_indexes(index_type, options['compact']),
+            "results": [],
+        }
+
+        queries = self._embeddings(
+            np.random.default_rng([options['seed'], 1]), options['queries'], dimensions, centers
+        )
+        try:
+            for size, mentor in zip(options['sizes'], mentors):
+                report["results"].extend(self._benchmark_mentor(size, mentor, queries, options))
+        finally:
+            if not options['keep']:
+                self._cleanup(mentors)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            Path(options['output']).write_text(output + "\n")
+            self.stderr.write(f"Report written to {options['output']}")
+        else:
+            self.stdout.write(output)
+
+    # -----------------------------------------------------------------
+    # Corpus generation
+    # -----------------------------------------------------------------
+
+    @staticmethod
+    def _cluster_centers(options, dimensions):
+        if options['distribution'] != 'clustered':
+            return None
+        centers = np.random.default_rng([options['seed'], 0]).standard_normal(
+            (options['clusters'], dimensions), dtype=np.float32
+        )
+        return centers / np.linalg.norm(centers, axis=1, keepdims=True)
+
+    @staticmethod
+    def _embeddings(rng, n, dimensions, centers):
+        """Unit vectors, either isotropic random or scattered around cluster centers."""
+        if centers is None:
+            vectors = rng.standard_normal((n, dimensions), dtype=np.float32)
+        else:
+            noise = rng.standard_normal((n, dimensions), dtype=np.float32) * (CLUSTER_SPREAD / math.sqrt(dimensions))
+            vectors = centers[rng.integers(0, len(centers), n)] + noise
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def _ensure_corpus(self, size, options, dimensions, centers):
+        distribution = options['distribution']
+        if distribution == 'clustered':
+            distribution += str(options['clusters'])
+        slug = f"bench-{distribution}-{size}-s{options['seed']}"
+        mentor = Mentor.objects.filter(slug=slug).first()
+        if mentor is not None:
+            complete = mentor.chunks.filter(
+                **{f"{get_compact_type(name).field}__isnull": False for name in options['compact']}
+            ).count()
+            if complete == size:
+                self.stderr.write(f"Reusing synthetic mentor {slug}")
+                return mentor
+            mentor.delete()
+
+        start = time.perf_counter()
+        mentor = Mentor.objects.create(name=f"Benchmark {size}", slug=slug, bio="Synthetic benchmark corpus")
+        per_video = options['chunks_per_video']
+        videos = VideoContent.objects.bulk_create([
+            VideoContent(
+                mentor=mentor,
+                title=f"Synthetic video {i}",
+                youtube_video_id=f"bench{i:07d}",
+                status=VideoContent.Status.READY,
+            )
+            for i in range(math.ceil(size / per_video))
+        ])
+
+        for batch_start in range(0, size, GENERATION_BATCH):
+            count = min(GENERATION_BATCH, size - batch_start)
+            rng = np.random.default_rng([options['seed'], 2, size, batch_start])
+            embeddings = self._embeddings(rng, count, dimensions, centers)
+            ContentChunk.objects.bulk_create([
+                ContentChunk(
+                    video_id=videos[i // per_video].id,
+                    mentor_id=mentor.id,
+                    generation=1,
+                    chunk_index=i % per_video,
+                    text=f"Synthetic chunk {i}",
+                    start_seconds=(i % per_video) * 30,
+                    end_seconds=(i % per_video) * 30 + 30,
+                    embedding=embedding,
+                    **compact_field_values(embedding, options['compact']),
+                )
+                for i, embedding in zip(range(batch_start, batch_start + count), embeddings)
+            ])
+            self.stderr.write(f"  {slug}: {batch_start + count}/{size} chunks")
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {CONTENT_CHUNK_TABLE}")
+        self.stderr.write(f"Generated {slug} in {time.perf_counter() - start:.1f}s")
+        return mentor
+
+    # -----------------------------------------------------------------
+    # Indexes
+    # -----------------------------------------------------------------
+
+    def _build_indexes(self, index_type, compact_names):
+        columns = [VECTOR_COLUMNS["embedding"]]
+        columns += [VECTOR_COLUMNS[get_compact_type(name).field] for name in compact_names]
+
+        indexes = {}
+        with connection.cursor() as cursor:
+            for column in columns:
+                cursor.execute(build_drop_index_sql(column.index_name))
+                start = time.perf_counter()
+                cursor.execute(build_create_index_sql(
+                    index_name=column.index_name,
+                    column=column.column,
+                    opclass=column.opclass,
+                    index_type=index_type,
+                ))
+                indexes[column.column] = {
+                    "index": column.index_name,
+                    "build_seconds": round(time.perf_counter() - start, 3),
+                    # A partitioned table reports 0 here; its partitions hold the index data.
+                    "size_bytes": get_index_size_bytes(cursor, column.index_name),
+                }
+                self.stderr.write(f"Built {index_type} index on {column.column}")
+        return indexes
+
+    # -----------------------------------------------------------------
+    # Measurement
+    # -----------------------------------------------------------------
+
+    def _benchmark_mentor(self, size, mentor, queries, options):
+        k = options['k']
+        searches = {
+            "exact": lambda q: _vector_search(mentor_id=mentor.id, query_embedding=q, k=k, mode=RETRIEVAL_MODE_EXACT),
+        }
+        if "approximate" in options['backends']:
+            searches["approximate"] = lambda q: _vector_search(
+                mentor_id=mentor.id, query_embedding=q, k=k, mode=RETRIEVAL_MODE_APPROXIMATE
+            )
+        for name in options['compact']:
+            searches[f"compact:{name}"] = lambda q, name=name: _vector_search(
+                mentor_id=mentor.id, query_embedding=q, k=k, mode=RETRIEVAL_MODE_APPROXIMATE, compact_type=name
+            )
+
+        numpy_build_seconds = None
+        if "numpy" in options['backends']:
+            # Imported lazily like the retrieval code does; the first call builds the files.
+            from mentors.numpy_index import get_mentor_index
+
+            start = time.perf_counter()
+            get_mentor_index(mentor.id, mentor.corpus_version)
+            numpy_build_seconds = round(time.perf_counter() - start, 3)
+            searches["numpy"] = lambda q: _numpy_search(mentor=mentor, query_embedding=q, k=k)
+
+        expected = None
+        results = []
+        for backend, search in searches.items():
+            search(queries[0])  # warm up plans and caches
+            latencies, found = [], []
+            for query in queries:
+                start = time.perf_counter()
+                hits = search(query)
+                latencies.append(time.perf_counter() - start)
+                found.append({hit.id for hit in hits})
+            if expected is None:
+                expected = found
+
+            result = {
+                "chunks": size,
+                "backend": backend,
+                "latency_ms": {
+                    name: round(float(np.percentile(latencies, q)) * 1000, 3)
+                    for name, q in (("p50", 50), ("p95", 95), ("p99", 99))
+                },
+                "recall_at_k": round(
+                    float(np.mean([len(e & f) / len(e) for e, f in zip(expected, found) if e])), 4
+                ),
+            }
+            if backend == "numpy":
+                result["index_build_seconds"] = numpy_build_seconds
+            results.append(result)
+            self.stderr.write(
+                f"{size:>9} chunks  {backend:<16} p50={result['latency_ms']['p50']} ms  "
+                f"recall@{k}={result['recall_at_k']}"
+            )
+        return results
+
+    def _cleanup(self, mentors):
+        for mentor in mentors:
+            shutil.rmtree(Path(settings.VECTOR_INDEX_DIR) / str(mentor.id), ignore_errors=True)
+            mentor.delete()
+        self.stderr.write("Removed synthetic mentors (use --keep to reuse them)")
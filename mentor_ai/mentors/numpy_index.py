@@ -0,0 +1,209 @@
+"""
+In-process NumPy vector index per mentor, memory-mapped from disk.
+
+Each mentor's embeddings are stored as one contiguous, L2-normalized float32
+matrix so a query is a single matrix-vector product plus argpartition. Files
+are opened with mmap, so every gunicorn worker on a host shares the same pages
+through the OS page cache instead of holding its own copy.
+
+Layout under settings.VECTOR_INDEX_DIR:
+    <mentor_id>/v<version>.vectors.npy   float32 [n, dim]
+    <mentor_id>/v<version>.ids.npy       uint8   [n, 16] (chunk UUID bytes)
+
+The version is Mentor.corpus_version, bumped whenever the mentor's chunks are
+replaced, edited or deleted through the API, or a video becomes READY, so a stale index is never
+read: a new version simply builds a new pair of files and older ones are removed
+(never newer ones, which a worker holding a stale version may come across).
+"""
+import fcntl
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+from mentor_knowledge.models import ContentChunk
+
+logger = logging.getLogger(__name__)
+
+_BUILD_BATCH_SIZE = 2000
+
+
+@dataclass(frozen=True)
+class MentorVectorIndex:
+    """Memory-mapped embeddings of one mentor at one corpus version."""
+    version: int
+    ids: np.ndarray
+    vectors: np.ndarray
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    def search(self, query_embedding, k: int) -> list[tuple[uuid.UUID, float]]:
+        """
+        Exact top-k cosine search.
+        Args:
+            query_embedding: The query vector.
+            k (int): Number of results to return.
+        Returns:
+            list[tuple[UUID, float]]: (chunk id, cosine distance) pairs, closest first.
+        """
+        n = len(self)
+        if n == 0 or k < 1:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape != (self.vectors.shape[1],):
+            raise ValueError(
+                f"query embedding has {query.size} dimensions, index has {self.vectors.shape[1]}"
+            )
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        scores = self.vectors @ query
+        if k < n:
+            top = np.argpartition(scores, n - k)[n - k:]
+        else:
+            top = np.arange(n)
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return [
+            (uuid.UUID(bytes=self.ids[i].tobytes()), float(1.0 - scores[i]))
+            for i in top
+        ]
+
+
+_loaded: dict[str, MentorVectorIndex] = {}
+_loaded_lock = threading.Lock()
+
+
+def _mentor_dir(mentor_id) -> Path:
+    return Path(settings.VECTOR_INDEX_DIR) / str(mentor_id)
+
+
+_VERSION_FILE = re.compile(r"v(\d+)\.(?:vectors|ids)\.npy")
+
+
+def _index_paths(mentor_id, version: int) -> tuple[Path, Path]:
+    base = _mentor_dir(mentor_id)
+    return base / f"v{version}.vectors.npy", base / f"v{version}.ids.npy"
+
+
+def _load(mentor_id, version: int) -> MentorVectorIndex | None:
+    vectors_path, ids_path = _index_paths(mentor_id, version)
+    if not (vectors_path.exists() and ids_path.exists()):
+        return None
+    return MentorVectorIndex(
+        version=version,
+        ids=np.load(ids_path, mmap_mode="r"),
+        vectors=np.load(vectors_path, mmap_mode="r"),
+    )
+
+
+def build_mentor_index(mentor_id, version: int) -> None:
+    """
+    Write the index files for a mentor at the given version.
+    Files are written under a temporary name and renamed into place, so readers
+    never observe a partially written matrix.
+    """
+    start = time.perf_counter()
+    vectors_path, ids_path = _index_paths(mentor_id, version)
+    vectors_path.parent.mkdir(parents=True, exist_ok=True)
+
+    qs = (
+        ContentChunk.objects
+        .active()
+        .filter(mentor_id=mentor_id, embedding__isnull=False)
+        .order_by("video_id", "chunk_index")
+    )
+    expected = qs.count()
+    dimensions = settings.EMBEDDING_DIMENSIONS
+    suffix = f".tmp-{os.getpid()}-{threading.get_ident()}"
+    tmp_vectors = vectors_path.with_name(vectors_path.name + suffix)
+    tmp_ids = ids_path.with_name(ids_path.name + suffix)
+
+    vectors = np.lib.format.open_memmap(
+        tmp_vectors, mode="w+", dtype=np.float32, shape=(expected, dimensions)
+    )
+    ids = np.zeros((expected, 16), dtype=np.uint8)
+
+    written = 0
+    for chunk_id, embedding in qs.values_list("id", "embedding").iterator(chunk_size=_BUILD_BATCH_SIZE):
+        if written == expected:
+            break
+        vectors[written] = embedding
+        ids[written] = np.frombuffer(chunk_id.bytes, dtype=np.uint8)
+        written += 1
+
+    norms = np.linalg.norm(vectors[:written], axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    vectors[:written] /= norms
+    vectors.flush()
+    del vectors
+
+    if written != expected:
+        # Chunks were deleted while building; rewrite a matrix of the right size.
+        trimmed = np.array(np.load(tmp_vectors, mmap_mode="r")[:written])
+        with open(tmp_vectors, "wb") as f:
+            np.save(f, trimmed)
+        ids = ids[:written]
+
+    with open(tmp_ids, "wb") as f:
+        np.save(f, ids)
+    os.replace(tmp_ids, ids_path)
+    os.replace(tmp_vectors, vectors_path)
+
+    logger.info(
+        "Mentor vector index built | mentor_id=%s version=%s chunks=%s duration_sec=%.2f",
+        mentor_id,
+        version,
+        written,
+        time.perf_counter() - start,
+    )
+
+
+def _remove_stale_versions(mentor_id, version: int) -> None:
+    """Delete the index files of versions older than `version`; newer ones are left alone."""
+    for path in _mentor_dir(mentor_id).glob("v*.npy"):
+        match = _VERSION_FILE.fullmatch(path.name)
+        if match and int(match.group(1)) < version:
+            # Unlinking is safe for workers that still have the old file mapped.
+            path.unlink(missing_ok=True)
+
+
+def get_mentor_index(mentor_id, version: int) -> MentorVectorIndex:
+    """
+    Return the mentor's index for the given corpus version, building it if needed.
+    Builds are serialized per mentor with a file lock so concurrent workers on the
+    same host wait for one build instead of each scanning the table.
+    """
+    key = str(mentor_id)
+    index = _loaded.get(key)
+    if index is not None and index.version == version:
+        return index
+
+    index = _load(mentor_id, version)
+    if index is None:
+        mentor_dir = _mentor_dir(mentor_id)
+        mentor_dir.mkdir(parents=True, exist_ok=True)
+        with open(mentor_dir / ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                index = _load(mentor_id, version)
+                if index is None:
+                    build_mentor_index(mentor_id, version)
+                    _remove_stale_versions(mentor_id, version)
+                    index = _load(mentor_id, version)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    with _loaded_lock:
+        _loaded[key] = index
+    return index
@@ -1,26 +1,51 @@
 import os
+
+import numpy as np
+from django.conf import settings
 from openai import OpenAI
 
+from mentor_knowledge.embedding_providers import get_embedding_provider
+from mentor_knowledge.embedding_service import estimate_tokens
+from mentor_knowledge.rate_limit import get_rate_limiter
+from mentors.query_embedding_cache import QUERY_EMBEDDING_CACHE
+
 client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
 
 EMBEDDING_MODEL = os.environ.get("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
 CHAT_MODEL = os.environ.get("OPENAI_CHAT_MODEL", "gpt-4o-mini")
+# Keep chat responsive: a slow embedding call fails fast so chat can fall back to lexical search.
+EMBEDDING_TIMEOUT = float(os.environ.get("OPENAI_EMBEDDING_TIMEOUT", "10"))
+# Query embeddings come from the same provider as chunk embeddings (settings.EMBEDDING_PROVIDER).
+embedding_provider = get_embedding_provider(model=EMBEDDING_MODEL)
 
 
-def embed_query(text: str) -> list[float]:
+def embed_query(text: str) -> np.ndarray:
     """
     Generate an embedding for the given text.
+    Repeated messages are served from the query embedding cache without a network call.
     :param text: The text to embed.
-    :return: A list of floats representing the embedding.
+    :return: The float32 embedding vector.
     """
     if not text.strip():
         raise ValueError("text cannot be empty")
-    
-    resp = client.embeddings.create(
-        model=EMBEDDING_MODEL,
-        input=text,
-    )
-    return resp.data[0].embedding
+
+    cache_key = None
+    if settings.QUERY_EMBEDDING_CACHE_ENABLED:
+        cache_key = QUERY_EMBEDDING_CACHE.make_key(embedding_provider.model, settings.EMBEDDING_DIMENSIONS, text)
+        cached = QUERY_EMBEDDING_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+    # Share the embedding budget with ingestion; waiting longer than the call's
+    # own timeout raises RateLimitWaitTimeout, which chat treats as transient.
+    limiter = get_rate_limiter(embedding_provider.model) if embedding_provider.rate_limited else None
+    if limiter is not None:
+        limiter.acquire(estimate_tokens(text), max_wait=EMBEDDING_TIMEOUT)
+
+    embedding = embedding_provider.embed([text], timeout=EMBEDDING_TIMEOUT)[0]
+    if cache_key is not None:
+        QUERY_EMBEDDING_CACHE.set(cache_key, embedding)
+    return embedding
 
 
 def generate_answer(*, persona: str, user_text: str, context: str) -> str:
@@ -0,0 +1,115 @@
+"""
+Two-tier cache of chat query embeddings in front of embed_query.
+
+Chat messages repeat a lot ("how do I stay motivated?"), and embedding them
+is a network round trip on every message. Lookups go to a bounded in-process
+LRU first, then to Redis (shared by all web processes); a Redis hit is copied
+into the LRU. Keys are the model, the dimensions and the normalized message
+text, so changing either setting never serves a stale vector.
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+
+from mentors.retrieval_cache import RETRIEVAL_CACHE
+
+logger = logging.getLogger(__name__)
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded LRU backed by a Django cache.
+    Args:
+        max_entries (int): Maximum vectors kept in process memory.
+        backend: Django cache used as the shared second tier.
+        timeout (int): Seconds an entry lives in the shared tier.
+    """
+
+    def __init__(self, max_entries: int, backend, timeout: int):
+        self.max_entries = max_entries
+        self.backend = backend
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(model: str, dimensions: int, text: str) -> str:
+        """
+        Args:
+            model (str): The embedding model.
+            dimensions (int): The requested embedding dimensions.
+            text (str): The raw chat message.
+        Returns:
+            str: Cache key of the message's embedding.
+        """
+        normalized = " ".join(text.lower().split())
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        return f"query_embedding:{model}:{dimensions}:{digest}"
+
+    def get(self, key: str) -> np.ndarray | None:
+        """Return the cached embedding for `key`, or None on a miss in both tiers."""
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self._counters["local_hits"] += 1
+                return embedding
+
+        packed = self.backend.get(key)
+        if packed is None:
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+
+        embedding = np.frombuffer(packed, dtype=np.float32)
+        with self._lock:
+            self._counters["shared_hits"] += 1
+            self._remember(key, embedding)
+        return embedding
+
+    def set(self, key: str, embedding) -> None:
+        """Store an embedding in both tiers (float32 bytes in the shared tier)."""
+        with self._lock:
+            self._remember(key, embedding)
+        self.backend.set(key, np.asarray(embedding, dtype=np.float32).tobytes(), timeout=self.timeout)
+
+    def _remember(self, key: str, embedding) -> None:
+        # Callers hold the lock.
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: local_hits, shared_hits, misses, hit_ratio and the LRU size, for this process.
+        """
+        with self._lock:
+            stats = dict(self._counters, size=len(self._entries))
+        lookups = stats["local_hits"] + stats["shared_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["local_hits"] + stats["shared_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        """Drop the in-process tier and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._counters = dict.fromkeys(self._counters, 0)
+
+
+QUERY_EMBEDDING_CACHE = QueryEmbeddingCache(
+    max_entries=settings.QUERY_EMBEDDING_CACHE_SIZE,
+    backend=RETRIEVAL_CACHE,
+    timeout=settings.QUERY_EMBEDDING_CACHE_TTL,
+)
+
+
+def get_query_embedding_cache_stats() -> dict:
+    """Hit/miss counters of this process' query embedding cache."""
+    return QUERY_EMBEDDING_CACHE.stats()
@@ -1,28 +1,631 @@
+import logging
+import re
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection, transaction
+from django.db.models import F, Value
+from pgvector import Vector
 from pgvector.django import CosineDistance
-from mentor_knowledge.models import ContentChunk
 
+from mentor_knowledge.ann_index import INDEX_TYPE_HNSW, get_index_type
+from mentor_knowledge.compact_embeddings import get_compact_type
+from mentor_knowledge.models import SEARCH_CONFIG, ContentChunk, Mentor, VideoContent
+from mentor_knowledge.transcript_store import fill_chunk_texts
+from mentors.retrieval_cache import get_cached_ranking, make_cache_key, set_cached_ranking
+
+logger = logging.getLogger(__name__)
+
+RETRIEVAL_MODE_EXACT = "exact"
+RETRIEVAL_MODE_APPROXIMATE = "approximate"
+RETRIEVAL_MODES = (RETRIEVAL_MODE_EXACT, RETRIEVAL_MODE_APPROXIMATE)
+
+RETRIEVAL_BACKEND_POSTGRES = "postgres"
+RETRIEVAL_BACKEND_NUMPY = "numpy"
+RETRIEVAL_BACKENDS = (RETRIEVAL_BACKEND_POSTGRES, RETRIEVAL_BACKEND_NUMPY)
+
+SEARCH_MODE_VECTOR = "vector"
+SEARCH_MODE_LEXICAL = "lexical"
+SEARCH_MODE_HYBRID = "hybrid"
+SEARCH_MODES = (SEARCH_MODE_VECTOR, SEARCH_MODE_LEXICAL, SEARCH_MODE_HYBRID)
 
-def retrieve_mentor_chunks(*, mentor_slug: str, query_embedding: list[float], k: int = 6):
+_LEXICAL_TERM_RE = re.compile(r"\w+")
+_LEXICAL_MAX_TERMS = 32
+
+
+class RetrievedChunk:
     """
-    Vector search over ContentChunk.embedding, scoped to a mentor via joins:
-    ContentChunk -> VideoContent -> Mentor
-    1. Filter ContentChunks to those belonging to the specified mentor and having non-null embeddings.
-    2. Annotate each ContentChunk with its cosine distance to the query_embedding.
-    3. Order by distance and return the top k closest chunks.
-    4. Return the results as a list.
+    A retrieval hit: only the columns chat needs to build its context and
+    response, projected with values() so embedding vectors are never
+    transferred or parsed, and stored in slots to keep per-hit allocation small.
+    """
+    __slots__ = (
+        "id",
+        "video_id",
+        "video_title",
+        "youtube_video_id",
+        "chunk_index",
+        "text",
+        "start_seconds",
+        "end_seconds",
+        "token_count",
+        "distance",
+        "score",
+        "merged_chunk_ids",
+    )
+
+    def __init__(
+        self,
+        *,
+        id,
+        video_id,
+        video_title: str,
+        youtube_video_id: str,
+        chunk_index: int,
+        text: str,
+        start_seconds: int | None,
+        end_seconds: int | None,
+        token_count: int | None = None,
+        distance: float | None = None,
+        score: float | None = None,
+        merged_chunk_ids: list | None = None,
+    ):
+        self.id = id
+        self.video_id = video_id
+        self.video_title = video_title
+        self.youtube_video_id = youtube_video_id
+        self.chunk_index = chunk_index
+        self.text = text
+        self.start_seconds = start_seconds
+        self.end_seconds = end_seconds
+        self.token_count = token_count
+        self.distance = distance
+        self.score = score
+        self.merged_chunk_ids = merged_chunk_ids
+
+    def __repr__(self) -> str:
+        return f"<RetrievedChunk {self.youtube_video_id} #{self.chunk_index} distance={self.distance}>"
+
+
+# Columns (and video columns, via one join) selected for every retrieval hit.
+RETRIEVED_CHUNK_FIELDS = ("id", "video_id", "chunk_index", "text", "start_seconds", "end_seconds", "token_count")
+# Where the text of a chunk stored in the "blob" layout is (see transcript_store.py).
+TEXT_SPAN_FIELDS = ("generation", "text_start", "text_end")
+RETRIEVED_VIDEO_FIELDS = {
+    "video_title": F("video__title"),
+    "youtube_video_id": F("video__youtube_video_id"),
+}
+
+
+def project_chunks(qs, *extra_fields: str) -> list[RetrievedChunk]:
+    """
+    Evaluate a ContentChunk queryset as RetrievedChunk records.
     Args:
-        mentor_slug (str): The slug identifier for the mentor.
-        query_embedding (list[float]): The embedding vector to search against.
-        k (int, optional): The number of top results to return. Defaults to 6.
+        qs (QuerySet): ContentChunk queryset, already filtered/annotated/ordered/sliced.
+        *extra_fields (str): Annotations to copy onto the records (e.g. "distance").
     Returns:
-        list[ContentChunk]: The top k closest ContentChunks to the query_embedding for the specified mentor.
+        list[RetrievedChunk]: One record per row, in queryset order; texts of chunks
+            stored in the "blob" layout are sliced from their transcripts in bulk.
     """
-    qs = (
+    chunks, spans = [], []
+    for row in qs.values(*RETRIEVED_CHUNK_FIELDS, *TEXT_SPAN_FIELDS, *extra_fields, **RETRIEVED_VIDEO_FIELDS):
+        spans.append((row["video_id"], *(row.pop(field) for field in TEXT_SPAN_FIELDS)))
+        chunks.append(RetrievedChunk(**row))
+    fill_chunk_texts(chunks, spans)
+    return chunks
+
+# One statement for a whole batch: the LATERAL subquery runs a top-k search per
+# query vector (using the ANN index in approximate mode), restricted to the
+# given mentors and to the active chunk generations, without joining the video
+# until the hits are known. Only RetrievedChunk columns are selected, never the vectors.
+_BATCH_VECTOR_SEARCH_SQL = f"""
+SELECT query.ordinal, hit.id, hit.video_id, video.title, video.youtube_video_id,
+       hit.chunk_index, hit.text, hit.start_seconds, hit.end_seconds, hit.token_count, hit.distance,
+       hit.generation, hit.text_start, hit.text_end
+FROM unnest(%s::vector[]) WITH ORDINALITY AS query(embedding, ordinal)
+CROSS JOIN LATERAL (
+    SELECT chunk.id, chunk.video_id, chunk.chunk_index, chunk.text,
+           chunk.start_seconds, chunk.end_seconds, chunk.token_count,
+           chunk.generation, chunk.text_start, chunk.text_end,
+           chunk.embedding <=> query.embedding AS distance
+    FROM {ContentChunk._meta.db_table} chunk
+    WHERE chunk.mentor_id = ANY(%s::uuid[]) AND chunk.is_active AND chunk.embedding IS NOT NULL
+    ORDER BY {{ordering}}
+    LIMIT %s
+) hit
+JOIN {VideoContent._meta.db_table} video ON video.id = hit.video_id
+ORDER BY query.ordinal, hit.distance
+"""
+
+
+# ORDER BY of the batch search per retrieval mode (see _distance_ordering()).
+_BATCH_ORDERINGS = {
+    RETRIEVAL_MODE_APPROXIMATE: "chunk.embedding <=> query.embedding",
+    RETRIEVAL_MODE_EXACT: "(chunk.embedding <=> query.embedding) + 0",
+}
+
+
+def get_retrieval_mode(mode: str | None = None) -> str:
+    """
+    Resolve and validate the retrieval mode.
+    Args:
+        mode (str | None): "exact", "approximate", or None to use settings.RETRIEVAL_MODE.
+    Returns:
+        str: The validated retrieval mode.
+    """
+    mode = (mode or settings.RETRIEVAL_MODE).strip().lower()
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"retrieval mode must be one of: {', '.join(RETRIEVAL_MODES)}")
+    return mode
+
+
+def get_retrieval_backend(backend: str | None = None) -> str:
+    """
+    Resolve and validate the retrieval backend.
+    Args:
+        backend (str | None): "postgres", "numpy", or None to use settings.RETRIEVAL_BACKEND.
+    Returns:
+        str: The validated retrieval backend.
+    """
+    backend = (backend or settings.RETRIEVAL_BACKEND).strip().lower()
+    if backend not in RETRIEVAL_BACKENDS:
+        raise ValueError(f"retrieval backend must be one of: {', '.join(RETRIEVAL_BACKENDS)}")
+    return backend
+
+
+def get_search_mode(search_mode: str | None = None) -> str:
+    """
+    Resolve and validate the search mode.
+    Args:
+        search_mode (str | None): "vector", "lexical", "hybrid", or None to use settings.RETRIEVAL_SEARCH_MODE.
+    Returns:
+        str: The validated search mode.
+    """
+    search_mode = (search_mode or settings.RETRIEVAL_SEARCH_MODE).strip().lower()
+    if search_mode not in SEARCH_MODES:
+        raise ValueError(f"search mode must be one of: {', '.join(SEARCH_MODES)}")
+    return search_mode
+
+
+def _search_settings(mode: str, k: int) -> dict:
+    """
+    Build the per-query planner/index settings for a vector search.
+    Approximate searches tune ef_search/probes so at least k candidates are produced;
+    exact searches need none (see _distance_ordering()).
+    """
+    if mode == RETRIEVAL_MODE_EXACT:
+        return {}
+
+    if get_index_type() == INDEX_TYPE_HNSW:
+        search_settings = {"hnsw.ef_search": max(settings.VECTOR_HNSW_EF_SEARCH, k)}
+        if settings.VECTOR_HNSW_ITERATIVE_SCAN:
+            search_settings["hnsw.iterative_scan"] = settings.VECTOR_HNSW_ITERATIVE_SCAN
+        return search_settings
+
+    return {"ivfflat.probes": settings.VECTOR_IVFFLAT_PROBES}
+
+
+def _distance_ordering(distance, mode: str):
+    """
+    ORDER BY expression for a distance. In exact mode "+ 0" hides the distance
+    operator from the planner, so the ANN index cannot serve the sort while the
+    mentor_id/is_active indexes stay usable.
+    """
+    return distance + Value(0.0) if mode == RETRIEVAL_MODE_EXACT else distance
+
+
+def _searchable_chunk_count(mentor_ids: list, limit: int) -> int:
+    """Number of active, embedded chunks of the mentors, counting no further than limit."""
+    return (
         ContentChunk.objects
-        .filter(video__mentor__slug=mentor_slug, embedding__isnull=False)
-        .select_related("video", "video__mentor")
+        .active()
+        .filter(mentor_id__in=mentor_ids, embedding__isnull=False)
+        .values("id")[:limit]
+        .count()
+    )
+
+
+@contextmanager
+def _vector_search_session(mode: str, k: int):
+    """
+    Apply search settings with SET LOCAL for the duration of the block.
+    SET LOCAL only lives until the end of the surrounding transaction, so when we
+    are nested inside an outer transaction the settings are reset on exit.
+    """
+    search_settings = _search_settings(mode, k)
+    nested = connection.in_atomic_block
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for name, value in search_settings.items():
+                cursor.execute(f"SET LOCAL {name} = %s", [str(value)])
+        yield
+        if nested:
+            with connection.cursor() as cursor:
+                for name in search_settings:
+                    cursor.execute(f"SET LOCAL {name} TO DEFAULT")
+
+
+def _resolve_mentor(mentor_slug: str, mentor: Mentor | None) -> Mentor | None:
+    if mentor is not None:
+        return mentor
+    return Mentor.objects.filter(slug=mentor_slug).first()
+
+
+def _vector_search(
+    *,
+    mentor_id,
+    query_embedding: list[float],
+    k: int,
+    mode: str,
+    compact_type: str | None = None,
+) -> list[RetrievedChunk]:
+    """
+    Rank a mentor's chunks by cosine distance to the query embedding.
+    With a compact type, candidates are found on the compact column (k * RETRIEVAL_RESCORE_OVERSAMPLE
+    of them) and rescored against the full-precision vectors in the same statement.
+    """
+    qs = ContentChunk.objects.active().filter(mentor_id=mentor_id, embedding__isnull=False)
+    candidates = k
+
+    if compact_type:
+        compact = get_compact_type(compact_type)
+        candidates = k * max(1, settings.RETRIEVAL_RESCORE_OVERSAMPLE)
+        candidate_ids = (
+            ContentChunk.objects
+            .active()
+            .filter(mentor_id=mentor_id, **{f"{compact.field}__isnull": False})
+            .order_by(_distance_ordering(compact.distance_to(query_embedding), mode))
+            .values("id")[:candidates]
+        )
+        qs = ContentChunk.objects.filter(id__in=candidate_ids)
+
+    qs = (
+        qs
         .annotate(distance=CosineDistance("embedding", query_embedding))
-        .order_by("distance")[:k]
+        .order_by(_distance_ordering(F("distance"), mode))[:k]
     )
-    return list(qs)
+    with _vector_search_session(mode, candidates):
+        return project_chunks(qs, "distance")
+
+
+def _fetch_chunks_by_ids(ranked: list[tuple]) -> list[RetrievedChunk]:
+    """
+    Load ranked chunks by id in a single query, preserving rank order.
+    Args:
+        ranked (list[tuple]): (chunk id, distance) pairs, closest first.
+    Returns:
+        list[RetrievedChunk]: Chunks with `distance` set; ids that no longer exist are skipped.
+    """
+    if not ranked:
+        return []
+    chunks_by_id = {
+        chunk.id: chunk
+        for chunk in project_chunks(ContentChunk.objects.filter(id__in=[chunk_id for chunk_id, _ in ranked]))
+    }
+    chunks = []
+    for chunk_id, distance in ranked:
+        chunk = chunks_by_id.get(chunk_id)
+        if chunk is not None:
+            chunk.distance = distance
+            chunks.append(chunk)
+    return chunks
+
+
+def _numpy_search(*, mentor: Mentor, query_embedding: list[float], k: int) -> list[RetrievedChunk]:
+    # Imported lazily so the postgres backend never touches the index directory.
+    from mentors.numpy_index import get_mentor_index
+
+    index = get_mentor_index(mentor.id, mentor.corpus_version)
+    return _fetch_chunks_by_ids(index.search(query_embedding, k))
+
+
+def _lexical_query(query_text: str) -> SearchQuery | None:
+    """
+    OR together the terms of the message so chunks matching any exact name,
+    number or catchphrase are candidates; ts_rank then favours chunks matching more terms.
+    """
+    terms = _LEXICAL_TERM_RE.findall(query_text)[:_LEXICAL_MAX_TERMS]
+    query = None
+    for term in dict.fromkeys(term.lower() for term in terms):
+        term_query = SearchQuery(term, config=SEARCH_CONFIG)
+        query = term_query if query is None else query | term_query
+    return query
+
+
+def _lexical_search(*, mentor_id, query_text: str, k: int, query_embedding=None) -> list[RetrievedChunk]:
+    """
+    Full-text search over ContentChunk.search_vector (GIN-indexed), ranked by ts_rank.
+    When a query embedding is available the cosine distance is computed for the hits too.
+    """
+    query = _lexical_query(query_text)
+    if query is None:
+        return []
+
+    qs = (
+        ContentChunk.objects
+        .active()
+        .filter(mentor_id=mentor_id, search_vector=query)
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .order_by("-rank")
+    )
+    if query_embedding is None:
+        return project_chunks(qs[:k])
+    qs = qs.annotate(distance=CosineDistance("embedding", query_embedding))
+    return project_chunks(qs[:k], "distance")
+
+
+def _rank_by_vector(*, mentor: Mentor, query_embedding: list[float], k: int, mode: str, backend: str) -> list[RetrievedChunk]:
+    if backend == RETRIEVAL_BACKEND_NUMPY:
+        return _numpy_search(mentor=mentor, query_embedding=query_embedding, k=k)
+
+    compact_type = settings.RETRIEVAL_COMPACT_TYPE or None
+    chunks = _vector_search(
+        mentor_id=mentor.id,
+        query_embedding=query_embedding,
+        k=k,
+        mode=mode,
+        compact_type=compact_type,
+    )
+
+    # A mentor with fewer than k searchable chunks can't fill k; only complete
+    # results the ANN scan cut short.
+    if (
+        mode == RETRIEVAL_MODE_APPROXIMATE
+        and len(chunks) < k
+        and len(chunks) < _searchable_chunk_count([mentor.id], k)
+    ):
+        logger.debug(
+            "Approximate search returned %s/%s chunks for mentor=%s; falling back to exact search",
+            len(chunks),
+            k,
+            mentor.slug,
+        )
+        chunks = _vector_search(
+            mentor_id=mentor.id,
+            query_embedding=query_embedding,
+            k=k,
+            mode=RETRIEVAL_MODE_EXACT,
+        )
+
+    return chunks
+
+
+def reciprocal_rank_fusion(rankings: list[list], *, k: int, rrf_k: int | None = None) -> list:
+    """
+    Fuse several ranked chunk lists with reciprocal-rank fusion.
+    score(chunk) = sum over rankings of 1 / (rrf_k + rank), with 1-based ranks.
+    Args:
+        rankings (list[list]): Ranked lists of chunks, best first.
+        k (int): Number of fused results to return.
+        rrf_k (int, optional): Rank damping constant. Defaults to settings.RETRIEVAL_RRF_K.
+    Returns:
+        list: Top k chunks by fused score, each annotated with `score`.
+    """
+    rrf_k = settings.RETRIEVAL_RRF_K if rrf_k is None else rrf_k
+    fused = {}
+    for ranking in rankings:
+        for rank, chunk in enumerate(ranking, start=1):
+            entry = fused.setdefault(chunk.id, [chunk, 0.0])
+            entry[1] += 1.0 / (rrf_k + rank)
+            if getattr(entry[0], "distance", None) is None and getattr(chunk, "distance", None) is not None:
+                entry[0].distance = chunk.distance
+
+    ordered = sorted(fused.values(), key=lambda entry: entry[1], reverse=True)[:k]
+    for chunk, score in ordered:
+        chunk.score = score
+    return [chunk for chunk, _ in ordered]
+
+
+def _search(
+    *,
+    mentor: Mentor,
+    query_embedding: list[float] | None,
+    query_text: str | None,
+    k: int,
+    mode: str,
+    backend: str,
+    search_mode: str,
+) -> list[RetrievedChunk]:
+    if search_mode == SEARCH_MODE_LEXICAL:
+        return _lexical_search(mentor_id=mentor.id, query_text=query_text, k=k)
+
+    if search_mode == SEARCH_MODE_VECTOR:
+        return _rank_by_vector(mentor=mentor, query_embedding=query_embedding, k=k, mode=mode, backend=backend)
+
+    candidates = max(k, settings.RETRIEVAL_HYBRID_CANDIDATES)
+    vector_hits = _rank_by_vector(
+        mentor=mentor,
+        query_embedding=query_embedding,
+        k=candidates,
+        mode=mode,
+        backend=backend,
+    )
+    lexical_hits = _lexical_search(
+        mentor_id=mentor.id,
+        query_text=query_text,
+        k=candidates,
+        query_embedding=query_embedding,
+    )
+    return reciprocal_rank_fusion([vector_hits, lexical_hits], k=k)
+
+
+def retrieve_mentor_chunks(
+    *,
+    mentor_slug: str,
+    query_embedding: list[float] | None = None,
+    k: int = 6,
+    mode: str | None = None,
+    mentor: Mentor | None = None,
+    backend: str | None = None,
+    query_text: str | None = None,
+    search_mode: str | None = None,
+    use_cache: bool | None = None,
+):
+    """
+    Search a mentor's transcript chunks, scoped through the denormalized
+    ContentChunk.mentor column (no join is needed to filter).
+    - "vector": rank by cosine distance between ContentChunk.embedding and query_embedding.
+    - "lexical": Postgres full-text search over ContentChunk.search_vector; needs no embedding.
+    - "hybrid": run both top-N searches and fuse them with reciprocal-rank fusion.
+    In approximate mode the ANN index is used; because the mentor filter is applied
+    after the index scan, a result set shorter than the mentor's searchable chunks
+    (capped at k) is completed with an exact search.
+    The "numpy" backend ranks in-process over a memory-mapped copy of the mentor's
+    embeddings and only fetches the winning rows from the database.
+    Rankings are cached per mentor corpus version and quantized query (see retrieval_cache.py).
+    Args:
+        mentor_slug (str): The slug identifier for the mentor.
+        query_embedding (list[float], optional): The embedding vector to search against (vector/hybrid).
+        k (int, optional): The number of top results to return. Defaults to 6.
+        mode (str, optional): "exact" or "approximate". Defaults to settings.RETRIEVAL_MODE.
+        mentor (Mentor, optional): Already-loaded mentor; skips the slug lookup.
+        backend (str, optional): "postgres" or "numpy". Defaults to settings.RETRIEVAL_BACKEND.
+        query_text (str, optional): The raw user message (lexical/hybrid).
+        search_mode (str, optional): "vector", "lexical" or "hybrid". Defaults to settings.RETRIEVAL_SEARCH_MODE.
+        use_cache (bool, optional): Read/write the retrieval cache. Defaults to settings.RETRIEVAL_CACHE_ENABLED.
+    Returns:
+        list[RetrievedChunk]: The top k chunks for the specified mentor, best first.
+    """
+    mode = get_retrieval_mode(mode)
+    backend = get_retrieval_backend(backend)
+    search_mode = get_search_mode(search_mode)
+    if search_mode != SEARCH_MODE_LEXICAL and query_embedding is None:
+        raise ValueError(f"query_embedding is required for {search_mode} search")
+    if search_mode != SEARCH_MODE_VECTOR and not (query_text and query_text.strip()):
+        raise ValueError(f"query_text is required for {search_mode} search")
+
+    mentor = _resolve_mentor(mentor_slug, mentor)
+    if mentor is None:
+        return []
+
+    use_cache = settings.RETRIEVAL_CACHE_ENABLED if use_cache is None else use_cache
+    cache_key = None
+    if use_cache:
+        cache_key = make_cache_key(
+            mentor=mentor,
+            k=k,
+            search_mode=search_mode,
+            mode=mode,
+            backend=backend,
+            query_embedding=query_embedding if search_mode != SEARCH_MODE_LEXICAL else None,
+            query_text=query_text if search_mode != SEARCH_MODE_VECTOR else None,
+        )
+        ranked = get_cached_ranking(cache_key)
+        if ranked is not None:
+            return _fetch_chunks_by_ids(ranked)
+
+    chunks = _search(
+        mentor=mentor,
+        query_embedding=query_embedding,
+        query_text=query_text,
+        k=k,
+        mode=mode,
+        backend=backend,
+        search_mode=search_mode,
+    )
+    if cache_key is not None:
+        set_cached_ranking(cache_key, chunks)
+    return chunks
+
+
+def _batch_vector_search(*, mentor_ids: list, query_embeddings: list, k: int, mode: str) -> list[list[RetrievedChunk]]:
+    """
+    Run one top-k vector search per query embedding in a single SQL statement.
+    Returns:
+        list[list[RetrievedChunk]]: One ranked list per query embedding, in input order.
+    """
+    params = [
+        [Vector(embedding).to_text() for embedding in query_embeddings],
+        [str(mentor_id) for mentor_id in mentor_ids],
+        k,
+    ]
+    with _vector_search_session(mode, k):
+        with connection.cursor() as cursor:
+            cursor.execute(_BATCH_VECTOR_SEARCH_SQL.format(ordering=_BATCH_ORDERINGS[mode]), params)
+            rows = cursor.fetchall()
+
+    results = [[] for _ in query_embeddings]
+    hits, spans = [], []
+    for ordinal, *row in rows:
+        chunk_id, video_id, video_title, youtube_video_id, chunk_index, text, start, end, token_count, distance, *span = row
+        hit = RetrievedChunk(
+            id=chunk_id,
+            video_id=video_id,
+            video_title=video_title,
+            youtube_video_id=youtube_video_id,
+            chunk_index=chunk_index,
+            text=text,
+            start_seconds=start,
+            end_seconds=end,
+            token_count=token_count,
+            distance=distance,
+        )
+        results[ordinal - 1].append(hit)
+        hits.append(hit)
+        spans.append((video_id, *span))
+    fill_chunk_texts(hits, spans)
+    return results
+
+
+def retrieve_mentor_chunks_batch(
+    *,
+    mentor_slug: str | list[str],
+    query_embeddings: list[list[float]],
+    k: int = 6,
+    mode: str | None = None,
+) -> list[list[RetrievedChunk]]:
+    """
+    Vector-search many query embeddings in one database round trip.
+    A LATERAL join over the array of query vectors runs a top-k search per query,
+    so evaluation jobs and multi-question flows don't pay one round trip per question
+    (video titles are joined in the same statement).
+    Always uses the postgres backend on the full-precision embedding column.
+    Args:
+        mentor_slug (str | list[str]): A mentor slug, or several slugs to rank each query
+            over the chunks of all of those mentors together. Unknown slugs are ignored.
+        query_embeddings (list[list[float]]): The query vectors.
+        k (int, optional): The number of top results per query. Defaults to 6.
+        mode (str, optional): "exact" or "approximate". Defaults to settings.RETRIEVAL_MODE.
+    Returns:
+        list[list[RetrievedChunk]]: Ranked chunks (with `distance`) per query,
+            in the same order as query_embeddings.
+    """
+    mode = get_retrieval_mode(mode)
+    query_embeddings = list(query_embeddings)
+    if not query_embeddings:
+        return []
+
+    slugs = [mentor_slug] if isinstance(mentor_slug, str) else list(mentor_slug)
+    mentor_ids = list(Mentor.objects.filter(slug__in=slugs).values_list("id", flat=True))
+    if not mentor_ids:
+        return [[] for _ in query_embeddings]
+
+    results = _batch_vector_search(
+        mentor_ids=mentor_ids, query_embeddings=query_embeddings, k=k, mode=mode
+    )
+
+    if mode == RETRIEVAL_MODE_APPROXIMATE:
+        # As in retrieve_mentor_chunks: complete short ANN result sets exactly,
+        # batching every short query into one more statement.
+        short = [i for i, chunks in enumerate(results) if len(chunks) < k]
+        if short:
+            searchable = _searchable_chunk_count(mentor_ids, k)
+            short = [i for i in short if len(results[i]) < searchable]
+        if short:
+            logger.debug(
+                "Approximate batch search was short for %s/%s queries; re-running them exactly",
+                len(short),
+                len(results),
+            )
+            exact = _batch_vector_search(
+                mentor_ids=mentor_ids,
+                query_embeddings=[query_embeddings[i] for i in short],
+                k=k,
+                mode=RETRIEVAL_MODE_EXACT,
+            )
+            for i, chunks in zip(short, exact):
+                results[i] = chunks
 
+    return results
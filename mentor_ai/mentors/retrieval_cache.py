@@ -0,0 +1,86 @@
+"""
+Cache of retrieval rankings in front of retrieve_mentor_chunks.
+
+Only (chunk id, distance) pairs are stored; the chunks themselves are loaded
+with a single primary-key lookup on a hit. Keys include the mentor's
+corpus_version, which is bumped whenever the mentor's chunks change, so
+entries of an older corpus are simply never read again and expire by TTL.
+"""
+import hashlib
+import logging
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+RETRIEVAL_CACHE = caches["retrieval"]
+
+
+def _query_fingerprint(query_embedding, query_text: str | None) -> str:
+    """
+    Hash a coarse quantization of the query embedding (and the normalized query
+    text for lexical/hybrid searches).
+    """
+    digest = hashlib.sha1()
+    if query_embedding is not None:
+        scale = 10 ** settings.RETRIEVAL_CACHE_PRECISION
+        quantized = np.rint(np.asarray(query_embedding, dtype=np.float64) * scale).astype(np.int32)
+        digest.update(quantized.tobytes())
+    if query_text is not None:
+        digest.update(b"\0")
+        digest.update(" ".join(query_text.lower().split()).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def make_cache_key(
+    *,
+    mentor,
+    k: int,
+    search_mode: str,
+    mode: str,
+    backend: str,
+    query_embedding=None,
+    query_text: str | None = None,
+) -> str:
+    """
+    Build the cache key of one retrieval.
+    Args:
+        mentor (Mentor): The mentor searched; its corpus_version scopes the key.
+        k (int): Number of results requested.
+        search_mode (str): "vector", "lexical" or "hybrid".
+        mode (str): "exact" or "approximate".
+        backend (str): "postgres" or "numpy".
+        query_embedding (list[float], optional): The query vector (vector/hybrid).
+        query_text (str, optional): The query text (lexical/hybrid).
+    Returns:
+        str: The cache key.
+    """
+    compact = settings.RETRIEVAL_COMPACT_TYPE or "full"
+    return (
+        f"retrieval:{mentor.id}:v{mentor.corpus_version}:{search_mode}:{mode}:{backend}:{compact}:"
+        f"k{k}:{_query_fingerprint(query_embedding, query_text)}"
+    )
+
+
+def get_cached_ranking(key: str) -> list[tuple] | None:
+    """
+    Args:
+        key (str): Key from make_cache_key().
+    Returns:
+        list[tuple] | None: (chunk id, distance) pairs, best first, or None on a miss.
+    """
+    ranked = RETRIEVAL_CACHE.get(key)
+    logger.debug("Retrieval cache %s | key=%s", "hit" if ranked is not None else "miss", key)
+    return ranked
+
+
+def set_cached_ranking(key: str, chunks: list) -> None:
+    """
+    Store the ids and distances of a ranked chunk list.
+    Args:
+        key (str): Key from make_cache_key().
+        chunks (list): Ranked chunks, best first.
+    """
+    RETRIEVAL_CACHE.set(key, [(chunk.id, getattr(chunk, "distance", None)) for chunk in chunks])
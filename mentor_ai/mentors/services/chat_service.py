@@ -1,8 +1,31 @@
+import logging
+
+from django.conf import settings
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
 from mentor_knowledge.models import Mentor
+from mentor_knowledge.rate_limit import RateLimitWaitTimeout
+from mentors.diversify import fetch_neighbour_chunks, fit_token_budget, merge_adjacent_chunks, select_diverse_chunks
 from mentors.openai_client import embed_query, generate_answer
-from mentors.retrieval import retrieve_mentor_chunks
+from mentors.retrieval import (
+    SEARCH_MODE_LEXICAL,
+    get_retrieval_mode,
+    get_search_mode,
+    retrieve_mentor_chunks,
+)
 from mentors.prompts import build_persona_prompt
 
+logger = logging.getLogger(__name__)
+
+# Embedding failures that justify degrading to lexical search instead of failing the chat.
+TRANSIENT_EMBEDDING_ERRORS = (
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+    RateLimitWaitTimeout,
+)
+
 
 class MentorNotFoundError(Exception):
     """Raised when the requested mentor is not found in the system"""
@@ -14,12 +37,18 @@ def chat_with_mentor(
     mentor_slug: str, 
     message: str, 
     top_k: int = 6,
-    include_metadata: bool = True
+    include_metadata: bool = True,
+    retrieval_mode: str | None = None,
+    search_mode: str | None = None,
+    neighbour_window: int | None = None,
 ) -> dict:
     """
     Main chat service function implementing RAG pipeline:
-    1. Convert user message to embedding vector
-    2. Retrieve top-k relevant transcript chunks for the mentor
+    1. Convert user message to embedding vector (skipped in lexical search mode)
+    2. Retrieve top-k relevant transcript chunks for the mentor, diversified with MMR
+       and with overlapping neighbours merged (settings.RETRIEVAL_DIVERSIFY);
+       optionally expand each hit with its +/-N neighbouring chunks and cut
+       the result to settings.CHAT_CONTEXT_MAX_TOKENS
     3. Generate answer using RAG with persona, user message, and context
     4. Return answer and retrieved chunks
     
@@ -28,13 +57,17 @@ def chat_with_mentor(
         message (str): The user's input message
         top_k (int, optional): Number of context chunks to retrieve. Defaults to 6
         include_metadata (bool, optional): Whether to include full metadata. Defaults to True
+        retrieval_mode (str, optional): "exact" or "approximate" vector search. Defaults to settings.RETRIEVAL_MODE
+        search_mode (str, optional): "vector", "lexical" or "hybrid". Defaults to settings.RETRIEVAL_SEARCH_MODE
+        neighbour_window (int, optional): Neighbouring chunks added on each side of a hit (0-3).
+            Defaults to settings.RETRIEVAL_NEIGHBOUR_WINDOW
         
     Returns:
         dict: Dictionary containing the generated answer and retrieved context chunks
         
     Raises:
         MentorNotFoundError: If the mentor is not found in the database
-        ValueError: If the message is empty or top_k is out of valid range
+        ValueError: If the message is empty, top_k or neighbour_window is out of valid range or a mode is unknown
     """
     # Input validation
     if not message or not message.strip():
@@ -43,6 +76,14 @@ def chat_with_mentor(
     if top_k < 1 or top_k > 12:
         raise ValueError("top_k must be between 1 and 12")
 
+    if neighbour_window is None:
+        neighbour_window = settings.RETRIEVAL_NEIGHBOUR_WINDOW
+    if neighbour_window < 0 or neighbour_window > 3:
+        raise ValueError("neighbour_window must be between 0 and 3")
+
+    retrieval_mode = get_retrieval_mode(retrieval_mode)
+    search_mode = get_search_mode(search_mode)
+
     # Retrieve mentor
     try:
         mentor = Mentor.objects.get(slug=mentor_slug)
@@ -57,15 +98,53 @@ def chat_with_mentor(
     )
     
     # Convert question to embedding
-    query_emb = embed_query(message)
-    
-    # Retrieve relevant chunks
+    query_emb = None
+    if search_mode != SEARCH_MODE_LEXICAL:
+        try:
+            query_emb = embed_query(message)
+        except TRANSIENT_EMBEDDING_ERRORS:
+            if not settings.RETRIEVAL_LEXICAL_FALLBACK:
+                raise
+            logger.warning(
+                "Query embedding failed; falling back to lexical search | mentor=%s",
+                mentor_slug,
+                exc_info=True,
+            )
+            search_mode = SEARCH_MODE_LEXICAL
+
+    # Retrieve relevant chunks (over-fetched when they are diversified below)
+    candidates = top_k * max(1, settings.RETRIEVAL_MMR_OVERSAMPLE) if settings.RETRIEVAL_DIVERSIFY else top_k
     chunks = retrieve_mentor_chunks(
         mentor_slug=mentor_slug, 
         query_embedding=query_emb, 
-        k=top_k
+        k=candidates,
+        mode=retrieval_mode,
+        mentor=mentor,
+        query_text=message,
+        search_mode=search_mode,
     )
 
+    # Drop near-duplicate candidates
+    if settings.RETRIEVAL_DIVERSIFY:
+        chunks = select_diverse_chunks(
+            chunks,
+            query_embedding=query_emb,
+            k=top_k,
+            lambda_mult=settings.RETRIEVAL_MMR_LAMBDA,
+        )
+
+    # Complete passages cut mid-thought; all neighbours come from one query
+    if neighbour_window:
+        chunks = chunks + fetch_neighbour_chunks(chunks, neighbour_window)
+
+    # Merge overlapping neighbours into single spans to shrink the prompt
+    if settings.RETRIEVAL_DIVERSIFY or neighbour_window:
+        chunks = merge_adjacent_chunks(chunks, settings.CHUNK_OVERLAP_WORDS)
+
+    # Keep the context within its token budget, using the stored per-chunk counts
+    if settings.CHAT_CONTEXT_MAX_TOKENS:
+        chunks = fit_token_budget(chunks, settings.CHAT_CONTEXT_MAX_TOKENS)
+
     # Build context string
     context = _build_context_string(chunks) if chunks else "(no relevant context found)"
 
@@ -94,7 +173,7 @@ def _build_context_string(chunks) -> str:
     Build formatted context string from retrieved chunks
     
     Args:
-        chunks: List of TranscriptChunk objects
+        chunks: List of RetrievedChunk records
         
     Returns:
         str: Formatted context string
@@ -103,7 +182,7 @@ def _build_context_string(chunks) -> str:
         [
             (
                 f"[{i+1}] {chunk.text}\n"
-                f"(source: {chunk.video.title} | yt: {chunk.video.youtube_video_id} | "
+                f"(source: {chunk.video_title} | yt: {chunk.youtube_video_id} | "
                 f"idx: {chunk.chunk_index} | {chunk.start_seconds}-{chunk.end_seconds}s)"
             )
             for i, chunk in enumerate(chunks)
@@ -116,7 +195,7 @@ def _format_retrieved_chunks(chunks) -> list[dict]:
     Format retrieved chunks into JSON-serializable structure
     
     Args:
-        chunks: List of TranscriptChunk objects
+        chunks: List of RetrievedChunk records
         
     Returns:
         list[dict]: List of dictionaries with metadata for each chunk
@@ -124,10 +203,11 @@ def _format_retrieved_chunks(chunks) -> list[dict]:
     return [
         {
             "chunk_id": str(c.id),
-            "distance": float(getattr(c, "distance", 0.0)),
+            # Lexical-only hits have no vector distance.
+            "distance": None if getattr(c, "distance", None) is None else float(c.distance),
             "video_id": str(c.video_id),
-            "video_title": c.video.title,
-            "youtube_video_id": c.video.youtube_video_id,
+            "video_title": c.video_title,
+            "youtube_video_id": c.youtube_video_id,
             "chunk_index": c.chunk_index,
             "start_seconds": c.start_seconds,
             "end_seconds": c.end_seconds,
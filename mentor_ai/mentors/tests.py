@@ -1,9 +1,39 @@
+import tempfile
+import types
+import uuid
+from pathlib import Path
 from unittest import mock
 
+import httpx
+import numpy as np
+
 from django.contrib.auth import get_user_model
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import F
+from django.test import SimpleTestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
+from openai import APITimeoutError
 from rest_framework.test import APITestCase
+from pgvector.django import CosineDistance
+
+from mentors.diversify import _neighbour_ranges, fit_token_budget, merge_adjacent_chunks, select_diverse_chunks
+from mentors.numpy_index import MentorVectorIndex, _remove_stale_versions
+from mentors.retrieval import (
+    RETRIEVAL_MODE_APPROXIMATE,
+    RETRIEVAL_MODE_EXACT,
+    _distance_ordering,
+    _lexical_query,
+    _search_settings,
+    get_retrieval_mode,
+    RetrievedChunk,
+    reciprocal_rank_fusion,
+    retrieve_mentor_chunks_batch,
+)
+from mentor_knowledge.models import ContentChunk
+from mentors.query_embedding_cache import QueryEmbeddingCache
+from mentors.retrieval_cache import make_cache_key
+from mentors.services.chat_service import _build_context_string, chat_with_mentor
 
 
 class AuthApiTests(APITestCase):
@@ -144,3 +174,327 @@ class MentorChatAuthTests(APITestCase):
             message="hello",
             top_k=3,
         )
+
+
+class RetrievalSettingsTests(SimpleTestCase):
+    def test_get_retrieval_mode_defaults_to_settings(self):
+        with override_settings(RETRIEVAL_MODE="exact"):
+            self.assertEqual(get_retrieval_mode(), RETRIEVAL_MODE_EXACT)
+
+    def test_get_retrieval_mode_rejects_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            get_retrieval_mode("fuzzy")
+
+    def test_exact_search_keeps_index_scans_and_hides_the_distance_sort(self):
+        self.assertEqual(_search_settings(RETRIEVAL_MODE_EXACT, 6), {})
+        query = str(
+            ContentChunk.objects
+            .annotate(distance=CosineDistance("embedding", [1.0, 0.0]))
+            .order_by(_distance_ordering(F("distance"), RETRIEVAL_MODE_EXACT))
+            .query
+        )
+        self.assertIn("<=>", query.split("ORDER BY")[1])
+        self.assertIn("+ 0.0", query.split("ORDER BY")[1])
+
+    @override_settings(VECTOR_INDEX_TYPE="hnsw", VECTOR_HNSW_EF_SEARCH=40, VECTOR_HNSW_ITERATIVE_SCAN="")
+    def test_hnsw_ef_search_is_never_below_k(self):
+        self.assertEqual(_search_settings(RETRIEVAL_MODE_APPROXIMATE, 6), {"hnsw.ef_search": 40})
+        self.assertEqual(_search_settings(RETRIEVAL_MODE_APPROXIMATE, 64), {"hnsw.ef_search": 64})
+
+    @override_settings(VECTOR_INDEX_TYPE="ivfflat", VECTOR_IVFFLAT_PROBES=7)
+    def test_ivfflat_uses_probes(self):
+        self.assertEqual(_search_settings(RETRIEVAL_MODE_APPROXIMATE, 6), {"ivfflat.probes": 7})
+
+
+class MentorVectorIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.chunk_ids = [uuid.uuid4() for _ in range(4)]
+        vectors = np.array(
+            [[1.0, 0.0], [0.0, 1.0], [0.6, 0.8], [-1.0, 0.0]],
+            dtype=np.float32,
+        )
+        self.index = MentorVectorIndex(
+            version=1,
+            ids=np.array([np.frombuffer(i.bytes, dtype=np.uint8) for i in self.chunk_ids]),
+            vectors=vectors,
+        )
+
+    def test_search_returns_closest_chunks_in_order(self):
+        results = self.index.search([1.0, 0.1], k=2)
+
+        self.assertEqual([chunk_id for chunk_id, _ in results], [self.chunk_ids[0], self.chunk_ids[2]])
+        self.assertLess(results[0][1], results[1][1])
+
+    def test_only_older_versions_are_removed(self):
+        with tempfile.TemporaryDirectory() as index_dir, override_settings(VECTOR_INDEX_DIR=index_dir):
+            mentor_dir = Path(index_dir) / "mentor-1"
+            mentor_dir.mkdir()
+            for version in (2, 3, 10):
+                for kind in ("vectors", "ids"):
+                    (mentor_dir / f"v{version}.{kind}.npy").touch()
+
+            _remove_stale_versions("mentor-1", 3)
+
+            self.assertEqual(
+                sorted(path.name for path in mentor_dir.iterdir()),
+                ["v10.ids.npy", "v10.vectors.npy", "v3.ids.npy", "v3.vectors.npy"],
+            )
+
+    def test_search_with_k_larger_than_index_returns_everything(self):
+        results = self.index.search([0.0, 1.0], k=10)
+
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[-1][0], self.chunk_ids[3])
+
+    def test_search_rejects_wrong_dimensions(self):
+        with self.assertRaises(ValueError):
+            self.index.search([1.0, 0.0, 0.0], k=1)
+
+
+class ReciprocalRankFusionTests(SimpleTestCase):
+    def _chunk(self, chunk_id, distance=None):
+        return types.SimpleNamespace(id=chunk_id, distance=distance)
+
+    def test_chunks_found_by_both_searches_rank_first(self):
+        vector_hits = [self._chunk("a", 0.1), self._chunk("b", 0.2), self._chunk("c", 0.3)]
+        lexical_hits = [self._chunk("c"), self._chunk("d")]
+
+        fused = reciprocal_rank_fusion([vector_hits, lexical_hits], k=3, rrf_k=60)
+
+        self.assertEqual([chunk.id for chunk in fused], ["c", "a", "b"])
+        self.assertEqual(fused[0].distance, 0.3)
+        self.assertGreater(fused[0].score, fused[1].score)
+
+    def test_lexical_query_is_none_without_terms(self):
+        self.assertIsNone(_lexical_query("?!"))
+        self.assertIsNotNone(_lexical_query("Tony Robbins 1910"))
+
+
+@override_settings(RETRIEVAL_CACHE_PRECISION=2, RETRIEVAL_COMPACT_TYPE="")
+class RetrievalCacheKeyTests(SimpleTestCase):
+    def _key(self, embedding, corpus_version=1, k=6):
+        mentor = types.SimpleNamespace(id="mentor-1", corpus_version=corpus_version)
+        return make_cache_key(
+            mentor=mentor,
+            k=k,
+            search_mode="vector",
+            mode="approximate",
+            backend="postgres",
+            query_embedding=embedding,
+        )
+
+    def test_near_identical_embeddings_share_a_key(self):
+        self.assertEqual(self._key([0.1201, -0.5]), self._key([0.1199, -0.5001]))
+        self.assertNotEqual(self._key([0.12, -0.5]), self._key([0.13, -0.5]))
+
+    def test_corpus_version_and_k_are_part_of_the_key(self):
+        self.assertNotEqual(self._key([0.1, 0.2]), self._key([0.1, 0.2], corpus_version=2))
+        self.assertNotEqual(self._key([0.1, 0.2]), self._key([0.1, 0.2], k=3))
+
+
+class QueryEmbeddingCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.shared = LocMemCache("query-embeddings", {})
+        self.cache = QueryEmbeddingCache(max_entries=2, backend=self.shared, timeout=60)
+
+    def test_key_ignores_case_and_whitespace_but_not_model(self):
+        key = QueryEmbeddingCache.make_key("m", 1536, "How do I  stay motivated?")
+        self.assertEqual(key, QueryEmbeddingCache.make_key("m", 1536, " how do i stay motivated? "))
+        self.assertNotEqual(key, QueryEmbeddingCache.make_key("other", 1536, "how do i stay motivated?"))
+
+    def test_lru_is_bounded_and_falls_back_to_shared_tier(self):
+        for key in ("a", "b", "c"):
+            self.cache.set(key, [1.0, 2.0])
+
+        self.assertEqual(self.cache.stats()["size"], 2)
+        self.assertEqual(self.cache.get("a").tolist(), [1.0, 2.0])  # evicted locally, served by the shared tier
+        self.assertEqual(self.cache.get("a").tolist(), [1.0, 2.0])  # now local again
+        self.assertIsNone(self.cache.get("missing"))
+
+        stats = self.cache.stats()
+        self.assertEqual((stats["local_hits"], stats["shared_hits"], stats["misses"]), (1, 1, 1))
+
+    @override_settings(QUERY_EMBEDDING_CACHE_ENABLED=True, OPENAI_RATE_LIMIT_ENABLED=False)
+    def test_embed_query_hit_skips_the_network_call(self):
+        from mentors import openai_client
+
+        provider = mock.Mock(model="m", rate_limited=False, embed=mock.Mock(return_value=[[0.5, 0.25]]))
+        with mock.patch.object(openai_client, "QUERY_EMBEDDING_CACHE", self.cache), \
+                mock.patch.object(openai_client, "embedding_provider", provider):
+            self.assertEqual(openai_client.embed_query("Stay motivated?"), [0.5, 0.25])
+            self.assertEqual(openai_client.embed_query("stay   motivated?"), [0.5, 0.25])
+
+        provider.embed.assert_called_once()
+
+
+class DiversifyTests(SimpleTestCase):
+    def _chunk(self, chunk_id, video_id, chunk_index, text, start, end, distance):
+        return types.SimpleNamespace(
+            id=chunk_id,
+            video_id=video_id,
+            chunk_index=chunk_index,
+            text=text,
+            start_seconds=start,
+            end_seconds=end,
+            distance=distance,
+        )
+
+    def test_mmr_skips_near_duplicate_of_selected_candidate(self):
+        chunks = [
+            self._chunk("a", "v1", 0, "a", 0, 1, 0.05),
+            self._chunk("b", "v1", 1, "b", 1, 2, 0.10),
+            self._chunk("c", "v2", 0, "c", 0, 1, 0.30),
+        ]
+        # "b" nearly repeats "a"; "c" is unrelated to both.
+        similarity = np.array([[1.0, 0.98, 0.2], [0.98, 1.0, 0.1], [0.2, 0.1, 1.0]], dtype=np.float32)
+
+        with mock.patch("mentors.diversify._pairwise_similarity", return_value=similarity):
+            diverse = select_diverse_chunks(chunks, query_embedding=[0.1], k=2, lambda_mult=0.5)
+            relevant = select_diverse_chunks(chunks, query_embedding=[0.1], k=2, lambda_mult=1.0)
+
+        self.assertEqual([chunk.id for chunk in diverse], ["a", "c"])
+        self.assertEqual([chunk.id for chunk in relevant], ["a", "b"])
+
+    def test_adjacent_chunks_merge_without_repeating_overlap(self):
+        chunks = [
+            self._chunk("b", "v1", 4, "four five six seven", 40, 70, 0.1),
+            self._chunk("c", "v2", 0, "other video", 0, 5, 0.2),
+            self._chunk("a", "v1", 3, "one two three four five", 30, 50, 0.3),
+        ]
+
+        merged = merge_adjacent_chunks(chunks, max_overlap_words=3)
+
+        self.assertEqual([span.id for span in merged], ["b", "c"])
+        self.assertEqual(merged[0].text, "one two three four five six seven")
+        self.assertEqual((merged[0].chunk_index, merged[0].start_seconds, merged[0].end_seconds), (3, 30, 70))
+        self.assertEqual(merged[0].merged_chunk_ids, ["a", "b"])
+        self.assertEqual(chunks[0].text, "four five six seven")
+
+    def test_merged_span_sums_token_counts(self):
+        first = self._chunk("a", "v1", 0, "one two", 0, 10, 0.1)
+        second = self._chunk("b", "v1", 1, "three four", 10, 20, 0.2)
+        first.token_count, second.token_count = 3, 4
+
+        self.assertEqual(merge_adjacent_chunks([first, second], max_overlap_words=1)[0].token_count, 7)
+
+    def test_token_budget_skips_spans_that_do_not_fit(self):
+        chunks = [self._chunk(chunk_id, "v1", i, "w", 0, 1, None) for i, chunk_id in enumerate("abcd")]
+        for chunk, tokens in zip(chunks, (50, 60, 20, 30)):
+            chunk.token_count = tokens
+
+        self.assertEqual([chunk.id for chunk in fit_token_budget(chunks, 100)], ["a", "c", "d"])
+        self.assertEqual([chunk.id for chunk in fit_token_budget(chunks, 10)], ["a"])
+
+    def test_neighbour_windows_coalesce_per_video(self):
+        chunks = [
+            self._chunk("a", "v1", 0, "", 0, 0, None),
+            self._chunk("b", "v1", 3, "", 0, 0, None),
+            self._chunk("c", "v1", 9, "", 0, 0, None),
+            self._chunk("d", "v2", 5, "", 0, 0, None),
+        ]
+
+        self.assertEqual(
+            _neighbour_ranges(chunks, window=1),
+            {"v1": [(0, 4), (8, 10)], "v2": [(4, 6)]},
+        )
+
+
+class BatchRetrievalTests(SimpleTestCase):
+    def test_empty_batch_skips_the_database(self):
+        with mock.patch("mentors.retrieval.Mentor") as mock_mentor:
+            self.assertEqual(retrieve_mentor_chunks_batch(mentor_slug="m", query_embeddings=[]), [])
+        mock_mentor.objects.filter.assert_not_called()
+
+    @mock.patch("mentors.retrieval._searchable_chunk_count", return_value=2)
+    @mock.patch("mentors.retrieval._batch_vector_search")
+    @mock.patch("mentors.retrieval.Mentor")
+    def test_short_approximate_results_are_rerun_exactly_in_one_batch(self, mock_mentor, mock_search, _count):
+        mentor_id = uuid.uuid4()
+        mock_mentor.objects.filter.return_value.values_list.return_value = [mentor_id]
+        mock_search.side_effect = [
+            [["a1", "a2"], ["b1"], []],
+            [["b1", "b2"], ["c1", "c2"]],
+        ]
+
+        results = retrieve_mentor_chunks_batch(
+            mentor_slug=["m1", "m2"],
+            query_embeddings=[[0.1], [0.2], [0.3]],
+            k=2,
+            mode=RETRIEVAL_MODE_APPROXIMATE,
+        )
+
+        self.assertEqual(results, [["a1", "a2"], ["b1", "b2"], ["c1", "c2"]])
+        mock_mentor.objects.filter.assert_called_once_with(slug__in=["m1", "m2"])
+        exact_call = mock_search.call_args_list[1].kwargs
+        self.assertEqual(exact_call["query_embeddings"], [[0.2], [0.3]])
+        self.assertEqual(exact_call["mode"], RETRIEVAL_MODE_EXACT)
+
+    @mock.patch("mentors.retrieval._searchable_chunk_count", return_value=1)
+    @mock.patch("mentors.retrieval._batch_vector_search", return_value=[["a1"], ["b1"]])
+    @mock.patch("mentors.retrieval.Mentor")
+    def test_small_corpus_is_not_rerun_exactly(self, mock_mentor, mock_search, count):
+        mock_mentor.objects.filter.return_value.values_list.return_value = [uuid.uuid4()]
+
+        results = retrieve_mentor_chunks_batch(
+            mentor_slug="m",
+            query_embeddings=[[0.1], [0.2]],
+            k=6,
+            mode=RETRIEVAL_MODE_APPROXIMATE,
+        )
+
+        self.assertEqual(results, [["a1"], ["b1"]])
+        mock_search.assert_called_once()
+        self.assertEqual(count.call_args.args[1], 6)
+
+
+@override_settings(RETRIEVAL_LEXICAL_FALLBACK=True)
+class ChatSearchModeTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch("mentors.services.chat_service.Mentor")
+        self.mock_mentor_model = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_mentor_model.objects.get.return_value = types.SimpleNamespace(
+            name="Tech Mentor", slug="tech-mentor", bio=""
+        )
+
+    @mock.patch("mentors.services.chat_service.generate_answer", return_value="answer")
+    @mock.patch("mentors.services.chat_service.retrieve_mentor_chunks", return_value=[])
+    @mock.patch("mentors.services.chat_service.embed_query")
+    def test_lexical_mode_skips_embedding_call(self, mock_embed, mock_retrieve, _mock_answer):
+        chat_with_mentor(mentor_slug="tech-mentor", message="hello", search_mode="lexical")
+
+        mock_embed.assert_not_called()
+        self.assertEqual(mock_retrieve.call_args.kwargs["search_mode"], "lexical")
+
+    @mock.patch("mentors.services.chat_service.generate_answer", return_value="answer")
+    @mock.patch("mentors.services.chat_service.retrieve_mentor_chunks", return_value=[])
+    @mock.patch(
+        "mentors.services.chat_service.embed_query",
+        side_effect=APITimeoutError(request=httpx.Request("POST", "https://api.openai.com")),
+    )
+    def test_embedding_timeout_falls_back_to_lexical(self, _mock_embed, mock_retrieve, _mock_answer):
+        chat_with_mentor(mentor_slug="tech-mentor", message="hello", search_mode="hybrid")
+
+        self.assertEqual(mock_retrieve.call_args.kwargs["search_mode"], "lexical")
+        self.assertIsNone(mock_retrieve.call_args.kwargs["query_embedding"])
+
+
+class RetrievedChunkContextTests(SimpleTestCase):
+    def test_context_is_built_from_projected_columns(self):
+        chunk = RetrievedChunk(
+            id=uuid.uuid4(),
+            video_id=uuid.uuid4(),
+            video_title="Unleash the Power",
+            youtube_video_id="abc123",
+            chunk_index=2,
+            text="Take massive action.",
+            start_seconds=10,
+            end_seconds=40,
+            distance=0.12,
+        )
+
+        self.assertEqual(
+            _build_context_string([chunk]),
+            "[1] Take massive action.\n(source: Unleash the Power | yt: abc123 | idx: 2 | 10-40s)",
+        )
+        self.assertFalse(hasattr(chunk, "__dict__"))